@@ -38,6 +38,26 @@ class MemoryPool:
         self.free.append(block)
 
 
+def _skip_table(term: bytes) -> list:
+    """Bad character skip table of the search term (Horspool)"""
+    m = len(term)
+    table = [m] * 256
+    for i in range(m - 1):
+        table[term[i]] = m - 1 - i
+    return table
+
+
+def _move_left(mv: memoryview, dst: int, src: int, n: int):
+    """
+    Move n bytes to a lower offset (dst < src) in place
+    - slice assignment is memcpy in MicroPython: chunks of 'src - dst' bytes never overlap
+    """
+    step = src - dst
+    for i in range(0, n, step):
+        k = min(step, n - i)
+        mv[dst + i:dst + i + k] = mv[src + i:src + i + k]
+
+
 class SlidingBuffer:
     """
     A linear sliding-window buffer over a fixed-size bytearray or its memoryview.
@@ -53,9 +73,12 @@ class SlidingBuffer:
     - Incremental writes by advancing 'end'
     - Automatic in-place compaction when additional space is
     required and unused bytes exist before 'start'
+    - Bulk (slice) copies and skip table based search, no per byte copy
     - Bounded memory usage; no dynamic reallocation
     """
-    __slots__ = ("_buffer", "_start", "_end", "_mv", "capacity")
+    __slots__ = ("_buffer", "_start", "_end", "_mv", "capacity", "_skip")
+    # Skip tables of the fixed (HTTP header) search terms - built once, shared by all buffers
+    SKIP = {b'\r\n': _skip_table(b'\r\n'), b'\r\n\r\n': _skip_table(b'\r\n\r\n')}
 
     def __init__(self, buffer: bytearray|memoryview):
         self._buffer = buffer
@@ -63,6 +86,7 @@ class SlidingBuffer:
         self._end = 0
         self._mv = memoryview(self._buffer)
         self.capacity = len(buffer)
+        self._skip = (None, None)   # Last other search term (multipart boundary) and its skip table
 
     def size(self) -> int:
         """Determine the window size"""
@@ -84,13 +108,13 @@ class SlidingBuffer:
         """
         Compact the buffer by shifting the active
         window to the beginning of the bytearray
+        - slice copies in non-overlapping chunks of 'start' bytes
         """
-        if self._start == 0:
+        start = self._start
+        if start == 0:
             return
-        buf = self._buffer
-        n = self._end - self._start
-        for i in range(n):
-            buf[i] = buf[self._start + i]
+        n = self._end - start
+        _move_left(self._mv, 0, start, n)
         self._start = 0
         self._end = n
 
@@ -105,6 +129,18 @@ class SlidingBuffer:
             raise IndexError()
         return self._mv[self._start:self._start + n]
 
+    def read_views(self, n=None) -> tuple:
+        """
+        Return the first n bytes of the window as a tuple of one memoryview (RingBuffer API),
+        return the entire window when n is undefined
+        """
+        return (self.peek(n),)
+
+    def startswith(self, term: bytes) -> bool:
+        """Check if the window starts with the search term"""
+        m = len(term)
+        return m <= self.size() and self._mv[self._start:self._start + m] == term
+
     def write(self, data:bytes):
         """Write new data into the writable region and advance the 'end' index"""
         if not isinstance(data, (bytes, bytearray, memoryview)):
@@ -114,9 +150,7 @@ class SlidingBuffer:
             self._compact()
             if needed > self.capacity - self._end:
                 raise BufferFullError()
-        buf = self._buffer
-        for i in range(needed):
-            buf[self._end + i] = data[i]
+        self._mv[self._end:self._end + needed] = data
         self._end += needed
 
     def consume(self, n: int=None):
@@ -149,9 +183,222 @@ class SlidingBuffer:
             raise ValueError("Capacity exceeded")
         self._end += n
 
+    def _skip_table(self, term: bytes) -> list:
+        """
+        Skip table of the search term
+        - fixed header terms: shared tables (SKIP)
+        - other term: one cached slot (multipart boundary)
+        """
+        table = SlidingBuffer.SKIP.get(term) if isinstance(term, bytes) else None
+        if table is None:
+            if self._skip[0] != term:
+                self._skip = (bytes(term), _skip_table(term))
+            table = self._skip[1]
+        return table
+
     def find(self, term: bytes) -> int:
         """Find and return the index of a search term in the current window"""
-        for i in range(self._start, self._end - len(term) + 1):
-            if self._mv[i : i+len(term)] == term:
-                return i - self._start
+        m = len(term)
+        if m == 0:
+            return 0
+        skip = self._skip_table(term)
+        mv, start, end = self._mv, self._start, self._end
+        last = term[m - 1]
+        i = start + m - 1
+        while i < end:
+            c = mv[i]
+            if c == last and mv[i - m + 1:i + 1] == term:
+                return i - m + 1 - start
+            i += skip[c]
+        return -1
+
+
+class RingBuffer(SlidingBuffer):
+    """
+    A circular (wrap-around) buffer over a fixed-size bytearray or its memoryview.
+
+    'start' is the read index, 'end' is the write index (modulo capacity),
+    the readable region is buffer[start:end] or buffer[start:capacity] + buffer[0:end]
+    when the window wraps around.
+
+    Key features:
+    - Same API as SlidingBuffer (MemoryPool wrapper): peek/read_views/startswith/consume/prepare/commit/find/write
+    - Writes never compact: data is copied around the wrap point (up to 2 slice copies)
+    - Zero-copy access to wrapped regions: read_views() and write_views() return up to two memoryviews,
+      find() and startswith() work across the wrap point
+    - Contiguous access (peek, readable_view) re-arranges the window in place only when it wraps around
+    """
+    __slots__ = ("_len",)
+
+    def __init__(self, buffer: bytearray|memoryview):
+        super().__init__(buffer)
+        self._len = 0
+
+    def size(self) -> int:
+        """Determine the window size"""
+        return self._len
+
+    def writable(self) -> int:
+        """Determine the writeable size of the buffer (total free space)"""
+        return self.capacity - self._len
+
+    def read_views(self, n=None) -> tuple:
+        """
+        Return up to two memoryviews of the first n bytes of the window (zero-copy),
+        return the entire window when n is undefined
+        """
+        if n is None:
+            n = self._len
+        if n > self._len or n < 0:
+            raise IndexError()
+        start = self._start
+        first = min(n, self.capacity - start)
+        if first == n:
+            return (self._mv[start:start + n],)
+        return self._mv[start:self.capacity], self._mv[0:n - first]
+
+    def write_views(self) -> tuple:
+        """Return up to two memoryviews to the writeable region of the buffer"""
+        end, start = self._end, self._start
+        if self._len == self.capacity:
+            return ()
+        if end < start:
+            return (self._mv[end:start],)
+        if start == 0:
+            return (self._mv[end:self.capacity],)
+        return self._mv[end:self.capacity], self._mv[0:start]
+
+    def readable_view(self) -> memoryview:
+        """Return a (contiguous) memoryview to the readable region of the buffer (window)"""
+        return self.peek()
+
+    def writable_view(self) -> memoryview:
+        """Return a memoryview to the contiguous writeable region of the buffer (up to the wrap point)"""
+        views = self.write_views()
+        return views[0] if views else self._mv[0:0]
+
+    def _compact(self):
+        """
+        Re-arrange the window to the beginning of the buffer (contiguous window)
+        - not wrapped: slice copies in non-overlapping chunks of 'start' bytes
+        - wrapped: shift the tail part right (backward, non-overlapping chunks),
+          then copy the head part to the beginning
+        """
+        start, n = self._start, self._len
+        if start == 0:
+            return
+        mv, cap = self._mv, self.capacity
+        n1 = cap - start
+        if n <= n1:
+            # Not wrapped window
+            _move_left(mv, 0, start, n)
+        else:
+            n2 = n - n1
+            # Head part is overwritten by the shifted tail part when free space is smaller (temp copy)
+            head = None if cap - n >= n1 else bytes(mv[start:cap])
+            # Shift tail part right by n1 (backward, non-overlapping chunks)
+            j = n2
+            while j > 0:
+                lo = max(0, j - n1)
+                mv[lo + n1:j + n1] = mv[lo:j]
+                j = lo
+            if head is None:
+                _move_left(mv, 0, start, n1)
+            else:
+                mv[0:n1] = head
+        self._start = 0
+        self._end = n % cap
+
+    def peek(self, n=None) -> memoryview:
+        """
+        Return the first n bytes from the window (contiguous),
+        return the entire window when n is undefined
+        """
+        if n is None:
+            n = self._len
+        if n > self._len or n < 0:
+            raise IndexError()
+        if self._start + n > self.capacity:
+            self._compact()
+        return self._mv[self._start:self._start + n]
+
+    def startswith(self, term: bytes) -> bool:
+        """Check if the window starts with the search term (across the wrap point, no re-arrange)"""
+        m = len(term)
+        if m > self._len:
+            return False
+        views = self.read_views(m)
+        if len(views) == 1:
+            return views[0] == term
+        n = len(views[0])
+        return views[0] == term[:n] and views[1] == term[n:]
+
+    def write(self, data:bytes):
+        """Write new data into the writable region (around the wrap point) and advance the 'end' index"""
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError("write() expects bytes or bytearray")
+        needed = len(data)
+        if needed > self.capacity - self._len:
+            raise BufferFullError()
+        end = self._end
+        first = min(needed, self.capacity - end)
+        if first < needed:
+            # Wrap around: split source without copy
+            data = memoryview(data)
+            self._mv[0:needed - first] = data[first:]
+        self._mv[end:end + first] = data[:first] if first < needed else data
+        self._end = (end + needed) % self.capacity
+        self._len += needed
+
+    def consume(self, n: int=None):
+        """Discard the first n bytes of the window by advancing the 'start' index"""
+        if n is None:
+            n = self._len
+        if n > self._len:
+            raise ValueError("Buffer underflow")
+        self._len -= n
+        self._start = (self._start + n) % self.capacity
+        if self._len == 0:
+            self._start = 0
+            self._end = 0
+
+    def prepare(self, n: int):
+        """
+        Check if the free space is larger or equal to n, and ensure
+        contiguous writeable region (writable_view) for n bytes
+        """
+        if n > self.capacity - self._len:
+            raise ValueError("Capacity exceeded")
+        if n > len(self.writable_view()):
+            self._compact()
+
+    def commit(self, n):
+        """Increase the window size by n bytes (written into writable_view) by advancing the 'end' index"""
+        if n > len(self.writable_view()):
+            raise ValueError("Capacity exceeded")
+        self._end = (self._end + n) % self.capacity
+        self._len += n
+
+    def find(self, term: bytes) -> int:
+        """Find and return the index of a search term in the current window (across the wrap point)"""
+        m = len(term)
+        if m == 0:
+            return 0
+        skip = self._skip_table(term)
+        mv, start, cap, size = self._mv, self._start, self.capacity, self._len
+        last = term[m - 1]
+        i = m - 1
+        while i < size:
+            p = start + i
+            c = mv[p - cap if p >= cap else p]
+            if c == last:
+                k = m - 2
+                while k >= 0:
+                    p = start + i - m + 1 + k
+                    if mv[p - cap if p >= cap else p] != term[k]:
+                        break
+                    k -= 1
+                if k < 0:
+                    return i - m + 1
+            i += skip[c]
         return -1
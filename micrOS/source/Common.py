@@ -4,7 +4,7 @@ micrOS Load Module programming Official API-s
 """
 from Server import Server, WebCli
 from Debug import syslog as debug_syslog, console_write
-from Logger import logger, log_get
+from Logger import logger, log_get, TimeSeries
 from Files import OSPath, path_join
 from microIO import resolve_pin
 from Tasks import TaskBase, Manager, lm_exec, lm_is_loaded
@@ -82,6 +82,23 @@ def exec_cmd(cmd:list, jsonify:bool=None, secure=False):
     return lm_exec(cmd, jsonify=jsonify)
 
 
+def exec_cmd_group(hosts:list, cmd:list, limit:int=4, timeout:int=10) -> dict:
+    """
+    [LM] Parallel (async) command execution on multiple devices (InterConnect fan-out)
+    - single task for all hosts: con.group.<module>.<hash> (tag: returned task creation dict key)
+    - per host: ESPNow first, socket fallback
+    :param hosts: hostname / IP address list, ex.: ['node01.local', 'node02.local']
+    :param cmd: command string list, ex.: ['rgb', 'toggle', 'False']
+    :param limit: max number of parallel host connections
+    :param timeout: deadline in seconds for all hosts
+    return task creation dict: {tag: state}
+        aggregated result (task output): {host: {'out': output, 'ms': latency, 'err': None | error}}
+        async usage: out = await micro_task(tag).await_result(timeout=timeout+1)
+    """
+    from InterConnect import send_cmd_group
+    return send_cmd_group(hosts, cmd, limit=limit, timeout=timeout)
+
+
 def notify(*args, **kwargs) -> bool:
     """
     [LM] micrOS common notification handler (Telegram, etc.)
@@ -161,7 +178,7 @@ def data_logger(f_name, data=None, limit=12, msgobj=None):
     - if data value => write mode
     :param f_name: log name (without extension, automatic: .dat, default folder: /data)
     :param data: data to append
-    :param limit: line limit (max.: 12 with short lines: limited disk speed!)
+    :param limit: line limit of one log segment (write-behind, append-only log)
     :param msgobj: socket stream object (set automatically!)
     """
     f_name = f_name if f_name.endswith('.dat') else f'{f_name}.dat'
@@ -174,6 +191,32 @@ def data_logger(f_name, data=None, limit=12, msgobj=None):
     return logger(data, f_name, limit)
 
 
+def data_series(f_name:str, data:dict=None, start:int=None, end:int=None, points:int=None, limit:int=1440):
+    """
+    [LM] micrOS Common binary time-series logger (fixed-width records in a ring buffer file)
+    - if data None => read mode: {'fields': ['epoch', ...], 'data': [[epoch, value, ...], ...]}
+    - if data dict => write mode, ex.: {'temp': 22.5, 'hum': 40}
+    :param f_name: series name (without extension, automatic: .tsd, default folder: /data)
+    :param data: sample dict (field: value) - int: int32, float: float32, new field names recreate the file
+    :param start: read from unix epoch (sec)
+    :param end: read until unix epoch (sec)
+    :param points: read downsampled to max number of points (averaged)
+    :param limit: max number of records (ring buffer capacity on file creation)
+    """
+    f_name = f_name if f_name.endswith('.tsd') else f'{f_name}.tsd'
+    f_path = path_join(OSPath.DATA, f_name)
+    try:
+        if data is None:
+            series = TimeSeries.get(f_path)
+            return {'fields': ('epoch',) + series.names,
+                    'data': [[r[0]] + [round(v, 3) for v in r[1:]] for r in series.query(start, end, points)]}
+        fields = {k: 'i' if isinstance(v, int) else 'f' for k, v in data.items()}
+        return TimeSeries.get(f_path, fields, limit).append(data.values())
+    except Exception as e:
+        debug_syslog(f"[ERR] data_series {f_name}: {e}")
+    return {} if data is None else False
+
+
 def syslog(msg):
     """ Wrapper of debug_syslog """
     return debug_syslog(f"{msg}")
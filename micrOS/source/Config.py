@@ -17,11 +17,16 @@ from json import load, dump
 from Debug import DebugCfg, console_write, syslog
 from Files import OSPath, path_join, is_file
 from uos import remove, rename
+from utime import ticks_ms, ticks_diff
 try:
     from microIO import set_pinmap
 except:
     syslog("[ERR] microIO import: set_pinmap")
     set_pinmap = None
+try:
+    from Logger import log_level
+except:
+    log_level = None
 
 
 class Config:
@@ -31,15 +36,25 @@ class Config:
     __slots__ = (
         "version", "auth", "staessid", "stapwd", "devfid", "appwd", "dbg", "nwmd",
         "hwuid", "soctout", "socport", "webui", "webui_max_con", "devip", "cron",
-        "crontasks", "timirq", "timirqcbf", "timirqseq", "irq1", "irq1_cbf",
+        "crontasks", "aiocron", "timirq", "timirqcbf", "timirqseq", "irq1", "irq1_cbf",
         "irq1_trig", "irq2", "irq2_cbf", "irq2_trig", "irq3", "irq3_cbf", "irq3_trig",
         "irq4", "irq4_cbf", "irq4_trig", "irq_prell_ms", "boothook", "aioqueue",
-        "utc", "boostmd", "guimeta", "cstmpmap", "espnow", "ha")
+        "aioshed", "utc", "lat", "lon", "boostmd", "guimeta", "cstmpmap", "espnow", "ha", "loglvl")
 
     CONFIG_NAME = "node_config.json"
     CONFIG_PATH = path_join(OSPath.CONFIG, CONFIG_NAME)
     INSTANCE = None
     OFFLOADED_VALUE = "..."
+    WATCHERS = {}               # Config change callbacks: {key: [callback, ...]}
+    DIRTY = None                # Unsaved changes: ticks_ms of the last cfgput (None: saved)
+    DEBOUNCE_MS = 500           # Coalesce cfgput writes within this window (when flusher is active)
+    DEFERRED = False            # Debounced write mode - enabled by periodic cfgflush calls (idle task)
+    BATCH = 0                   # cfgbatch nesting level
+    UNDO = {}                   # cfgbatch rollback values: {key: value before batch}
+    KEY_CACHE = []              # Offloaded key LRU read cache: [[key, value], ...] - most recent last
+    KEY_CACHE_BUDGET = 4096     # Offloaded key cache memory budget (sum of cached value lengths)
+                                # - fits a multi widget guimeta + crontasks, trade-off: RAM held vs. file reads
+                                # - bigger values are read from file on every access (cfgstream: chunked)
 
     # [CONFIG] Configuration parameters
     def __init__(self):
@@ -48,10 +63,12 @@ class Config:
         self.appwd = "ADmin123"     # Device password / webrepl / AP password
         self.boothook = "n/a"       # Boot tasks
         self.aioqueue = 5           # Maximum number of tasks
+        self.aioshed = "none"       # Task shed policy on full queue: none, loop, prio
         self.boostmd = True         # Boost mode: High CPU setup
         self.cstmpmap = "n/a"       # Custom pin mapping IO/Individual tags
         self.ha = True              # High Availability feature: STA connect. monitoring (3min) and WDT (30sec)
         self.dbg = True             # Debug console prints + Built-In LED flashing while processing
+        self.loglvl = "user"        # Min. persisted syslog level: err, warn, boot, info, user (all)
         self.version = "n/a"        # Metadata
         self.hwuid = "n/a"          # Metadata
         self.guimeta = "..."        # Metadata - client/app GUI (offloaded key)
@@ -60,6 +77,8 @@ class Config:
         self.staessid = "your_wifi_name"
         self.stapwd = "your_wifi_passwd"
         self.utc = +60
+        self.lat = "n/a"            # Location latitude (sun times) - automatic by geolocation in STA mode
+        self.lon = "n/a"            # Location longitude (sun times)
         self.soctout = 30
         self.socport = 9008
         self.devip = "n/a"
@@ -76,6 +95,7 @@ class Config:
         # -- Timer 1
         self.cron = False
         self.crontasks = "n/a"
+        self.aiocron = False        # Cron as async task (instead of Timer 1)
         # -- Event "button" - external
         self.irq1 = False
         self.irq1_cbf = "n/a"
@@ -129,6 +149,9 @@ class Config:
                 console_write(f"[PIN MAP] {pinmap}")
             except Exception as e:
                 console_write(f"\n[PIN MAP] !!! SETUP ERROR !!!: {e}\n")
+        # SET syslog min. persisted level (inject user conf)
+        if callable(log_level):
+            log_level(cls.INSTANCE.get('loglvl'))
         # SET dbg based on config settings (inject user conf)
         DebugCfg.DEBUG = cls.INSTANCE.get('dbg')
         if DebugCfg.DEBUG:
@@ -174,30 +197,68 @@ class Config:
 
     @staticmethod
     def read_cfg_file():
-        if not is_file(Config.CONFIG_PATH):
-            return {}
-        try:
-            with open(Config.CONFIG_PATH, 'r') as f:
-                return load(f)
-        except Exception as e:
-            syslog(f'[ERR] read_cfg_file error: {e}')
+        """
+        Load config file, fallback order:
+        - config file (on parse error moved to .bad - quarantine, keeps the last corrupted one)
+        - .tmp file of an interrupted write-then-rename
+        """
+        tmp_path = f"{Config.CONFIG_PATH}.tmp"
+        for path in (Config.CONFIG_PATH, tmp_path):
+            if not is_file(path):
+                continue
             try:
-                rename(Config.CONFIG_PATH, f"{Config.CONFIG_PATH}.bad")
-                console_write(f"[CONF] Corrupted config moved: {Config.CONFIG_PATH}.bad")
-            except Exception as e2:
-                syslog(f'[ERR] read_cfg_file quarantine failed: {e2}')
-            return {}
+                with open(path, 'r') as f:
+                    conf = load(f)
+                if path == tmp_path:
+                    # Complete the interrupted write: promote .tmp to config
+                    rename(tmp_path, Config.CONFIG_PATH)
+                    console_write(f"[CONF] Restored config from {tmp_path}")
+                return conf
+            except Exception as e:
+                syslog(f'[ERR] read_cfg_file error: {e}')
+                bad_path = f"{Config.CONFIG_PATH}.bad"
+                try:
+                    if is_file(bad_path):
+                        # rename does not overwrite (littlefs): drop the older quarantined config
+                        remove(bad_path)
+                    rename(path, bad_path)
+                    console_write(f"[CONF] Corrupted config moved: {bad_path}")
+                except Exception as e2:
+                    syslog(f'[ERR] read_cfg_file quarantine failed: {e2}')
+        return {}
 
     @staticmethod
     def write_cfg_file():
+        """
+        Atomic config write: dump into .tmp then rename over the config file
+        - power loss leaves either the old or the new config (never a partial one)
+        """
+        tmp_path = f"{Config.CONFIG_PATH}.tmp"
         try:
-            with open(Config.CONFIG_PATH, 'w') as f:
+            with open(tmp_path, 'w') as f:
                 dump({key: value for key, value in Config.INSTANCE.items()}, f)
+            try:
+                rename(tmp_path, Config.CONFIG_PATH)
+            except OSError:
+                # Filesystem without rename-replace support: .tmp is kept until rename (read_cfg_file fallback)
+                remove(Config.CONFIG_PATH)
+                rename(tmp_path, Config.CONFIG_PATH)
+            Config.DIRTY = None
             return True
         except Exception as e:
             syslog(f'[ERR] write_cfg_file {Config.CONFIG_PATH}: {e}')
             return False
 
+    @staticmethod
+    def persist():
+        """
+        Write config file now OR mark as dirty (cfgbatch / debounced write - cfgflush)
+        """
+        Config.DIRTY = ticks_ms()
+        if Config.BATCH or Config.DEFERRED:
+            return True
+        return Config.write_cfg_file()
+
     @staticmethod
     def type_handler(key, value):
         value_in_cfg = Config.INSTANCE.get(key)
@@ -218,28 +279,76 @@ class Config:
             console_write(f"Input value type error! {e}")
         return None
 
+    @staticmethod
+    def cache_get(key):
+        """
+        Offloaded key LRU cache lookup - hit moves the key to most recent
+        Returns cached value or None
+        """
+        for i, item in enumerate(Config.KEY_CACHE):
+            if item[0] == key:
+                if i != len(Config.KEY_CACHE) - 1:
+                    Config.KEY_CACHE.append(Config.KEY_CACHE.pop(i))
+                return item[1]
+        return None
+
+    @staticmethod
+    def cache_put(key, value=None):
+        """
+        Offloaded key LRU cache update
+        - value None: invalidate key
+        - evict least recently used keys over KEY_CACHE_BUDGET
+        - value over the budget is not cached (use cfgstream)
+        """
+        Config.KEY_CACHE = [item for item in Config.KEY_CACHE if item[0] != key]
+        if value is None or len(value) > Config.KEY_CACHE_BUDGET:
+            return False
+        Config.KEY_CACHE.append([key, value])
+        size = sum(len(item[1]) for item in Config.KEY_CACHE)
+        while size > Config.KEY_CACHE_BUDGET:
+            size -= len(Config.KEY_CACHE.pop(0)[1])
+        return True
+
     @staticmethod
     def disk_keys(key, value=None):
         """
         Store/Restore (long) str value in/from separate file based on key
-        These kind of parameters are not cached in memory
+        These kind of parameters are not stored in the config instance,
+        reads are cached in the offloaded key LRU cache (KEY_CACHE_BUDGET)
         """
         # Write str value to file
         offloaded_key = path_join(OSPath.CONFIG, f'.{key}.key')
         if isinstance(value, str) and Config.keys(key):
+            Config.cache_put(key)
             try:
                 with open(offloaded_key, 'w') as f:
                     f.write(value)
                 return True
             except Exception:
                 return False
-        # Read str value from file
+        # Read str value from cache / file
+        value = Config.cache_get(key)
+        if value is not None:
+            return value
         try:
             with open(offloaded_key, 'r') as f:
-                return f.read().strip()
+                value = f.read().strip()
         except Exception:
             # Return default value if key not exists
             return 'n/a'
+        Config.cache_put(key, value)
+        return value
+
+    @staticmethod
+    def notify(key, value):
+        """
+        Call registered change callbacks (cfgwatch) of the key
+        """
+        for callback in Config.WATCHERS.get(key, ()):
+            try:
+                callback(value)
+            except Exception as e:
+                syslog(f'[ERR] cfgwatch {key} callback: {e}')
 
     @staticmethod
     def validate_pwd(password):
@@ -275,6 +384,38 @@ def cfgget(key=None):
         syslog(f'[ERR] cfgget {key} error: {e}')
     return None
 
+def cfgstream(key, chunk_size=256):
+    """
+    Read config value as str chunks (generator)
+    - large offloaded keys are read from file chunk by chunk (no big string allocation)
+    :param key: config key
+    :param chunk_size: max chunk length
+    """
+    val = Config.INSTANCE.get(key)
+    if val is None:
+        # Missing key: no value
+        return
+    if val != Config.OFFLOADED_VALUE:
+        yield val if isinstance(val, str) else str(val)
+        return
+    val = Config.cache_get(key)
+    if val is not None:
+        yield val
+        return
+    try:
+        f = open(path_join(OSPath.CONFIG, f'.{key}.key'), 'r')
+    except Exception:
+        # Default value if key not exists
+        yield 'n/a'
+        return
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
 def cfgput(key, value, type_check=False):
     if key == 'appwd':
         is_valid, verdict = Config.validate_pwd(value)
@@ -283,7 +424,10 @@ def cfgput(key, value, type_check=False):
     # Handle special "offloaded" keys
     cache_value = Config.INSTANCE.get(key)
     if cache_value == Config.OFFLOADED_VALUE:
-        return Config.disk_keys(key, value)
+        state = Config.disk_keys(key, value)
+        if state:
+            Config.notify(key, value)
+        return state
     # Handle regular keys
     if cache_value == value:
         return True
@@ -295,17 +439,94 @@ def cfgput(key, value, type_check=False):
             return False
         if not Config.keys(key):
             return False
+        if Config.BATCH and key not in Config.UNDO:
+            Config.UNDO[key] = cache_value
         Config.INSTANCE.set(key, value)
-        Config.write_cfg_file()
+        Config.persist()
+        Config.notify(key, value)
         del value
         return True
     except Exception as e:
         syslog(f'[ERR] cfgput {key} error: {e}')
         return False
 
+
+def cfgwatch(key, callback):
+    """
+    Register config change callback
+    :param key: config key to watch
+    :param callback: function called with the new value after successful cfgput
+    """
+    if Config.keys(key):
+        Config.WATCHERS.setdefault(key, []).append(callback)
+        return True
+    return False
+
+class _CfgBatch:
+    """
+    cfgbatch context - see cfgbatch
+    """
+
+    def __enter__(self):
+        if Config.BATCH == 0:
+            Config.UNDO = {}
+        Config.BATCH += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Config.BATCH -= 1
+        if Config.BATCH > 0:
+            return False
+        undo, Config.UNDO = Config.UNDO, {}
+        if exc_type is not None:
+            # Rollback: restore values (and watchers) changed in the batch
+            for key, value in undo.items():
+                Config.INSTANCE.set(key, value)
+                Config.notify(key, value)
+            syslog(f"[WARN] cfgbatch rollback: {tuple(undo)}")
+            return False
+        if Config.DIRTY is not None and not Config.DEFERRED:
+            Config.write_cfg_file()
+        return False
+
+
+def cfgbatch():
+    """
+    Transactional config update - single config write for multiple cfgput calls
+        with cfgbatch():
+            cfgput('staessid', ...)
+            cfgput('stapwd', ...)
+    - config file is written once at the end of the (outermost) batch
+    - exception in the batch: changed keys are restored, nothing written
+    Note: offloaded keys (disk_keys) are written immediately, not part of the rollback
+    """
+    return _CfgBatch()
+
+
+def cfgflush(force=False):
+    """
+    Debounced config write - called periodically by the idle task
+    - first call enables deferred writes: cfgput only marks the config dirty,
+      the file is written when no cfgput happened in the last DEBOUNCE_MS
+    :param force: write pending changes now (reboot/reset)
+    """
+    if not force:
+        Config.DEFERRED = True
+    if Config.DIRTY is None or Config.BATCH:
+        return False
+    if force or ticks_diff(ticks_ms(), Config.DIRTY) >= Config.DEBOUNCE_MS:
+        if Config.write_cfg_file():
+            return True
+        # Single write attempt (error logged by write_cfg_file), runtime value is kept
+        Config.DIRTY = None
+    return False
+
+
 #################################################################
 #                       MODULE AUTO INIT                        #
 #################################################################
 
 # [!!!] Validate / update / create user config + sidecar functions
 Config.init()
+if callable(log_level):
+    cfgwatch('loglvl', log_level)
@@ -14,12 +14,13 @@ from socket import getaddrinfo, SOCK_STREAM
 from re import compile as re_compile
 from json import loads
 from binascii import hexlify
-from uasyncio import open_connection
+from uasyncio import open_connection, Lock, Event, get_event_loop, wait_for, TimeoutError
+from utime import ticks_ms, ticks_diff
 
 from Debug import syslog
 from Config import cfgget
 from Server import Server
-from Tasks import NativeTask
+from Tasks import NativeTask, TaskBase
 
 if cfgget('espnow'):
     from mespnow import ESPNowSS
@@ -32,6 +33,10 @@ class InterCon:
     CONN_MAP: dict[str, str] = {}   # hostname: IP address pairs
     NO_ESPNOW: list[str] = []       # disabled ESPNow hostname list (cache for fallback speed-up)
     PORT = cfgget('socport')
+    POOL: dict[str, list] = {}      # persistent (authenticated) shell sessions: {IP: [reader, writer, prompt, lock, last used ms]}
+    POOL_SIZE = 4                   # max number of persistent sessions
+    POOL_IDLE_MS = 2_500            # idle session eviction: a pooled session holds one of the remote server
+                                    # slots (shared with its WebUI and shell: aioqueue), release them quickly
 
     def __init__(self):
         self.reader = None
@@ -76,19 +81,44 @@ class InterCon:
                 host = InterCon.CONN_MAP[hostname]
         # If IP address is available, send msg to the endpoint
         if InterCon.validate_ipv4(host):
+            self.reader, self.writer = None, None
+            session = InterCon.POOL.get(host, None) or InterCon._pool_add(host)
+            output = None
             try:
-                # Create socket object
-                self.reader, self.writer = await open_connection(host, InterCon.PORT)
-                # Send command over TCP/IP
-                output = await self.__run_command(cmd, hostname)
+                if session is None:
+                    # Pool is full: one-shot connection
+                    output = await self.__run_once(cmd, host, hostname)
+                else:
+                    # Persistent session - commands are serialized (queued) per host
+                    async with session[3]:
+                        if InterCon.POOL.get(host, None) is not session:
+                            # Session dropped (failed) or evicted while waiting for the lock: one-shot connection
+                            session = None
+                            output = await self.__run_once(cmd, host, hostname)
+                        else:
+                            try:
+                                if session[1] is None:
+                                    # Create socket object, validate prompt (+auth)
+                                    session[2] = await self.__connect(host, hostname)
+                                    session[0], session[1] = self.reader, self.writer
+                                self.reader, self.writer = session[0], session[1]
+                                if session[2] is not None:
+                                    output = await self.__run_command(cmd, session[2])
+                                session[4] = ticks_ms()
+                            finally:
+                                if output is None:
+                                    # Failed session (closed by peer, remote busy, desync) - drop and close it
+                                    # before the lock is released: remote slot is freed, queued commands
+                                    # (and retry) open a new connection
+                                    InterCon.POOL.pop(host, None)
+                                    await InterCon._close(self.writer)
             except OSError as e:
                 Server.reply_all(f"[intercon] NoHost: {e}")
                 syslog(f"[intercon] send_cmd {host} oserr: {e}")
                 output = None
             finally:
-                if self.writer:
-                    self.writer.close()
-                    await self.writer.wait_closed()
+                if session is None:
+                    await InterCon._close(self.writer)
 
             # Cache successful connection data (hostname:IP)
             if hostname is not None:
@@ -99,30 +129,50 @@ class InterCon:
         syslog(f"[ERR][intercon] Invalid host: {host}")
         return ''
 
-    async def __run_command(self, cmd:list, hostname:str):
+    async def __connect(self, host:str, hostname:str):
         """
-        Implements receive data on open connection, command query and result collection
-        :param cmd: command string to server socket shell
+        Open connection and receive prompt (with auth handshake)
+        :param host: IP address
         :param hostname: hostname for prompt checking
-        Return None here will trigger retry mechanism... + deletes cached IP
+        Return prompt OR None (server busy, prompt mismatch)
         """
-        data, prompt = await self.__receive_data()
-        if "Connection is busy. Bye!" in prompt:
+        self.reader, self.writer = await open_connection(host, InterCon.PORT)
+        _, prompt = await self.__receive_data()
+        if prompt is None or "Connection is busy. Bye!" in prompt:
             return None
         # Compare prompt |node01 $| with hostname 'node01.local'
-        if hostname is None or prompt is None or str(prompt).replace('$', '').strip() == str(hostname).split('.')[0]:
-            # Run command on validated device
-            self.writer.write(str.encode(' '.join(cmd)))
-            await self.writer.drain()
-            data, _ = await self.__receive_data(prompt=prompt)
-            if data == '\0':
-                return None
-            # Successful data receive, return data
-            return data
+        if hostname is None or str(prompt).replace('$', '').strip() == str(hostname).split('.')[0]:
+            return prompt
         # Skip command run: prompt and host not the same!
         Server.reply_all(f"[intercon] prompt mismatch, hostname: {hostname} prompt: {prompt}")
         return None
 
+    async def __run_once(self, cmd:list, host:str, hostname:str):
+        """
+        One-shot connection: connect, validate prompt and run command (closed by the caller)
+        Return output OR None
+        """
+        prompt = await self.__connect(host, hostname)
+        if prompt is None:
+            return None
+        return await self.__run_command(cmd, prompt)
+
+    async def __run_command(self, cmd:list, prompt:str):
+        """
+        Implements command query and result collection on open connection
+        :param cmd: command string to server socket shell
+        :param prompt: validated prompt of the connection
+        Return None here will trigger retry mechanism... + deletes cached IP
+        """
+        # Run command on validated device
+        self.writer.write(str.encode(' '.join(cmd)))
+        await self.writer.drain()
+        data, _ = await self.__receive_data(prompt=prompt)
+        if data is None or data == '\0':
+            return None
+        # Successful data receive, return data
+        return data
+
     async def __auth_handshake(self, prompt):
         try:
             self.writer.write(self.auth_pwd)
@@ -131,7 +181,7 @@ class InterCon:
         except Exception as e:
             syslog(f'[intercon][ERR] Auth: {e}')
             data = 'AuthFailed'
-        if 'AuthOk' in data:
+        if data and 'AuthOk' in data:
             return True             # AuthOk
         return False                # AuthFailed
 
@@ -139,6 +189,7 @@ class InterCon:
         """
         Implements data receive loop until prompt / [configure] / Bye!
         :param prompt: socket shell prompt
+        Return data is None when the connection was closed before the prompt
         """
         data = ""
         # Collect answer data
@@ -146,7 +197,8 @@ class InterCon:
             try:
                 last_data = await self.reader.read(128)
                 if not last_data:
-                    break
+                    # Connection closed by peer (stale persistent session)
+                    return None, prompt
                 last_data = last_data.decode('utf-8').strip()
                 # First data is prompt, get it
                 prompt = last_data.strip() if prompt is None else prompt
@@ -165,6 +217,53 @@ class InterCon:
         data = data.replace(prompt, '').replace('\n', ' ')
         return data, prompt
 
+    @staticmethod
+    async def _close(writer):
+        if writer is None:
+            # Not connected (session created, connection failed)
+            return
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception as e:
+            syslog(f"[intercon] close: {e}")
+
+    @staticmethod
+    def _pool_add(host:str):
+        """
+        Create (not connected) persistent session in POOL, evict least recently used idle session when full
+        Return session OR None (pool is full with busy sessions)
+        """
+        pool = InterCon.POOL
+        if len(pool) >= InterCon.POOL_SIZE:
+            idle = [(s[4], h) for h, s in pool.items() if not s[3].locked()]
+            if not idle:
+                return None
+            _, lru_host = min(idle)
+            writer = pool.pop(lru_host)[1]
+            if writer is not None:
+                NativeTask().create(callback=InterCon._close(writer))
+        pool[host] = session = [None, None, None, Lock(), ticks_ms()]
+        # Start idle session eviction
+        if not TaskBase.is_busy('con.pool'):
+            NativeTask().create(callback=InterCon._pool_gc(), tag='con.pool')
+        return session
+
+    @staticmethod
+    async def _pool_gc(tag:str='con.pool'):
+        """
+        Close idle persistent sessions (POOL_IDLE_MS), stops when the pool is empty
+        """
+        with TaskBase.TASKS.get(tag) as my_task:
+            while InterCon.POOL:
+                await my_task.feed(sleep_ms=500)
+                for host, session in list(InterCon.POOL.items()):
+                    if not session[3].locked() and ticks_diff(ticks_ms(), session[4]) > InterCon.POOL_IDLE_MS:
+                        InterCon.POOL.pop(host, None)
+                        await InterCon._close(session[1])
+                my_task.out = f"sessions: {', '.join(InterCon.POOL)}"
+            my_task.out = "sessions: -"
+
     async def auto_espnow_handshake(self, host:str) -> dict:
         """
         [1] Check espnow.server running on host
@@ -208,6 +307,30 @@ async def _socket_send_cmd(host:str, cmd:list, com_obj:InterCon) -> None:
     com_obj.task.out = '' if out is None else out
 
 
+async def _espnow_send_cmd(host:str, cmd:list|str):
+    """
+    ESPNow send with result waiting (known ESPNow peers only)
+    :param host: hostname / IP address
+    :param cmd: command string list or string
+    Return output OR None (not an ESPNow peer, timeout -> socket fallback)
+    """
+    name = str(host).split(".")[0]   # host.local -> host
+    if name in InterCon.NO_ESPNOW or name not in list(ESPNowSS().devices.values()):
+        return None
+    if isinstance(cmd, list):
+        cmd = ' '.join(cmd)
+    # Send command and retrieve result
+    sender = ESPNowSS().send(peer=name, msg=cmd)
+    sender_task = NativeTask.TASKS.get(list(sender.keys())[0])
+    if sender_task is None:
+        return None
+    result = await sender_task.await_result(timeout=10)
+    if result == "Timeout has beed exceeded":
+        return None
+    sender_task.out = "Redirected to ParentTask"    # Remove redundant data in embedded mode
+    return result
+
+
 async def _send_cmd(host:str, cmd:list|str, com_obj:InterCon):
     """
     Top level InterConnect callback function
@@ -220,19 +343,11 @@ async def _send_cmd(host:str, cmd:list|str, com_obj:InterCon):
         if ESPNowSS:
             # [1] ESPNow Active
             name = str(host).split(".")[0]   # host.local -> host
-            if name not in InterCon.NO_ESPNOW and name in list(ESPNowSS().devices.values()):
-                com_obj.task.out = "Redirected to ESPNow"
-                if isinstance(cmd, list):
-                    cmd = ' '.join(cmd)
-                # Send command and retrieve result
-                sender = ESPNowSS().send(peer=name, msg=cmd)
-                sender_task = NativeTask.TASKS.get(list(sender.keys())[0])
-                result = await sender_task.await_result(timeout=10)
-                if result != "Timeout has beed exceeded":
-                    # Successful command execution
-                    com_obj.task.out = result                       # Output mirroring: Child -> Parent
-                    sender_task.out = "Redirected to ParentTask"    # Remove redundant data in embedded mode
-                    return
+            result = await _espnow_send_cmd(host, cmd)
+            if result is not None:
+                # Successful command execution
+                com_obj.task.out = result                       # Output mirroring: Child -> Parent
+                return
 
         # Handle legacy string input
         if isinstance(cmd, str):
@@ -247,6 +362,57 @@ async def _send_cmd(host:str, cmd:list|str, com_obj:InterCon):
                 syslog(str(list(verdict.values())[0]))
 
 
+async def _gather_cmd(hosts:list, cmd:list|str, limit:int, timeout:int, tag:str):
+    """
+    Fan-out InterConnect callback function - one command on many hosts
+        - per host: ESPNow first, socket fallback (like _send_cmd)
+        - bounded concurrency: limit workers share the host queue
+        - deadline: unanswered hosts are reported with Timeout
+    Task output: {host: {'out': output, 'ms': latency, 'err': None | error}}
+    """
+    with TaskBase.TASKS.get(tag) as my_task:
+        if isinstance(cmd, str):
+            cmd = cmd.split()
+        result = {host: {'out': None, 'ms': timeout * 1000, 'err': 'Timeout'} for host in hosts}
+        queue = list(result)
+        finished = Event()
+
+        async def _worker():
+            nonlocal workers
+            com_obj = InterCon()
+            try:
+                while queue:
+                    host = queue.pop(0)
+                    start = ticks_ms()
+                    out, err = None, None
+                    try:
+                        if ESPNowSS:
+                            out = await _espnow_send_cmd(host, cmd)
+                        if out is None:
+                            await _socket_send_cmd(host, cmd, com_obj)
+                            out = com_obj.task.out
+                        err = None if out else 'NoReply'
+                    except Exception as e:
+                        err = str(e)
+                    result[host] = {'out': out, 'ms': ticks_diff(ticks_ms(), start), 'err': err}
+            finally:
+                workers -= 1
+                if workers <= 0:
+                    finished.set()
+
+        my_task.out = f"Gather {len(result)} hosts"
+        workers = min(max(1, limit), len(result))
+        tasks = [get_event_loop().create_task(_worker()) for _ in range(workers)]
+        try:
+            if tasks:
+                await wait_for(finished.wait(), timeout)
+        except TimeoutError:
+            # Deadline: stop pending hosts, keep Timeout state
+            for task in tasks:
+                task.cancel()
+        my_task.out = result
+
+
 def send_cmd(host:str, cmd:list|str) -> dict:
     """
     Top level InterConnect send task creation
@@ -265,6 +431,18 @@ def send_cmd(host:str, cmd:list|str) -> dict:
     return com_obj.task.create(callback=_send_cmd(host, cmd, com_obj), tag=task_id)
 
 
+def send_cmd_group(hosts:list, cmd:list|str, limit:int=4, timeout:int=10) -> dict:
+    """
+    Top level InterConnect fan-out task creation
+        One task for all hosts, aggregated output: {host: {'out', 'ms', 'err'}}
+        Task tag: con.group.<module>.<hosts+command hash> (same group command: already running)
+    """
+    _cmd = ' '.join(cmd) if isinstance(cmd, list) else cmd
+    _hash = hash(' '.join(hosts) + '|' + _cmd) & 0xffffff
+    task_id = f"con.group.{_cmd.split()[0]}.{_hash:06x}"
+    return NativeTask().create(callback=_gather_cmd(hosts, cmd, limit, timeout, task_id), tag=task_id)
+
+
 def host_cache() -> dict:
     """
     Dump InterCon connection cache
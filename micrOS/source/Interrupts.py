@@ -20,11 +20,11 @@ from machine import Pin
 from utime import ticks_ms, ticks_diff
 from Config import cfgget
 from Debug import console_write, syslog
-from Tasks import exec_lm_pipe_schedule
+from Tasks import exec_lm_pipe_schedule, LMPipe, Manager
 from microIO import resolve_pin
 if cfgget('cron'):
     # Only import when enabled - memory usage optimization
-    from Scheduler import scheduler
+    from Scheduler import scheduler, aio_scheduler, CronTable
 
 #################################################################
 #            CONFIGURE INTERRUPT MEMORY BUFFER                  #
@@ -61,8 +61,8 @@ def enableInterrupt():
     console_write(f"|- [IRQ] TIMIRQ CBF:{cfgget('timirqcbf')}")
     if cfgget("timirq"):
         from machine import Timer
-        # INIT TIMER IRQ with callback function wrapper
-        lm_cbf = cfgget('timirqcbf')
+        # INIT TIMER IRQ with callback function wrapper (pre-parsed pipeline)
+        lm_cbf = LMPipe.get('timirqcbf')
         timer = Timer(0)
         timer.init(period=int(cfgget("timirqseq")), mode=Timer.PERIODIC,
                    callback=lambda timer: exec_lm_pipe_schedule(lm_cbf))
@@ -74,14 +74,20 @@ def enableInterrupt():
 
 def enableCron():
     """
-    Set time stump based scheduler aka cron on Timer1
-    Input: cron(bool), crontasks(str)
+    Set time stump based scheduler aka cron on Timer1 OR as async task (aiocron)
+    Input: cron(bool), crontasks(str), aiocron(bool)
     This is for low frequency sampling, like 12 or 6 / minute (due to low power mode compatibility)
     """
     timer_period = 5000         # Timer period ms: 12 check/min
-    console_write(f"[IRQ] CRON IRQ SETUP: {cfgget('cron')} SEQ: {timer_period}")
+    console_write(f"[IRQ] CRON IRQ SETUP: {cfgget('cron')} SEQ: {timer_period} ASYNC: {cfgget('aiocron')}")
     console_write(f"|- [IRQ] CRON CBF:{cfgget('crontasks')}")
     if cfgget("cron") and cfgget('crontasks').lower() != 'n/a':
+        # Precompile cron table (avoid config read in IRQ context)
+        CronTable.build()
+        if cfgget('aiocron'):
+            # INIT ASYNC CRON TASK - sleeps until next due task (no hardware timer)
+            Manager.create_task(callback=aio_scheduler(tag='cron'), tag='cron')
+            return
         from machine import Timer
         # INIT TIMER 1 IRQ with callback function wrapper
         sampling = int(timer_period/1000)
@@ -173,4 +179,4 @@ def initEventIRQs():
         console_write(f"|- [IRQ] EXTIRQ CBF: {irq_cbf}")
         # Init external IRQx
         if irq_en and irq_cbf != 'n/a':
-            __core(_pin=__get_pin(f"irq{i}"), _trig=irq_trig, _lm_cbf=irq_cbf)
+            __core(_pin=__get_pin(f"irq{i}"), _trig=irq_trig, _lm_cbf=LMPipe.get(f"irq{i}_cbf"))
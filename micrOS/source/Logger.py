@@ -1,18 +1,35 @@
 """
 Module is responsible for System and User logging
-- built-in log rotation
+- append-only segmented logs (rotation: drop the oldest segment)
+- write-behind queue (flushed by the idle task, on read, over QUEUE_MAX and on [ERR] syslog)
+- binary time-series ring buffer files (.tsd)
+- in-RAM syslog ring with severity filtered persistence (loglvl)
 
 Designed by Marcell Ban aka BxNxM
 """
-from time import localtime
-from re import match
-from uos import remove
-from Files import OSPath, path_join, ilist_fs, is_dir
+from time import localtime, time, gmtime
+from struct import pack, unpack_from, calcsize
+from uos import remove, rename
+from Files import OSPath, path_join, ilist_fs, is_dir, is_file
 
 #############################################
 #        LOGGING WITH DATA ROTATION         #
 #############################################
 
+
+class Log:
+    SEGMENTS = 2                # Segments per log: active + rotated ones (log.ext, log.1.ext, ...)
+    QUEUE_MAX = 16              # Max. pending lines in RAM - sync flush over it
+    QUEUE: dict[str, list] = {} # Write-behind queue: {f_path: [line, ...]}
+    LIMIT: dict[str, int] = {}  # Segment line limit: {f_path: limit}
+    LINES: dict[str, int] = {}  # Active segment line counter: {f_path: lines}
+    PENDING = 0                 # Number of queued lines
+    LEVELS = {"err": 4, "warn": 3, "boot": 2, "info": 1, "user": 0}     # syslog severities
+    MIN_LVL = 0                 # Min. persisted syslog severity (loglvl)
+    RING = [None] * 32          # In-RAM syslog ring: (epoch, level, persisted, msg)
+    RING_IDX = 0
+
+
 def _init_logger():
     """ Init /logs folder """
     if not is_dir(OSPath.LOGS):
@@ -30,72 +47,151 @@ def _dir_select(f_name:str) -> str:
     return OSPath.DATA
 
 
+def _segment(f_path:str, index:int) -> str:
+    """
+    Segment file path: 0: err.sys.log (active), 1: err.1.sys.log, ...
+    """
+    if index == 0:
+        return f_path
+    head, sep, f_name = f_path.rpartition('/')
+    name, _, ext = f_name.partition('.')
+    return f"{head}{sep}{name}.{index}.{ext}" if ext else f"{head}{sep}{name}.{index}"
+
+
+def _timestamp(epoch:int=None) -> str:
+    """ Log time stamp: 2024.1.5-9:3:0 """
+    ts_buff = [str(k) for k in (localtime() if epoch is None else localtime(epoch))]
+    return ".".join(ts_buff[0:3]) + "-" + ":".join(ts_buff[3:6])
+
+
+def _count_lines(f_path:str) -> int:
+    """ Count lines of the active segment (once per boot) """
+    cnt = 0
+    try:
+        with open(f_path, 'r') as f:
+            for _ in f:
+                cnt += 1
+    except OSError:
+        pass
+    return cnt
+
+
+def _rotate(f_path:str):
+    """
+    Drop the oldest segment, shift the others: log.ext -> log.1.ext -> ...
+    """
+    for index in range(Log.SEGMENTS - 1, 0, -1):
+        try:
+            if index == Log.SEGMENTS - 1:
+                remove(_segment(f_path, index))
+        except OSError:
+            pass
+        try:
+            rename(_segment(f_path, index - 1), _segment(f_path, index))
+        except OSError:
+            pass
+
+
+def _flush(f_path:str) -> bool:
+    """
+    Append pending lines of a log file (one append per segment)
+    - on write error the unwritten lines are queued back (newest QUEUE_MAX kept)
+    """
+    lines = Log.QUEUE.pop(f_path, None)
+    if not lines:
+        return True
+    limit = Log.LIMIT.get(f_path, 1)
+    cnt = Log.LINES.get(f_path, None)
+    cnt = _count_lines(f_path) if cnt is None else cnt
+    chunk = []
+    try:
+        while lines:
+            if cnt >= limit:
+                _rotate(f_path)
+                cnt = 0
+            chunk, lines = lines[:limit-cnt], lines[limit-cnt:]
+            with open(f_path, 'a') as f:
+                f.write(''.join(chunk))
+            cnt += len(chunk)
+            Log.PENDING -= len(chunk)
+    except Exception:
+        Log.LINES.pop(f_path, None)
+        unwritten = chunk + lines
+        lines = unwritten[-Log.QUEUE_MAX:]
+        Log.PENDING -= len(unwritten) - len(lines)
+        Log.QUEUE[f_path] = lines + Log.QUEUE.get(f_path, [])
+        return False
+    Log.LINES[f_path] = cnt
+    return True
+
+
+def log_flush() -> bool:
+    """
+    Write-behind flush of all pending log lines
+    - called from idle task (async) and before reboot
+    """
+    verdict = True
+    for f_path in list(Log.QUEUE):
+        verdict &= _flush(f_path)
+    return verdict
+
+
 def logger(data, f_name:str, limit:int):
     """
-    Generic logger function with line rotation and time
+    Generic logger function with segment rotation and time
+    - lines are queued in RAM (write-behind), flushed with one append per file
     :param data: data to log
     :param f_name: file name to use
-    :param limit: line limit for log rotation
+    :param limit: line limit of one segment (kept lines: limit ... SEGMENTS*limit)
     return write verdict - true / false
-    INFO: hardcoded max data number = 30
-    """
-    def _logger(f_mode='r+'):
-        nonlocal data, f_path, limit
-        limit = 1 if limit <= 0 else min(limit, 30)  # Hardcoded max data line = 30
-        # [1] GET TIME STUMP
-        ts_buff = [str(k) for k in localtime()]
-        ts = ".".join(ts_buff[0:3]) + "-" + ":".join(ts_buff[3:6])
-        # [2] OPEN FILE - WRITE DATA WITH TS
-        with open(f_path, f_mode) as f:
-            _data = f"{ts} {data}\n"
-            # read file lines and filter by time stump chunks (hack for replace truncate)
-            lines = [_l for _l in f.readlines() if '-' in _l and '.' in _l]
-            # get file params
-            lines_len = len(lines)
-            lines.append(_data)
-            f.seek(0)
-            # line data rotate
-            if lines_len >= limit:
-                lines = lines[-limit:]
-        # write file
-        with open(f_path, 'w') as f:
-            f.write(''.join(lines))
-
+    """
+    # [1] GET TIME STUMP
+    ts = _timestamp()
+    # [2] QUEUE DATA WITH TS
     f_path = path_join(_dir_select(f_name), f_name)
-    # Run logger
-    try:
-        # There is file - append 'r+'
-        _logger()
-    except:
-        try:
-            # There is no file - create 'a+'
-            _logger('a+')
-        except:
-            return False
+    Log.LIMIT[f_path] = 1 if limit <= 0 else limit
+    if f_path in Log.QUEUE:
+        Log.QUEUE[f_path].append(f"{ts} {data}\n")
+    else:
+        Log.QUEUE[f_path] = [f"{ts} {data}\n"]
+    Log.PENDING += 1
+    if Log.PENDING > Log.QUEUE_MAX:
+        return log_flush()
     return True
 
 
+def _log_lines(f_path:str):
+    """
+    Log file lines generator - segments from the oldest to the active one
+    """
+    _flush(f_path)
+    for index in range(Log.SEGMENTS - 1, -1, -1):
+        try:
+            with open(_segment(f_path, index), 'r') as f:
+                eline = f.readline().strip()
+                while eline:
+                    yield eline
+                    eline = f.readline().strip()
+        except OSError:
+            pass
+
+
 def log_get(f_name:str, msgobj=None):
     """
     Generic file getter for .log files
+    - segments from the oldest to the active one
     - log content critical [ERR] counter
     """
     f_path = path_join(_dir_select(f_name), f_name)
     err_cnt = 0
-    try:
+    if msgobj is not None:
+        msgobj(f_path)
+    for eline in _log_lines(f_path):
+        # GET error from log line (tag: [ERR])
+        err_cnt += 1 if "[ERR]" in eline else 0
+        # GIVE BACK .log file contents
         if msgobj is not None:
-            msgobj(f_path)
-        with open(f_path, 'r') as f:
-            eline = f.readline().strip()
-            while eline:
-                # GET error from log line (tag: [ERR])
-                err_cnt += 1 if "[ERR]" in eline else 0
-                # GIVE BACK .log file contents
-                if msgobj is not None:
-                    msgobj(f"\t{eline}")
-                eline = f.readline().strip()
-    except:
-        pass
+            msgobj(f"\t{eline}")
     return err_cnt
 
 
@@ -107,13 +203,238 @@ def syslog(data=None, msgobj=None):
     """
     if data is None:
         # READ LOGS
-        err_cnt = sum(log_get(f, msgobj) for f in ilist_fs(OSPath.LOGS, type_filter='f') if f.endswith(".sys.log"))
+        err_cnt = sum(log_get(f"{lvl}.sys.log", msgobj) for lvl in Log.LEVELS)
         return err_cnt
-    # WRITE LOGS - [target].sys.log automatic log level detection
-    _match = match(r"^\[([^\[\]]+)\]", data)
-    log_lvl = _match.group(1).lower() if _match else 'user'
-    f_name = f"{log_lvl}.sys.log" if log_lvl in ("err", "warn", "boot", "info") else 'user.sys.log'
-    return logger(data, f_name, limit=4)
+    # WRITE LOGS - [target].sys.log automatic log level detection: [ERR] msg
+    log_lvl = data[1:data.find(']')].lower() if data.startswith('[') else 'user'
+    severity = Log.LEVELS.get(log_lvl, None)
+    if severity is None:
+        log_lvl, severity = 'user', 0
+    persist = severity >= Log.MIN_LVL
+    # RAM tier (all levels)
+    Log.RING[Log.RING_IDX] = (time(), log_lvl, persist, data)
+    Log.RING_IDX = (Log.RING_IDX + 1) % len(Log.RING)
+    # FLASH tier (write-behind): min. persisted level
+    if persist:
+        verdict = logger(data, f"{log_lvl}.sys.log", limit=20)
+        if severity >= Log.LEVELS["err"]:
+            # Error: sync flush - keep the last errors before a crash / WDT reset
+            verdict = log_flush()
+        return verdict
+    return True
+
+
+def log_level(level:str):
+    """
+    Set min. persisted syslog level (lower levels are kept in RAM only)
+    :param level: err / warn / boot / info / user
+    """
+    Log.MIN_LVL = Log.LEVELS.get(str(level).lower(), 0)
+    return Log.MIN_LVL
+
+
+def _ts_key(ts:str):
+    """ Log time stamp to sortable tuple: 2024.1.5-9:3:0 -> (2024, 1, 5, 9, 3, 0) """
+    try:
+        date, clock = ts.split('-')
+        return tuple(int(k) for k in date.split('.') + clock.split(':'))
+    except ValueError:
+        return ()
+
+
+def syslog_read(level:str='user', msgobj=None):
+    """
+    System log reader - merge RAM and flash tiers in time order
+    :param level: min. level to show: err / warn / boot / info / user
+    :param msgobj: function to stream log lines
+    return [ERR] counter
+    """
+    severity = Log.LEVELS.get(str(level).lower(), 0)
+    ring = [Log.RING[(Log.RING_IDX + i) % len(Log.RING)] for i in range(len(Log.RING))]
+    ring = [entry for entry in ring if entry is not None and Log.LEVELS[entry[1]] >= severity]
+    lines = []
+    # FLASH tier: older persisted lines (previous boots included), the newest ones are in the RAM tier
+    for lvl, lvl_severity in Log.LEVELS.items():
+        if lvl_severity >= severity:
+            in_ram = sum(1 for entry in ring if entry[2] and entry[1] == lvl)
+            flash = list(_log_lines(path_join(OSPath.LOGS, f"{lvl}.sys.log")))
+            lines.extend(flash[:max(0, len(flash) - in_ram)])
+    keys = [(_ts_key(line.split(' ', 1)[0]), i) for i, line in enumerate(lines)]
+    keys.sort()
+    lines = [lines[i] for _, i in keys]
+    # RAM tier: recent lines of all levels in write order
+    lines.extend(f"{_timestamp(entry[0])} {entry[3]}" for entry in ring)
+    err_cnt = 0
+    for line in lines:
+        err_cnt += 1 if "[ERR]" in line else 0
+        if msgobj is not None:
+            msgobj(line)
+    return err_cnt
+
+
+#############################################
+#        BINARY TIME-SERIES (RING FILE)     #
+#############################################
+
+class TimeSeries:
+    """
+    Fixed-width record ring buffer file (.tsd)
+    Header: magic | capacity | head | count (<4sIII) | fmt len (B) | fmt | names len (B) | names (csv)
+    Record: unix epoch (uint32) + fields (f: float32, i: int32, h: int16)
+    """
+    MAGIC = b"mTS1"
+    HEAD = "<4sIII"
+    EPOCH = 946684800 if gmtime(0)[0] == 2000 else 0    # Device epoch -> unix epoch
+    SYNCED = 1609459200                                 # Older epoch: clock not synced yet (RTC starts from 2000)
+    CHUNK = 32                                          # Records per read
+    CACHE: dict[str, "TimeSeries"] = {}
+
+    def __init__(self, f_path:str, fields:dict=None, capacity:int=1440):
+        """
+        Open (or create) time-series file
+        :param f_path: file path
+        :param fields: {name: 'f'|'i'|'h'} - (re)create file on new or changed field names
+        :param capacity: max number of records (on create)
+        """
+        self.f_path = f_path
+        try:
+            self._load()
+        except (OSError, ValueError):
+            if fields is None:
+                raise
+            self.names = ()
+        if fields is not None and tuple(fields) != self.names:
+            self._create(fields, capacity)
+        self.rec = calcsize(self.fmt)
+
+    @staticmethod
+    def get(f_path:str, fields:dict=None, capacity:int=1440):
+        """
+        Cached TimeSeries object (header is read once)
+        - removed file: cached object is dropped
+        """
+        series = TimeSeries.CACHE.get(f_path, None)
+        if series is not None and not is_file(f_path):
+            del TimeSeries.CACHE[f_path]
+            series = None
+        if series is None or (fields is not None and tuple(fields) != series.names):
+            series = TimeSeries.CACHE[f_path] = TimeSeries(f_path, fields, capacity)
+        return series
+
+    def _load(self):
+        with open(self.f_path, 'rb') as f:
+            # Header parts are read by their length fields (any names length)
+            header = f.read(calcsize(TimeSeries.HEAD) + 1)
+            if len(header) < calcsize(TimeSeries.HEAD) + 1:
+                raise ValueError(f"Invalid time-series: {self.f_path}")
+            magic, self.capacity, self.head, self.count = unpack_from(TimeSeries.HEAD, header)
+            if magic != TimeSeries.MAGIC:
+                raise ValueError(f"Invalid time-series: {self.f_path}")
+            fmt = f.read(header[-1] + 1)
+            if len(fmt) != header[-1] + 1:
+                raise ValueError(f"Invalid time-series: {self.f_path}")
+            self.fmt = "<I" + fmt[:-1].decode()
+            names = f.read(fmt[-1])
+            self.names = tuple(names.decode().split(','))
+            self.offset = len(header) + len(fmt) + len(names)
+            self.last = 0
+            if self.count:
+                # Newest record epoch: appends are kept in time order (query bisect)
+                f.seek(self.offset + ((self.head - 1) % self.capacity) * calcsize(self.fmt))
+                self.last = unpack_from("<I", f.read(4))[0]
+
+    def _create(self, fields:dict, capacity:int):
+        fmt = ''.join(t if t in ('i', 'h') else 'f' for t in fields.values())
+        names = ','.join(fields).encode()
+        self.fmt, self.names = "<I" + fmt, tuple(fields)
+        self.capacity, self.head, self.count, self.last = capacity, 0, 0, 0
+        header = pack(TimeSeries.HEAD, TimeSeries.MAGIC, capacity, 0, 0) + bytes([len(fmt)]) + fmt.encode() \
+                 + bytes([len(names)]) + names
+        self.offset = len(header)
+        with open(self.f_path, 'wb') as f:
+            f.write(header)
+
+    def append(self, values, epoch:int=None) -> bool:
+        """
+        Append record (overwrites the oldest one when full)
+        - skip: clock not synced (before NTP) or epoch older than the newest record
+        :param values: field values in names order
+        :param epoch: unix epoch (default: now)
+        """
+        epoch = time() + TimeSeries.EPOCH if epoch is None else epoch
+        if epoch < TimeSeries.SYNCED or epoch < self.last:
+            return False
+        values = [int(round(v)) if t in ('i', 'h') else float(v) for t, v in zip(self.fmt[2:], values)]
+        with open(self.f_path, 'r+b') as f:
+            f.seek(self.offset + self.head * self.rec)
+            f.write(pack(self.fmt, epoch, *values))
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            f.seek(8)
+            f.write(pack("<II", self.head, self.count))
+        self.last = epoch
+        return True
+
+    def _seek(self, f, index:int):
+        """ Seek to logical record index (0: oldest) """
+        f.seek(self.offset + ((self.head - self.count + index) % self.capacity) * self.rec)
+
+    def _bisect(self, f, epoch:int) -> int:
+        """ First logical index with record epoch >= epoch """
+        buff = bytearray(4)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            self._seek(f, mid)
+            f.readinto(buff)
+            if unpack_from("<I", buff)[0] < epoch:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _records(self, f, first:int, last:int):
+        """ Read records [first, last) by chunks (contiguous file ranges) """
+        buff = bytearray(self.rec * TimeSeries.CHUNK)
+        view = memoryview(buff)
+        index = first
+        while index < last:
+            pos = (self.head - self.count + index) % self.capacity
+            n = min(TimeSeries.CHUNK, last - index, self.capacity - pos)
+            self._seek(f, index)
+            f.readinto(view[:n * self.rec])
+            for i in range(n):
+                yield unpack_from(self.fmt, buff, i * self.rec)
+            index += n
+
+    def query(self, start:int=None, end:int=None, points:int=None):
+        """
+        Range query by time (records must be appended in time order)
+        :param start: from unix epoch (default: oldest)
+        :param end: to unix epoch (default: newest)
+        :param points: downsample to max points (bucket average)
+        yield (epoch, value1, value2, ...)
+        """
+        with open(self.f_path, 'rb') as f:
+            first = 0 if start is None else self._bisect(f, start)
+            last = self.count if end is None else self._bisect(f, end + 1)
+            bucket = 1 if not points or last - first <= points else -(-(last - first) // points)
+            acc, cnt = None, 0
+            for record in self._records(f, first, last):
+                if bucket == 1:
+                    yield record
+                    continue
+                if cnt == 0:
+                    acc = list(record)
+                else:
+                    for i in range(1, len(record)):
+                        acc[i] += record[i]
+                cnt += 1
+                if cnt == bucket:
+                    yield [acc[0]] + [v / cnt for v in acc[1:]]
+                    cnt = 0
+            if cnt:
+                yield [acc[0]] + [v / cnt for v in acc[1:]]
 
 
 def log_clean(msgobj=None):
@@ -121,6 +442,10 @@ def log_clean(msgobj=None):
     Clean logs folder
     """
     logs_dir = OSPath.LOGS
+    for f_path in [f for f in Log.QUEUE if f.endswith('.log')]:
+        Log.PENDING -= len(Log.QUEUE.pop(f_path))
+    for f_path in [f for f in Log.LINES if f.endswith('.log')]:
+        Log.LINES.pop(f_path)
     to_del = [file for file in ilist_fs(logs_dir, type_filter='f') if file.endswith('.log')]
     for _del in to_del:
         _del = path_join(logs_dir, _del)
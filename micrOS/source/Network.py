@@ -18,7 +18,7 @@ from binascii import hexlify
 from utime import sleep_ms
 from network import AP_IF, STA_IF, WLAN
 from machine import unique_id
-from Config import cfgget, cfgput
+from Config import cfgget, cfgput, cfgflush
 from Debug import console_write, syslog
 from microIO import detect_platform
 
@@ -264,7 +264,10 @@ def sta_high_avail():
         if wifi_avail or not ap_if.active():
             # ACTION: Restart micrOS node (boot phase automatically detects nw mode)
             from machine import reset
+            from Logger import log_flush
             syslog("[WARN] Restart, network repair")
+            log_flush()
+            cfgflush(force=True)
             reset()
         return f'{cfgget("nwmd")} mode NOK, wifi avail: {wifi_avail}'
     return f'{cfgget("nwmd")} mode OK'
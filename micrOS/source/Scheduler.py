@@ -1,9 +1,9 @@
 from time import localtime
-from re import compile
-from Tasks import exec_lm_pipe_schedule
+from heapq import heappush, heappop
+from Tasks import exec_lm_pipe_schedule, TaskBase
 from Debug import console_write, syslog
-from Time import Sun, suntime, ntp_time
-from Config import cfgget
+from Time import Sun, suntime_task, ntp_task, sun_table, sun_update
+from Config import cfgstream, cfgwatch
 
 """
 # SYSTEM TIME FORMAT:    Y, M, D, H, M, S, WD, YD
@@ -15,162 +15,89 @@ S:  0-59
 * - means in every place - every time
 """
 
-LAST_CRON_TASKS = []
+WEEK_SEC = 604800           # 7 * 24 * 3600 -> cron clock period (weekday based)
 
 #############################
 #    SCHEDULER FUNCTIONS    #
 #############################
 
 
-def __convert_sec_to_time(seconds):
-    """Convert sec to time format"""
-    seconds = seconds % 86400           # (24 * 3600) -> 24h in seconds
-    hour = seconds // 3600
-    seconds %= 3600
-    minutes = seconds // 60
-    seconds %= 60
-    return hour, minutes, seconds
-
-
-def __cron_task_cache_manager(now_in_sec, sec_tolerant):
+def _parse_wd(wd):
     """
-    Cron tasks execution cache by task id
-        - to avoid unwanted re-executions
+    Parse weekday param into weekday tuple
+    :param wd: could be given in 3 syntax
+        *           -> select all day 0 ... 6
+        0 ... 6     -> exact value, 0=Monday - 6=Sunday
+        {from}-{to} -> range, example: 0-3 means Monday to Wednesday, 5-1 means Saturday to Tuesday
     """
-    # Iterate on already executed tasks cache
-    for index, taskid in enumerate(LAST_CRON_TASKS):
-        # Get H,M,S in sec from task id
-        tasktime_in_sec = int(str(taskid.split('|')[0]).split(':')[1])
-        sec_diff = tasktime_in_sec - (now_in_sec - sec_tolerant)
-        # Remove outdated cache registration
-        if sec_diff < 0 or sec_diff > sec_tolerant * 2:
-            LAST_CRON_TASKS.remove(LAST_CRON_TASKS[index])
+    if wd == '*':
+        return tuple(range(7))
+    if '-' in wd:
+        wd_from, wd_to = (int(w) for w in wd.split('-', 1))
+        if wd_from <= wd_to:
+            # Incremental range: 4-6
+            return tuple(range(wd_from, wd_to + 1))
+        # Decremental range: 5-1
+        return tuple(range(wd_from, 7)) + tuple(range(0, wd_to + 1))
+    return (int(wd),)
 
 
-def __resolve_time_tag(check_time, crontask):
+def _parse_task(crontask):
     """
-    Handle time stamp/tag in check_time
-        time stamp: (WD, H, M, S)
-        tag: sunrise, sunset   <-- handled by this function
-        tag: sunrise+-min, sunset+-min   <-- handled by this function
+    Parse single cron task
+    :param crontask: ("WD:H:M:S", 'LM FUNC') or ("time tag", 'LM FUNC') or ("WD:H:M:S", function)
+    Returns: (wd tuple, H, M, S, tag, offset, task) - where None means * (every) value
+        time stamp: tag is None
+        time tag: dawn, sunrise, sunset, dusk (+-min) -> H, M, S resolved later by day (sun_table)
     """
-    # Resolve time tag: sunrise, sunset
-    if len(check_time) < 3:
-        tag = crontask[0].strip()
+    time_spec = crontask[0].strip()
+    if ':' in time_spec:
+        wd, h, m, s = (t.strip() for t in time_spec.split(':'))
+        h, m, s = (None if t == '*' else int(t) for t in (h, m, s))
+        return _parse_wd(wd), h, m, s, None, 0, crontask[1]
+    # Time tag with optional offset: sunrise, sunset+30, dusk-15
+    offset = 0
+    for sign in ('+', '-'):
+        if sign in time_spec:
+            time_spec, offset = time_spec.split(sign, 1)
+            offset = int(offset) if sign == '+' else -int(offset)
+            break
+    return tuple(range(7)), None, None, None, time_spec.strip(), offset, crontask[1]
 
-        # Handle tag offset
-        offset = 0  # minute offset from suntime+-min
-        tag_regex = compile(r"(\w+)([+|-]\d+)")
-        match_obj = tag_regex.search(tag)
-        if match_obj:
-            tag = match_obj.group(1)
-            offset = int(match_obj.group(2))
 
-        # Resolve tag
-        value = Sun.TIME.get(tag, None)
-        if value is None or len(value) < 3:
-            syslog(f'[WARN] cron syntax error: {tag}:{value}')
-            return ()
-
-        # Update check_time with resolved value by tag
-        if offset:
-            offset_time = (value[0]*60 + value[1]) + offset
-            offset_time = offset_time if offset_time > 0 else 1440 + offset_time        # 1440 -> 24h in minutes
-            h, m, _ = __convert_sec_to_time(offset_time * 60)
-            check_time = ('*', h, m, value[2])
-            return check_time
-        check_time = ('*', value[0], value[1], value[2])
-    return check_time
+def _next_tod(h, m, s, tod):
+    """
+    Earliest time of day (sec) >= tod which matches H:M:S (None: *)
+    Returns None when no match on the given day
+    """
+    th, tm, ts = tod // 3600, (tod // 60) % 60, tod % 60
+    for hh in (range(th, 24) if h is None else (h,)):
+        if hh < th:
+            continue
+        for mm in (range(60) if m is None else (m,)):
+            if hh == th and mm < tm:
+                continue
+            for ss in (range(60) if s is None else (s,)):
+                if hh == th and mm == tm and ss < ts:
+                    continue
+                return hh * 3600 + mm * 60 + ss
+    return None
 
 
-def __check_wd(wd, wd_now):
+def _split_chunks(chunks, sep):
     """
-    Check weekday param
-    :param wd: could be given in 3 syntax
-        *           -> select all day 0 ... 6
-        0 ... 6     -> exact value, 0=Monday - 6=Sunday
-        {from}-{to} -> range, example: 0-3 means Monday to Wednesday
-    :param wd_now: actual (now) workday
-    """
-    # Handle WD range syntax
-    wd_regex = compile(r"(\d+)-(\d+)")
-    match_obj = wd_regex.search(wd)
-    if match_obj:
-        wd_from = int(match_obj.group(1))
-        wd_to = int(match_obj.group(2))
-        # Check incremental range: 4-6
-        if wd_from < wd_to and wd_now in range(wd_from, wd_to+1):
-            return True
-        # Check decremental range: 5-1
-        if wd_from > wd_to and wd_now in list(range(wd_from, 7)) + list(range(0, wd_to+1)):
-            return True
-    # Handle WD * and exact values
-    return wd in ('*', wd_now)
-
-
-def __scheduler_trigger(cron_time_now, crontask, deltasec=2):
-    """
-    SchedulerCore logic
-        actual time: cron_time_now format: (WD, H, M, S)
-        actual time in sec: now_sec_tuple: (H sec, M sec, S)
-        crontask: ("WD:H:M:S", "LM FUNC") or ("time tag", "LM FUNC")
-        deltasec: sample time window: +/- sec: -sec--|event|--sec-
-    """
-    # Resolve "normal" time
-    check_time = tuple(int(t.strip()) if t.isdigit() else t.strip() for t in crontask[0].split(':'))
-    # Resolve "time tag" to "normal" time
-    check_time = __resolve_time_tag(check_time, crontask)
-    if len(check_time) < 4:
-        return False
+    Split chunked string by separator (generator) - without joining the whole string
+    """
+    rest = ''
+    for chunk in chunks:
+        items = (rest + chunk).split(sep)
+        rest = items.pop()
+        for item in items:
+            yield item
+    yield rest
 
-    # Cron overall time now in sec - hour in sec, minute in sec, sec
-    now_sec_tuple = (cron_time_now[1] * 3600, cron_time_now[2] * 60, cron_time_now[3])
-    # Cron actual time (now) parts summary in sec
-    check_time_now_sec = now_sec_tuple[0] + now_sec_tuple[1] + now_sec_tuple[2]
-    # Cron overall requested time in sec - hour in sec, minute in sec, sec
-    check_time_scheduler_sec = int(now_sec_tuple[0] if check_time[1] == '*' else check_time[1] * 3600) \
-                               + int(now_sec_tuple[1] if check_time[2] == '*' else check_time[2] * 60) \
-                               + int(now_sec_tuple[2] if check_time[3] == '*' else check_time[3])
-
-    # Time frame +/- corrections
-    tolerance_min_sec = 0 if check_time_now_sec - deltasec < 0 else check_time_now_sec - deltasec
-    tolerance_max_sec = check_time_now_sec + deltasec
-
-    task_id = f"{check_time[0]}:{check_time_scheduler_sec}|{str(crontask[1]).replace(' ', '')}"
-
-    # Check WD - WEEK DAY
-    if __check_wd(wd=check_time[0], wd_now=cron_time_now[0]):
-        # Check H, M, S in sec format between tolerance range
-        if tolerance_min_sec <= check_time_scheduler_sec <= tolerance_max_sec:
-            __cron_task_cache_manager(check_time_now_sec, deltasec)
-            if check_time[3] == '*' or task_id not in LAST_CRON_TASKS:
-                lm_state = False
-                if isinstance(crontask[1], str):
-                    # [1] Execute Load Module as a string (user LMs)
-                    lm_state = exec_lm_pipe_schedule(crontask[1])
-                else:
-                    try:
-                        # [2] Execute function reference (built-in functions)
-                        console_write(f"[builtin cron] {crontask[1]()}")
-                        lm_state = True
-                    except Exception as e:
-                        syslog(f"[ERR] cron function exec error: {e}")
-                if not lm_state:
-                    console_write(f"[cron]now[{cron_time_now}]  \
-                        {__convert_sec_to_time(tolerance_min_sec)} <-> {__convert_sec_to_time(tolerance_max_sec)}  \
-                        conf[{crontask[0]}] \
-                        exec[{lm_state}] \
-                        LM: {crontask[1]}")
-
-                # SAVE TASK TO CACHE
-                if check_time[3] != '*':
-                    # SAVE WHEN SEC not *
-                    LAST_CRON_TASKS.append(task_id)
-                return True
-    return False
-
-
-def deserialize_raw_tasks():
+
+def deserialize_raw_tasks(cron_data=None):
     """
     Scheduler/Cron input string format
     cron_data: raw cron tasks, time based task execution input (str)
@@ -181,40 +108,210 @@ def deserialize_raw_tasks():
                 timestamp: WD:H:M:S
                     WD: 0...6, 0=Monday, 6=Sunday
                         optional range handling: 0-2 means Monday to Wednesday
-                time-tag: sunrise, sunset
+                time-tag: dawn, sunrise, sunset, dusk
                     optional minute offset (+/-): sunrise+30
         task: LoadModule function args
     Returns tuple: (("WD:H:M:S", 'LM FUNC'), ("WD:H:M:S", 'LM FUNC'), ...)
     """
-    cron_data:str = cfgget('crontasks')
+    # crontasks config is read as stream (large offloaded value)
+    chunks = cfgstream('crontasks') if cron_data is None else (cron_data,)
     try:
+        # Single pass split by ; - inner empty item means ;; multi command separator
+        items = list(_split_chunks(chunks, ';'))
+        if '' in items[1:-1]:
+            tasks, group = [], []
+            for item in items + ['']:
+                if item:
+                    group.append(item)
+                elif group:
+                    tasks.append(';'.join(group))
+                    group = []
+            items = tasks
         # Parse and create return
-        sep = ';;' if ';;' in cron_data else ';'       # support multi command with ;;
-        return (tuple(cron.split('!')) for cron in cron_data.split(sep))
+        return tuple(tuple(cron.split('!')) for cron in items
+                     if cron.strip() and cron.strip().lower() != 'n/a')
     except Exception as e:
         syslog(f"[ERR] cron deserialize - syntax error: {e}")
     return ()
 
 
-def scheduler(irqperiod:int):
+class CronTable:
     """
-    :param irqperiod: sampling period in seconds
+    Precompiled cron table with next fire time index (min-heap)
+    - cron tasks are parsed once (and when crontasks config changes)
+    - cron clock: monotonic seconds built from weekday and time of day,
+      so heap head check is enough on every scheduler tick
     """
-    builtin_tasks = (("*:3:0:0", suntime), ("*:3:5:0", ntp_time))
-    state = False
-    time_now = localtime()[3:7]
+    TASKS = None            # Parsed tasks: [(wd, H, M, S, tag, offset, task), ...]
+    INDEXED = None          # TASKS reference of the actual HEAP
+    HEAP = []               # Next fire index: [(cron clock sec, task index), ...]
+    CLOCK = None            # Last cron clock value (sec)
+    SUN = None              # Sun.TIME snapshot of the actual HEAP (time tags)
+    JUMP_SEC = 3600         # Clock jump (ntp sync, utc change) - re-index without catch-up
+    MAX_SLEEP = 60          # Async cron max sleep - clock jump, sun time and crontasks change detection
 
-    # Actual time - WD, H, M, S
-    cron_time_now = (time_now[3], time_now[0], time_now[1], time_now[2])
+    @staticmethod
+    def build(cron_data=None):
+        """
+        Parse builtin and user cron tasks into TASKS
+        - called on first tick and on crontasks config change (cfgwatch)
+        :param cron_data: raw crontasks string (default: read from config)
+        """
+        builtin_tasks = (("*:0:0:0", sun_update), ("*:3:0:0", suntime_task), ("*:3:5:0", ntp_task))
+        tasks = []
+        for crontask in builtin_tasks + deserialize_raw_tasks(cron_data):
+            try:
+                tasks.append(_parse_task(crontask))
+            except Exception as e:
+                syslog(f"[WARN] cron syntax error: {crontask}: {e}")
+        CronTable.TASKS = tasks
 
-    try:
-        # Check builtin tasks (func. ref.)
-        for cron in builtin_tasks:
-            state |= __scheduler_trigger(cron_time_now, cron, deltasec=irqperiod)
-        # Check user tasks (str)
-        for cron in deserialize_raw_tasks():
-            state |= __scheduler_trigger(cron_time_now, cron, deltasec=irqperiod)
+    @staticmethod
+    def next_fire(index, clock):
+        """
+        Calculate next fire time of the task >= clock
+        :param index: task index in TASKS
+        :param clock: cron clock in sec
+        Returns cron clock in sec OR None (no valid fire time)
+        """
+        wd, h, m, s, tag, offset, _ = CronTable.TASKS[index]
+        week_sec = clock % WEEK_SEC
+        wd_now, tod = week_sec // 86400, week_sec % 86400
+        resolved = tag is None
+        for day in range(8):
+            if (wd_now + day) % 7 in wd:
+                if tag is not None:
+                    # Resolve time tag of the day: dawn, sunrise, sunset, dusk (+/- min offset)
+                    value = sun_table(day).get(tag, None)
+                    if value is None or len(value) < 3:
+                        continue                                       # polar day/night: no such event
+                    resolved = True
+                    tag_min = (value[0] * 60 + value[1] + offset) % 1440  # 1440 -> 24h in minutes
+                    h, m, s = tag_min // 60, tag_min % 60, value[2]
+                tod_next = _next_tod(h, m, s, tod if day == 0 else 0)
+                if tod_next is not None:
+                    return clock - week_sec + (wd_now + day) * 86400 + tod_next
+        if not resolved:
+            syslog(f'[WARN] cron syntax error: {tag}')
+        return None
+
+    @staticmethod
+    def reindex(clock):
+        """
+        (Re)Build next fire time heap from clock
+        """
+        heap = []
+        CronTable.INDEXED = CronTable.TASKS
+        CronTable.SUN = dict(Sun.TIME)
+        for index in range(len(CronTable.TASKS)):
+            fire = CronTable.next_fire(index, clock)
+            if fire is not None:
+                heappush(heap, (fire, index))
+            elif CronTable.TASKS[index][4] is None:
+                syslog(f"[WARN] cron never fires: {CronTable.TASKS[index][6]}")
+        CronTable.HEAP = heap
+
+    @staticmethod
+    def clock(time_now):
+        """
+        Convert localtime into monotonic cron clock
+        :param time_now: localtime() tuple
+        """
+        week_sec = time_now[6] * 86400 + time_now[3] * 3600 + time_now[4] * 60 + time_now[5]
+        if CronTable.CLOCK is None:
+            return week_sec
+        delta = (week_sec - CronTable.CLOCK) % WEEK_SEC
+        # Step back (within half week) is a negative delta
+        delta = delta - WEEK_SEC if delta > WEEK_SEC // 2 else delta
+        return CronTable.CLOCK + delta
+
+    @staticmethod
+    def run(clock):
+        """
+        Execute all due tasks (fire time <= clock) and schedule their next fire time
+        :param clock: cron clock in sec
+        """
+        state = False
+        heap = CronTable.HEAP
+        while heap and heap[0][0] <= clock:
+            _, index = heappop(heap)
+            task = CronTable.TASKS[index][6]
+            lm_state = False
+            if isinstance(task, str):
+                # [1] Execute Load Module as a string (user LMs)
+                lm_state = exec_lm_pipe_schedule(task)
+            else:
+                try:
+                    # [2] Execute function reference (built-in functions)
+                    console_write(f"[builtin cron] {task()}")
+                    lm_state = True
+                except Exception as e:
+                    syslog(f"[ERR] cron function exec error: {e}")
+            if not lm_state:
+                console_write(f"[cron] clock[{clock}] exec[{lm_state}] LM: {task}")
+            state = True
+            fire = CronTable.next_fire(index, clock + 1)
+            if fire is not None:
+                heappush(heap, (fire, index))
         return state
+
+    @staticmethod
+    def tick(time_now):
+        """
+        Scheduler tick: cron clock update + heap head check
+        :param time_now: localtime() tuple
+        """
+        if CronTable.TASKS is None:
+            CronTable.build()
+        clock = CronTable.clock(time_now)
+        last = CronTable.CLOCK
+        CronTable.CLOCK = clock
+        # Re-index: first tick OR clock jump - from now (no catch-up)
+        if last is None or abs(clock - last) > CronTable.JUMP_SEC:
+            CronTable.reindex(clock)
+        # Re-index: cron table changed OR sun time tags changed (suntime) - from last tick
+        elif CronTable.INDEXED is not CronTable.TASKS or CronTable.SUN != Sun.TIME:
+            CronTable.reindex(last + 1)
+        return CronTable.run(clock)
+
+    @staticmethod
+    def sleep_sec():
+        """
+        Seconds until next due task (heap head), between 1 and MAX_SLEEP
+        """
+        if not CronTable.HEAP or CronTable.CLOCK is None:
+            return CronTable.MAX_SLEEP
+        return max(1, min(CronTable.HEAP[0][0] - CronTable.CLOCK, CronTable.MAX_SLEEP))
+
+
+def scheduler(irqperiod:int):
+    """
+    Cron scheduler tick - checks next fire time index head only
+    :param irqperiod: sampling period in seconds (due tasks between ticks are executed on the next tick)
+    """
+    try:
+        return CronTable.tick(localtime())
     except Exception as e:
         syslog(f'[ERR] cron callback error: {e}')
         return False
+
+
+async def aio_scheduler(tag:str='cron'):
+    """
+    Async cron engine (NativeTask) - alternative of Timer(1) IRQ scheduler
+    - sleeps until the next due task (second-level accuracy)
+    :param tag: task tag
+    """
+    with TaskBase.TASKS.get(tag) as my_task:
+        while True:
+            try:
+                CronTable.tick(localtime())
+            except Exception as e:
+                syslog(f'[ERR] aio cron error: {e}')
+            wait_sec = CronTable.sleep_sec()
+            my_task.out = f"cron tasks: {len(CronTable.HEAP)} next check: {wait_sec}s"
+            await my_task.feed(sleep_ms=wait_sec * 1000)
+
+
+# Rebuild cron table when crontasks config changes
+cfgwatch('crontasks', CronTable.build)
@@ -183,16 +183,14 @@ class WebCli(Client, WebEngine):
         try:
             while self.engine_state is not None:
                 await self._run_state_machine()
+                if self.engine_state is None and self.keep_alive and self.connected:
+                    # Persistent connection (keep-alive): serve the next request
+                    self.next_request()
                 await asyncio.sleep_ms(WebCli.STATE_MACHINE_SLEEP_MS)
         except Exception as e:
             syslog(f"[ERR] run_web: {e}")
         finally:
-            if self._send_buf:
-                self._send_buf.consume()
-                WebCli.SEND_POOL.release(self._send_buf)
-            if self._recv_buf:
-                self._recv_buf.consume()
-                WebCli.RECV_POOL.release(self._recv_buf)
+            self._release_buffers()
             await self.close()
             collect()
 
@@ -419,6 +417,7 @@ class Server:
             try:
                 collect()
                 WebCli.init_pools()
+                WebCli.index_static()
                 self.web = asyncio.start_server(self.web_cli, self._host, 80, backlog=self._socqueue)
                 await self.web
                 Client.console(f"- HTTP server ready, connect: http://{addr}")
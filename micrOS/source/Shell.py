@@ -14,7 +14,7 @@ Designed by Marcell Ban aka BxNxM
 from sys import modules
 from os import uname
 from machine import reset as hard_reset, soft_reset
-from Config import cfgget, cfgput
+from Config import cfgget, cfgput, cfgflush
 from Files import OSPath, ilist_fs, path_join
 from Tasks import lm_exec
 from Debug import syslog
@@ -60,6 +60,12 @@ class Shell:
     async def reboot(self, hard=False):
         """ Reboot micropython VM """
         await self.a_send(f"{'[HARD] ' if hard else ''}Reboot micrOS system.\nBye!")
+        cfgflush(force=True)
+        try:
+            from Logger import log_flush
+            log_flush()
+        except ImportError:
+            pass
         if hard:
             hard_reset()
         soft_reset()
@@ -174,6 +180,7 @@ class Shell:
             await self.a_send("  noconf     - Exit conf mode")
             await self.a_send("[TASK] Task operations")
             await self.a_send("  task list         - list tasks by tags")
+            await self.a_send("  task stats        - task runtime profiler")
             await self.a_send("  task kill <tag>   - stop task")
             await self.a_send("  task show <tag>   - show task output")
             await self.a_send("[EXEC] Command mode, syntax(...): <module> <function> <params> <postfix>")
@@ -304,6 +311,12 @@ class Shell:
             # Set .if_mode->webrepl (start webrepl after reboot and poll update status...)
             with open('.if_mode', 'w') as f:
                 f.write('webrepl')
+            cfgflush(force=True)
+            try:
+                from Logger import log_flush
+                log_flush()
+            except ImportError:
+                pass
             hard_reset()
         try:
             import webrepl
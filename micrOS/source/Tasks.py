@@ -13,9 +13,9 @@ from json import dumps
 from re import match
 import uasyncio as asyncio
 from micropython import schedule
-from utime import ticks_ms, ticks_diff
+from utime import ticks_ms, ticks_us, ticks_diff
 from Debug import console_write, syslog
-from Config import cfgget
+from Config import cfgget, cfgwatch, cfgflush
 if cfgget("ha"):
     from Network import sta_high_avail
 
@@ -31,19 +31,67 @@ except ImportError:
 #################################################################
 
 
+class TaskProfiler:
+    """
+    Awaitable coroutine proxy - task runtime profiler
+    - stats: [wakeups, total us, max us, last error]
+      measures time between resume (send/throw) and yield of the coroutine
+    """
+    __slots__ = ['coro', 'stats']
+
+    def __init__(self, coro, stats:list):
+        self.coro = coro
+        self.stats = stats
+
+    def _measure(self, start_us:int):
+        delta = ticks_diff(ticks_us(), start_us)
+        stats = self.stats
+        stats[0] += 1
+        stats[1] += delta
+        if delta > stats[2]:
+            stats[2] = delta
+
+    def __await__(self):
+        coro = self.coro
+        value, err = None, None
+        while True:
+            start = ticks_us()
+            try:
+                out = coro.send(value) if err is None else coro.throw(err)
+            except StopIteration as e:
+                self._measure(start)
+                return e.value
+            except Exception as e:
+                self._measure(start)
+                self.stats[3] = str(e)
+                raise
+            self._measure(start)
+            try:
+                value, err = (yield out), None
+            except BaseException as e:
+                # Cancel (CancelledError) / close (GeneratorExit) - forward to the coroutine
+                value, err = None, e
+
+    __iter__ = __await__
+
+
 class TaskBase:
     """
     Async task base definition for common features
     """
-    __slots__ = ['task', 'done', 'out', 'tag', '__callback', '__inloop', '__sleep']
+    __slots__ = ['task', 'done', 'out', 'tag', 'stats', 'prio', '__callback', '__inloop', '__sleep']
     QUEUE_SIZE = cfgget('aioqueue')     # QUEUE size from config
     TASKS = {}                          # TASK OBJ list
+    ACTIVE = 0                          # Active (queue limited) task counter - admission control
+    SYSTEM, IRQ, USER = 0, 1, 2         # Task priority classes (smaller is higher)
 
     def __init__(self):
         self.task = None             # Store created async task object
         self.tag = None              # Task tag (identification)
         self.done = asyncio.Event()  # Store task done state
         self.out = ""                # Store task output
+        self.stats = [0, 0, 0, '']   # Task profiler: wakeups, total us, max us, last error
+        self.prio = TaskBase.SYSTEM  # Task priority class: SYSTEM (no queue limit), IRQ, USER
 
     ######  BASE METHODS FOR CHILD CLASSES  ####
     def _create(self, callback:callable) -> dict:
@@ -51,8 +99,8 @@ class TaskBase:
         Create async task and register it to TASKS dict by tag
         :param callback: coroutine function
         """
-        # Create async task from coroutine function
-        self.task = asyncio.get_event_loop().create_task(callback)
+        # Create async task from coroutine function (with runtime profiler)
+        self.task = asyncio.get_event_loop().create_task(self._profiled(callback))
         # Store Task object by key - for task control
         TaskBase.TASKS[self.tag] = self
         return {self.tag: "Starting"}
@@ -69,6 +117,24 @@ class TaskBase:
                 del TaskBase.TASKS[passive[i]]
             gcollect()
 
+    def _finish(self):
+        """
+        Set task done state (idempotent)
+        - release queue slot and admit waiting tasks
+        """
+        if self.done.is_set():
+            return
+        self.done.set()
+        if self.prio != TaskBase.SYSTEM:
+            TaskBase.ACTIVE -= 1
+            Manager._admit()
+
+    async def _profiled(self, callback):
+        """
+        Run coroutine over TaskProfiler (self.stats)
+        """
+        return await TaskProfiler(callback, self.stats)
+
     ######  PUBLIC TASK METHODS  #####
     @staticmethod
     def is_busy(tag:str) -> bool:
@@ -131,7 +197,7 @@ class TaskBase:
         """
         Delete task from TASKS
         """
-        self.done.set()
+        self._finish()
         if self.tag in TaskBase.TASKS:
             if not keep_cache:              # True - In case of destructor
                 del TaskBase.TASKS[self.tag]
@@ -181,7 +247,7 @@ class NativeTask(TaskBase):
         [HINT] Use python with feature to utilize this feature
         """
         self._task_gc()    # Task pool cleanup
-        self.done.set()
+        self._finish()
 
 
 class MagicTask(TaskBase):
@@ -196,13 +262,14 @@ class MagicTask(TaskBase):
         self.__inloop = False        # [LM] Task while loop for LM callback
         self.__sleep = 20            # [LM] Task while loop - async wait (proc feed) [ms]
 
-    def create(self, callback:list=None, loop:bool=None, sleep:int=None) -> dict:
+    def create(self, callback:list=None, loop:bool=None, sleep:int=None, prio:int=None) -> dict:
         """
-        Create async task with function callback (with queue limit check)
+        Create async task with function callback (queue limit: Manager admission control)
         - wrap (sync) function into async task (task_wrapper)
         - callback: <load_module> <function> <param> <param2>
         - loop: bool
         - sleep: [ms]
+        - prio: priority class IRQ / USER (default)
         """
         # Create task tag
         self.tag = '.'.join(callback[0:2])
@@ -214,6 +281,9 @@ class MagicTask(TaskBase):
         self.__inloop = self.__inloop if loop is None else loop
         # Set sleep value for async loop - optional parameter with min sleep limit check (20ms)
         self.__sleep = self.__sleep if sleep is None else sleep if sleep > 19 else self.__sleep
+        # Allocate queue slot (released by _finish)
+        self.prio = TaskBase.USER if prio is None else prio
+        TaskBase.ACTIVE += 1
         # Create task with coroutine callback
         return super()._create(self.__task_wrapper())
 
@@ -228,15 +298,21 @@ class MagicTask(TaskBase):
         while True:
             await self.feed(self.__sleep)
             state, self.out = _exec_lm_core(self.__callback)
-            if not state or not self.__inloop:
+            if not state:
+                self.stats[3] = self.out
+                break
+            if not self.__inloop:
                 break
         self._task_gc()    # Task pool cleanup
-        self.done.set()
+        self._finish()
 
     def cancel(self):
         self.__inloop = False  # Set soft stop (LM task)
         return super().cancel()
 
+    def is_loop(self) -> bool:
+        return self.__inloop
+
 
 #################################################################
 #                 Implement Task manager class                  #
@@ -252,6 +328,8 @@ class Manager:
     INTERCON = None                      # Dynamic ref. for interconnect calls
     LOAD = 0                             # CPU overload measure
     WDT = None                           # Global watchdog object
+    WAITING = []                         # Admission wait queue: [(callback, loop, delay, prio), ...]
+    SHED = cfgget('aioshed')             # Task shed policy on full queue: none, loop, prio
 
     def __new__(cls):
         """
@@ -287,21 +365,73 @@ class Manager:
                 syslog(f"[ERR] WDT setup: {e}")
 
     @staticmethod
-    def _queue_len():
-        # Get active Load Module tasks (tag: module.function)
-        return sum((1 for tag, task in TaskBase.TASKS.items() if not task.done.is_set() and '.' in tag))
+    def _shed_victim(prio:int):
+        """
+        Select running task to shed (SHED policy) for a new task with prio
+        - none: never shed
+        - loop: looped task with same or lower priority
+        - prio: task with lower priority (looped first)
+        """
+        policy = Manager.SHED
+        if policy not in ('loop', 'prio'):
+            return None
+        victim = None
+        for task in TaskBase.TASKS.values():
+            if task.prio == TaskBase.SYSTEM or task.done.is_set():
+                continue
+            if policy == 'loop' and task.is_loop() and task.prio >= prio:
+                return task
+            if policy == 'prio' and task.prio > prio:
+                if task.is_loop():
+                    return task
+                victim = task if victim is None else victim
+        return victim
 
     @staticmethod
-    def _queue_limiter():
-        """
-        Check task queue limit
-        - compare with active running tasks count
-        - when queue full raise Exception!!!
-        """
-        if Manager._queue_len() >= TaskBase.QUEUE_SIZE:
+    def _admission(callback:list, loop:bool, delay:int, prio:int) -> dict:
+        """
+        Task queue admission control (MagicTask)
+        - free slot: start task
+        - full queue: shed task (SHED policy) OR wait for a free slot (priority ordered wait queue)
+        - when wait queue is full raise Exception!!!
+        """
+        prio = TaskBase.USER if prio is None else prio
+        tag = '.'.join(callback[0:2])
+        if TaskBase.ACTIVE < TaskBase.QUEUE_SIZE or TaskBase.is_busy(tag):
+            return MagicTask().create(callback=callback, loop=loop, sleep=delay, prio=prio)
+        victim = Manager._shed_victim(prio)
+        if victim is not None:
+            # Start first (slot is taken over), then cancel the victim - no wait queue admission in between
+            state = MagicTask().create(callback=callback, loop=loop, sleep=delay, prio=prio)
+            syslog(f"[aio] Task shed: {victim.tag} -> {tag}")
+            victim.cancel()
+            return state
+        waiting = Manager.WAITING
+        if tag in ('.'.join(w[0][0:2]) for w in waiting):
+            return {tag: "Already queued"}
+        if len(waiting) >= TaskBase.QUEUE_SIZE:
             msg = f"[aio] Task queue full: {TaskBase.QUEUE_SIZE}"
             syslog(msg)
             raise Exception(msg)
+        # Insert by priority class, FIFO in class
+        index = len(waiting)
+        while index > 0 and waiting[index-1][3] > prio:
+            index -= 1
+        waiting.insert(index, (callback, loop, delay, prio))
+        return {tag: "Queued"}
+
+    @staticmethod
+    def _admit():
+        """
+        Start waiting tasks while free queue slot is available
+        """
+        waiting = Manager.WAITING
+        while waiting and TaskBase.ACTIVE < TaskBase.QUEUE_SIZE:
+            callback, loop, delay, prio = waiting.pop(0)
+            try:
+                MagicTask().create(callback=callback, loop=loop, sleep=delay, prio=prio)
+            except Exception as e:
+                syslog(f"[ERR] Task admit: {e}")
 
     async def idle_task(self):
         """
@@ -311,6 +441,10 @@ class Manager:
 
         # FREQUENCY OF IDLE TASK - IMPACTS IRQ TASK SCHEDULING, SMALLER IS BEST
         ha = cfgget("ha")
+        try:
+            from Logger import log_flush
+        except ImportError:
+            log_flush = None
         my_task = TaskBase.TASKS.get('idle')
         my_task.out = "idle loop: 600ms - HA.: " + ("ON" if ha else "OFF")
         try:
@@ -322,7 +456,11 @@ class Manager:
                 await my_task.feed(300)
                 delta_rate = int(((ticks_diff(ticks_ms(), t) / 300) - 1) * 100)
                 Manager.LOAD = int((Manager.LOAD + delta_rate) / 2)  # Average - smooth
-                # [2] NETWORK AUTO REPAIR (High Availability)
+                # [2] WRITE-BEHIND LOG AND CONFIG FLUSH
+                if log_flush is not None:
+                    log_flush()
+                cfgflush()
+                # [3] NETWORK AUTO REPAIR (High Availability)
                 if ha:
                     if self.idle_counter > 300:  # ~ 3 min
                         self.idle_counter = 0    # Reset counter
@@ -331,24 +469,24 @@ class Manager:
                     self.idle_counter += 1  # Increase counter
         except Exception as e:
             syslog(f"[ERR] Idle task exists: {e}")
-        my_task.done.set()
+        my_task._finish()
 
     @staticmethod
-    def create_task(callback, tag:str=None, loop:bool=False, delay:int=None) -> dict:
+    def create_task(callback, tag:str=None, loop:bool=False, delay:int=None, prio:int=None) -> dict:
         """
         Primary interface of micrOS Generic task creator method
         :param tag: task unique identifier
         NativeTask:
             :param callback: callable, coroutine to start a task
-        MagicTask with queue limiter:
+        MagicTask with queue admission control:
             :param callback: list of staring (command)
             :param loop: MagicTask looping parameter
             :param delay: MagicTask delay parameter
+            :param prio: MagicTask priority class: TaskBase.IRQ / TaskBase.USER (default)
         """
         if isinstance(callback, list):
             # Check queue if task is Load Module
-            Manager._queue_limiter()
-            return MagicTask().create(callback=callback, loop=loop, sleep=delay)
+            return Manager._admission(callback, loop, delay, prio)
         # No limit for Native tasks!!!
         return NativeTask().create(callback=callback, tag=tag)
 
@@ -358,8 +496,8 @@ class Manager:
         Primary interface
             List tasks - micrOS top :D
         """
-        q = TaskBase.QUEUE_SIZE - Manager._queue_len()
-        out_active = ["---- micrOS  top ----", f"#queue: {q} #load: {Manager.LOAD}%\n", "#Active   #taskID"]
+        q = TaskBase.QUEUE_SIZE - TaskBase.ACTIVE
+        out_active = ["---- micrOS  top ----", f"#queue: {q} #wait: {len(Manager.WAITING)} #load: {Manager.LOAD}%\n", "#Active   #taskID"]
         out_passive = []
         for tag, task in TaskBase.TASKS.items():
             if json:
@@ -371,19 +509,37 @@ class Manager:
             _ = out_passive.append(view) if task.done.is_set() else out_active.append(view)
         return tuple(out_active), tuple(out_passive)
 
+    @staticmethod
+    def task_stats(json=False):
+        """
+        Primary interface
+            Task runtime profiler - wakeups, total and max time between resume and yield, last error
+        """
+        stats = sorted(((tag, task.stats) for tag, task in TaskBase.TASKS.items()), key=lambda t: t[1][1], reverse=True)
+        if json:
+            return {tag: {'wakeups': s[0], 'total_ms': int(s[1] // 1000), 'max_ms': int(s[2] // 1000), 'error': s[3]}
+                    for tag, s in stats}
+        out = [f"#load: {Manager.LOAD}%", "#wakeups  #total_ms  #max_ms   #taskID"]
+        for tag, s in stats:
+            wake, total, _max = str(s[0]), str(int(s[1] // 1000)), str(int(s[2] // 1000))
+            err = f"  [ERR] {s[3]}" if s[3] else ''
+            out.append(f"{wake}{' ' * (10 - len(wake))}{total}{' ' * (11 - len(total))}{_max}{' ' * (10 - len(_max))}{tag}{err}")
+        return '\n'.join(out)
+
+    @staticmethod
+    def _tag_match(tag:str, task_tag:str) -> bool:
+        """Task tag selection - module.func or module.*"""
+        if tag == task_tag:
+            return True
+        tag_parts = tag.split('.')
+        return len(tag_parts) > 1 and tag_parts[-1] == '*' and task_tag.startswith('.'.join(tag_parts[0:-1]))
+
     @staticmethod
     def _parse_tag(tag):
         """GET TASK(s) BY TAG - module.func or module.*"""
         task = TaskBase.TASKS.get(tag, None)
         if task is None:
-            _tasks = []
-            tag_parts = tag.split('.')
-            for t in TaskBase.TASKS:
-                if len(tag_parts) > 1 and t.startswith('.'.join(tag_parts[0:-1])) and tag_parts[-1] == '*':
-                    _tasks.append(t)
-            if len(_tasks) == 0:
-                return []
-            return _tasks
+            return [t for t in TaskBase.TASKS if Manager._tag_match(tag, t)]
         return [tag]
 
     @staticmethod
@@ -418,15 +574,22 @@ class Manager:
                 syslog(f"[ERR] Task kill: {e}")
                 return False
 
+        # Drop waiting (queued) task(s) first - module.func or module.* (killed tasks admit waiting ones)
+        output = []
+        for w in list(Manager.WAITING):
+            w_tag = '.'.join(w[0][0:2])
+            if Manager._tag_match(tag, w_tag):
+                Manager.WAITING.remove(w)
+                output.append(f"{w_tag}|queued")
+
         # Handle task group kill (module.*)
         tasks = Manager._parse_tag(tag)
         state = True
         if len(tasks) == 0:
-            return state, f"No task found: {tag}"
-        if len(tasks) == 1:
+            return state, f"Kill: {', '.join(output)}" if output else f"No task found: {tag}"
+        if len(tasks) == 1 and not output:
             msg = f"Kill: {tasks[0]}|{state}"
             return terminate(tasks[0]), msg
-        output = []
         for k in tasks:
             state &= terminate(k)
             output.append(f"{k}|{state}")
@@ -469,9 +632,10 @@ def exec_builtins(func):
     - modules         - show active modules list
     - task kill ...   - task termination
            show ...   - task output dump
+           stats      - task runtime profiler
     -  ... >json      - postfix to jsonify the output
     """
-    def wrapper(arg_list:list, jsonify=None):
+    def wrapper(arg_list:list, jsonify=None, raw=False):
         # Ensure the parameter is a list of strings
         if isinstance(arg_list, list) and arg_list:
             # Postfix operator handling
@@ -507,6 +671,10 @@ def exec_builtins(func):
                     on, off = Manager.list_tasks(json=json_flag)
                     # RETURN:    JSON mode                                                   Human readable mode with cpu & queue info
                     return (True, dumps({'active': on[3:], 'inactive': off})) if json_flag else (True, '\n'.join(on) + '\n' + '\n'.join(off) + '\n')
+                # task stats
+                if arg_len > 1 and 'stats' == arg_list[1]:
+                    stats = Manager.task_stats(json=json_flag)
+                    return True, dumps(stats) if json_flag else stats
                 # task kill <taskID> / task show <taskID>
                 if arg_len > 2:
                     if 'kill' == arg_list[1]:
@@ -514,16 +682,16 @@ def exec_builtins(func):
                         return True, msg
                     if 'show' == arg_list[1]:
                         return True, Manager.show(tag=arg_list[2])
-                return True, "Invalid task cmd! Help: task list / kill <taskID> / show <taskID>"
+                return True, "Invalid task cmd! Help: task list / stats / kill <taskID> / show <taskID>"
 
             # Call the decorated function with the additional flag
-            return func(arg_list, json_flag)
+            return func(arg_list, json_flag, raw)
         return False, None
 
     return wrapper
 
 
-def lm_exec(arg_list:list, jsonify:bool=None):
+def lm_exec(arg_list:list, jsonify:bool=None, prio:int=None, raw:bool=False):
     """
     Main LM executor function with
     - async (background)
@@ -531,6 +699,8 @@ def lm_exec(arg_list:list, jsonify:bool=None):
     (single) task execution (_exec_lm_core)
     :param arg_list: command parameters
     :param jsonify: request json output (controlled by the decorator)
+    :param prio: background task priority class: TaskBase.IRQ / TaskBase.USER (default)
+    :param raw: return LM output object as is (dict, list, generator, ...) - streaming json encoder (WebEngine)
     Return Bool(OK/NOK), "Command output"
     """
 
@@ -543,17 +713,119 @@ def lm_exec(arg_list:list, jsonify:bool=None):
         delay = int(delay) if delay.isdigit() else None
         # Create and start async lm task
         try:
-            return True, Manager.create_task(arg_list, loop=loop, delay=delay)
+            return True, Manager.create_task(arg_list, loop=loop, delay=delay, prio=prio)
         except Exception as e:
             return False, {".".join(arg_list[0:2]): str(e)}
 
     # [2] Sync "realtime" task execution
-    state, out = _exec_lm_core(arg_list, jsonify)
+    state, out = _exec_lm_core(arg_list, jsonify, raw)
     return state, out
 
 
+#################################################################
+#                   LM DISPATCH CACHE functions                 #
+#################################################################
+LM_DISPATCH = {}        # Resolved LM functions: {(lm_mod, lm_func): (module obj, function obj)}
+
+
+def _lm_resolve(lm_mod:str, lm_func:str) -> callable:
+    """
+    Resolve Load Module function object with dispatch cache
+    - import module only once (sys.modules)
+    - cache entry is valid while the same module object is loaded
+    :param lm_mod: module name, ex.: LM_system
+    :param lm_func: function name, ex.: info
+    """
+    _mod = modules.get(lm_mod, None)
+    cached = LM_DISPATCH.get((lm_mod, lm_func), None)
+    if cached is not None and cached[0] is _mod:
+        return cached[1]
+    if _mod is None:
+        # LOAD MODULE - first call or after unload
+        __import__(lm_mod)
+        _mod = modules[lm_mod]
+    func = getattr(_mod, lm_func)
+    LM_DISPATCH[(lm_mod, lm_func)] = (_mod, func)
+    return func
+
+
+def _lm_value(token:str):
+    """
+    Convert parameter token to value (without compiler for simple literals)
+    - 'str' / "str", True, False, None, int, float
+    - fallback: list, tuple, dict, etc. literals by eval
+    """
+    if len(token) > 1 and token[0] in ('"', "'") and token[-1] == token[0] and '\\' not in token:
+        return token[1:-1]
+    if token in ('True', 'False', 'None'):
+        return {'True': True, 'False': False, 'None': None}[token]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    return eval(token, {})
+
+
+def _lm_params(param_list:list) -> (list, dict):
+    """
+    Parse LM call parameters into positional and keyword values
+    :param param_list: list of string parameters (separator: space, "quoted values" are kept together)
+    Return args (list), kwargs (dict)
+    """
+    args, kwargs = [], {}
+    if not param_list:
+        return args, kwargs
+
+    chunks = []
+    current = ''
+    quote = None
+    for char in ' '.join(param_list):
+        if char in ('"', "'"):
+            if quote is None:
+                quote = char
+            elif quote == char:
+                quote = None
+            current += char
+            continue
+        if char == ' ' and quote is None:
+            if current:
+                chunks.append(current)
+                current = ''
+            continue
+        current += char
+    if current:
+        chunks.append(current)
+
+    for chunk in chunks:
+        if '=' in chunk and chunk[0] not in ('"', "'", '[', '(', '{'):
+            key, value = chunk.split('=', 1)
+            kwargs[key] = _lm_value(value)
+        else:
+            args.append(_lm_value(chunk))
+    return args, kwargs
+
+
+def lm_unload(lm_mod:str) -> bool:
+    """
+    Unload Load Module and invalidate its dispatch cache entries
+    :param lm_mod: module name, ex.: LM_rgb
+    Return True: unloaded, False: not loaded
+    """
+    for key in tuple(LM_DISPATCH):
+        if key[0] == lm_mod:
+            del LM_DISPATCH[key]
+    if lm_mod in modules:
+        del modules[lm_mod]
+        return True
+    return False
+
+
 @exec_builtins
-def _exec_lm_core(cmd_list, jsonify):
+def _exec_lm_core(cmd_list, jsonify, raw=False):
     """
     [CORE] Single command executor: MODULE.FUNCTION...
     :param cmd_list: list of string parameters
@@ -561,81 +833,60 @@ def _exec_lm_core(cmd_list, jsonify):
         [2] function
         [3...] parameters (separator: space)
     :param jsonify: request json output
+    :param raw: skip output formatting, return LM output object
     Return Bool(OK/NOK), Str(Command output)
     """
 
-    def _func_params(param):
-        if not param:
-            return ''
-
-        chunks = []
-        current = ''
-        quote = None
-        for char in param:
-            if char in ('"', "'"):
-                if quote is None:
-                    quote = char
-                elif quote == char:
-                    quote = None
-                current += char
-                continue
-            if char == ' ' and quote is None:
-                if current:
-                    chunks.append(current)
-                    current = ''
-                continue
-            current += char
-
-        if current:
-            chunks.append(current)
-
-        return ', '.join(chunks)
-
     # LoadModule execution
     if len(cmd_list) >= 2:
-        lm_mod, lm_func, lm_params = f"LM_{cmd_list[0]}", cmd_list[1], _func_params(' '.join(cmd_list[2:]))
-        print(f"[DEBUG] LM exec: {lm_mod}.{lm_func}({lm_params})")
+        lm_mod, lm_func = f"LM_{cmd_list[0]}", cmd_list[1]
         try:
-            # ------------- LM LOAD & EXECUTE ------------- #
-            # [1] LOAD MODULE - OPTIMIZED by sys.modules
-            if lm_mod not in modules:
-                exec(f"import {lm_mod}")
-            try:
-                # [2] EXECUTE FUNCTION FROM MODULE - over msgobj (socket or stdout)
-                lm_output = eval(f"{lm_mod}.{lm_func}({lm_params})")
-            except Exception as e:
-                # Handle not proper module load (simulator), note: module in sys.modules BUT not available
-                if lm_mod in str(e):
-                    # [2.1] LOAD MODULE - FORCED
-                    exec(f"import {lm_mod}")
-                    # [2.2] EXECUTE FUNCTION FROM MODULE - over msgobj (socket or stdout)
-                    lm_output = eval(f"{lm_mod}.{lm_func}({lm_params})")
-                else:
-                    raise e
-            # ------------ LM output format: dict(jsonify) / str(raw) ------------- #
-            # Handle LM output data
-            if isinstance(lm_output, dict):
-                # jsonify (True) json output, (False) default, "human readable" output)
-                lm_output = dumps(lm_output) if jsonify else '\n'.join(
-                    [f" {key}: {value}" for key, value in lm_output.items()])
-            if lm_func == 'help':
-                # Special case:
-                #   jsonify (True) json output, (False) default, "human readable" formatted output)
-                lm_output = dumps(lm_output) if jsonify else '\n'.join([f" {out}," for out in lm_output])
-            # Return LM exec result
-            return True, str(lm_output)
-            # ---------------------------------------------------------------------- #
+            # [1] PARSE PARAMETERS - positional and keyword values
+            lm_args, lm_kwargs = _lm_params(cmd_list[2:])
         except Exception as e:
-            if 'memory allocation failed' in str(e) or 'is not defined' in str(e):
-                # UNLOAD MODULE IF MEMORY ERROR HAPPENED + gc.collect
-                if lm_mod in modules:
-                    del modules[lm_mod]
-                gcollect()
-            # LM EXECUTION ERROR
             return False, f"Core error: {lm_mod}->{lm_func}: {e}"
+        print(f"[DEBUG] LM exec: {lm_mod}.{lm_func}{lm_args}{lm_kwargs}")
+        state, lm_output = _exec_lm_call(lm_mod, lm_func, lm_args, lm_kwargs)
+        if not state or raw:
+            return state, lm_output
+        # ------------ LM output format: dict(jsonify) / str(raw) ------------- #
+        # Handle LM output data
+        if isinstance(lm_output, dict):
+            # jsonify (True) json output, (False) default, "human readable" output)
+            lm_output = dumps(lm_output) if jsonify else '\n'.join(
+                [f" {key}: {value}" for key, value in lm_output.items()])
+        if lm_func == 'help':
+            # Special case:
+            #   jsonify (True) json output, (False) default, "human readable" formatted output)
+            lm_output = dumps(lm_output) if jsonify else '\n'.join([f" {out}," for out in lm_output])
+        # Return LM exec result
+        return True, str(lm_output)
     return False, "Shell: for hints type help.\nShell: for LM exec: [1](LM)module [2]function [3...]optional params"
 
 
+def _exec_lm_call(lm_mod:str, lm_func:str, lm_args:list, lm_kwargs:dict):
+    """
+    [CORE] Resolved LM function call with memory error handling
+    :param lm_mod: module name, ex.: LM_system
+    :param lm_func: function name
+    :param lm_args: positional parameters
+    :param lm_kwargs: keyword parameters
+    Return Bool(OK/NOK), raw LM output OR error message
+    """
+    try:
+        # ------------- LM LOAD & EXECUTE ------------- #
+        # [1] RESOLVE FUNCTION - OPTIMIZED by dispatch cache (sys.modules + getattr)
+        # [2] EXECUTE FUNCTION FROM MODULE - over msgobj (socket or stdout)
+        return True, _lm_resolve(lm_mod, lm_func)(*lm_args, **lm_kwargs)
+    except Exception as e:
+        if 'memory allocation failed' in str(e) or 'is not defined' in str(e):
+            # UNLOAD MODULE IF MEMORY ERROR HAPPENED + gc.collect
+            lm_unload(lm_mod)
+            gcollect()
+        # LM EXECUTION ERROR
+        return False, f"Core error: {lm_mod}->{lm_func}: {e}"
+
+
 def lm_is_loaded(lm_name):
     """
     [Auth mode]
@@ -648,33 +899,95 @@ def lm_is_loaded(lm_name):
 
 #####################  LM EXEC CORE WRAPPERS  #####################
 
+class LMPipe:
+    """
+    Pre-parsed LM command pipeline
+    - commands separated by ; (#comment commands are stripped)
+    - simple LM calls are stored as (lm_mod, lm_func, args, kwargs)
+    - built-ins, postfix operators (&, >json, >>node) and unparsable
+      commands are stored as None and executed by lm_exec
+    """
+    __slots__ = ['cmds']
+    PIPES = {}          # Config based pipelines: {config key: LMPipe}
+
+    def __init__(self, taskstr:str):
+        self.cmds = ()
+        self.compile(taskstr)
+
+    @staticmethod
+    def get(key:str):
+        """
+        Get pipeline by config key (timirqcbf, irq1_cbf, ...)
+        - parsed only once, recompiled when cfgput changes the key
+        """
+        pipe = LMPipe.PIPES.get(key, None)
+        if pipe is None:
+            pipe = LMPipe(cfgget(key))
+            LMPipe.PIPES[key] = pipe
+            cfgwatch(key, pipe.compile)
+        return pipe
+
+    def compile(self, taskstr:str):
+        """
+        Parse taskstr into command tuple
+        :param taskstr: contains LM calls separated by ;
+        """
+        cmds = []
+        # Handle config default empty value (do nothing)
+        if not taskstr.startswith('n/a'):
+            for cmd in (cmd.strip().split() for cmd in taskstr.split(';') if len(cmd.strip()) > 0):
+                if cmd[0].startswith("#"):
+                    console_write(f"[SKIP] exec_lm_pipe: {' '.join(cmd)}")
+                    continue
+                cmds.append((tuple(cmd), LMPipe._call(cmd)))
+        self.cmds = tuple(cmds)
+
+    @staticmethod
+    def _call(cmd:list):
+        """
+        Pre-parse simple LM call: (lm_mod, lm_func, args, kwargs) OR None
+        """
+        if len(cmd) < 2 or cmd[0] in ('task', 'modules') or cmd[-1] == '>json'\
+                or cmd[-1].startswith('>>') or '&' in cmd[-1]:
+            return None
+        try:
+            lm_args, lm_kwargs = _lm_params(cmd[2:])
+        except Exception:
+            return None
+        return f"LM_{cmd[0]}", cmd[1], lm_args, lm_kwargs
+
+    def run(self):
+        """
+        Execute pipeline commands - msgobj->"/dev/null"
+        - background tasks (&) are created with IRQ priority class
+        """
+        for cmd, call in self.cmds:
+            state = lm_exec(list(cmd), prio=TaskBase.IRQ)[0] if call is None else _exec_lm_call(*call)[0]
+            if not state:
+                syslog(f"[WARN] exec_lm_pipe: {' '.join(cmd)}")
+        return True
+
+
 def exec_lm_pipe(taskstr):
     """
     Real-time multi command executor
     - with #comment annotation feature
-    :param taskstr: contains LM calls separated by ;
+    :param taskstr: contains LM calls separated by ; OR pre-parsed LMPipe
     Used for execute config callback parameters (BootHook, IRQs, ...)
     """
     try:
-        # Handle config default empty value (do nothing)
-        if taskstr.startswith('n/a'):
-            return True
-        # Execute individual commands - msgobj->"/dev/null"
-        for cmd in (cmd.strip().split() for cmd in taskstr.split(';') if len(cmd) > 0):
-            if cmd[0].startswith("#"):
-                console_write(f"[SKIP] exec_lm_pipe: {' '.join(cmd)}")
-                continue
-            if not lm_exec(cmd)[0]:
-                syslog(f"[WARN] exec_lm_pipe: {' '.join(cmd)}")
+        if isinstance(taskstr, LMPipe):
+            return taskstr.run()
+        return LMPipe(taskstr).run()
     except Exception as e:
         syslog(f"[ERR] exec_lm_pipe {taskstr}: {e}")
         return False
-    return True
 
 
 def exec_lm_pipe_schedule(taskstr):
     """
     Scheduled Wrapper for exec_lm_pipe for IRQs (extIRQ, timIRQ,  cronIRQ)
+    :param taskstr: contains LM calls separated by ; OR pre-parsed LMPipe (no parsing in IRQ)
     """
     try:
         schedule(exec_lm_pipe, taskstr)
@@ -1,29 +1,43 @@
 """
 Module is responsible for Time related functions
 - ntp, clock setup, uptime
-- time tags support (cron): sunset, sunrise
+- async (non-blocking) ntp and suntime sync tasks
+- time tags support (cron): dawn, sunrise, sunset, dusk
+    offline sun time calculation (NOAA) by location (lat, lon)
 
 Designed by Marcell Ban aka BxNxM
 """
 
 from socket import socket, getaddrinfo, AF_INET, SOCK_DGRAM
-from re import compile as re_comp
 from struct import unpack
+from math import sin, cos, tan, asin, acos, radians, degrees
 from machine import RTC
 from network import WLAN, STA_IF
-from utime import sleep_ms, time, mktime, localtime
+from utime import sleep_ms, time, mktime, localtime, ticks_ms, ticks_diff
+from urandom import getrandbits
+import uasyncio as asyncio
 
-from Config import cfgput, cfgget
+from Config import cfgput, cfgget, cfgbatch, cfgwatch
 from Debug import syslog, console_write
-from urequests import get as http_get
+from urequests import get as http_get, aget as http_aget, resolve as http_resolve
 from Files import OSPath, path_join
+from Tasks import NativeTask, TaskBase
+
+_IP_API = 'http://ip-api.com/json/?fields=lat,lon,timezone,offset'
+_IP_PICKS = ('lat', 'lon', 'offset')
 
 
 class Sun:
-    TIME = {}
+    TIME = {}            # Sun time table of the day: dawn, sunrise, sunset, dusk (h, m, s)
+    DAY = None           # Date of TIME table (Y, M, D) - offline calculation
     UTC = cfgget('utc')  # STORED IN MINUTE
     BOOTIME = None       # Initialize BOOTIME: Not SUN, but for system uptime
     FILE_CACHE = path_join(OSPath.DATA, 'sun.cache')
+    NTP = None           # Last successful NTP sync (time)
+    NTP_ADDR = None      # Cached NTP server address (last good)
+    REFRESH = set()      # Sync task tags with failed last run: refresh address at next start
+    RETRY = 4            # Async sync attempts
+    BACKOFF_MS = 2000    # Async sync retry backoff base (doubled by attempts + jitter)
 
 
 def set_time(year, month, mday, hour, minute, sec):
@@ -43,48 +57,78 @@ def set_time(year, month, mday, hour, minute, sec):
     return True
 
 
+def _set_rtc(t):
+    """
+    Set RTC from NTP epoch with utc shift + update BOOTIME/uptime
+    :param t: utc epoch (since 2000)
+    """
+    tm = localtime(t + Sun.UTC * 60)
+    # Get localtime + GMT shift
+    RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
+    # Set bootup time - first time init
+    if Sun.BOOTIME is None:
+        Sun.BOOTIME = time()
+    Sun.NTP = time()
+    if localtime()[:3] != Sun.DAY:
+        sun_update()
+    return True
+
+
+def _ntp_addr(force=False):
+    """
+    Resolve (cached) NTP server address
+    - blocking getaddrinfo: only on cache miss or force
+    """
+    if Sun.NTP_ADDR is None or force:
+        Sun.NTP_ADDR = getaddrinfo("pool.ntp.org", 123)[0][-1]
+    return Sun.NTP_ADDR
+
+
+def _ntp_query():
+    query = bytearray(48)
+    query[0] = 0x1B
+    return query
+
+
+def _ntp_parse(msg):
+    # (date(2000, 1, 1) - date(1900, 1, 1)).days * 24*60*60
+    return unpack("!I", msg[40:44])[0] - 3155673600
+
+
 def ntp_time():
     """
     Set NTP time with utc shift + update BOOTIME/uptime
+    - blocking: use ntp_task() from async context
     :return: ntp date struct
     """
     if not WLAN(STA_IF).isconnected():
         syslog("[WARN] STA not connected: ntptime")
         return False
 
-    def get_ntp():
-        host = "pool.ntp.org"
-        # (date(2000, 1, 1) - date(1900, 1, 1)).days * 24*60*60
-        _ntp_delta = 3155673600
-        _ntp_query = bytearray(48)
-        _ntp_query[0] = 0x1B
-        addr = getaddrinfo(host, 123)[0][-1]
+    def get_ntp(addr):
         s = socket(AF_INET, SOCK_DGRAM)
         try:
             s.settimeout(2)
-            s.sendto(_ntp_query, addr)       # return with sendto response
+            s.sendto(_ntp_query(), addr)       # return with sendto response
             msg = s.recv(48)
         finally:
             s.close()
-        val = unpack("!I", msg[40:44])[0]
-        return val - _ntp_delta
+        return _ntp_parse(msg)
 
+    try:
+        addr = _ntp_addr()          # resolve once: keep the last good address on timeouts
+    except Exception as e:
+        syslog(f"[ERR] ntptime resolve: {e}")
+        return False
     err = ''
     for _ in range(4 if cfgget('cron') else 2):
         try:
-
-            t = get_ntp()
-            tm = localtime(t + Sun.UTC * 60)
-            # Get localtime + GMT shift
-            RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
-            # Set bootup time - first time init
-            if Sun.BOOTIME is None:
-                Sun.BOOTIME = time()
-            return True
+            return _set_rtc(get_ntp(addr))
         except Exception as e:
             console_write(f"ntptime error.:{e}")
             err = e
         sleep_ms(100)
+    Sun.NTP_ADDR = None             # every attempt failed: resolve again at the next sync
     syslog(f"[ERR] ntptime: {err}")
     return False
 
@@ -115,12 +159,117 @@ def __sun_cache(mode):
         pass
 
 
+def _ip_api(status, response):
+    """
+    Parse ip-api response: update utc shift
+    + set location (lat, lon) when not configured
+    """
+    if status != 200 or not isinstance(response, dict):
+        raise ValueError(f'invalid response status={status} data: {response}')
+    Sun.UTC = int(response.get('offset') / 60)      # IN MINUTE
+    lat, lon = response.get('lat'), response.get('lon')
+    with cfgbatch():
+        cfgput('utc', Sun.UTC, True)
+        if _location() is None and not (lat is None or lon is None):
+            cfgput('lat', lat, True)
+            cfgput('lon', lon, True)
+    return True
+
+
+def _location():
+    """
+    Configured location: (lat, lon) OR None
+    """
+    try:
+        return float(cfgget('lat')), float(cfgget('lon'))
+    except Exception:
+        return None         # n/a - not configured
+
+
+def _hms(minutes):
+    sec = int(minutes * 60 + 0.5) % 86400
+    return sec // 3600, sec // 60 % 60, sec % 60
+
+
+def sun_calc(date, lat, lon, utc=None):
+    """
+    Offline sun time calculation (NOAA solar calculator)
+    :param date: (year, month, day)
+    :param lat: latitude in degree (north: +)
+    :param lon: longitude in degree (east: +)
+    :param utc: utc shift in minute (default: Sun.UTC)
+    :return: sun dict {'dawn', 'sunrise', 'sunset', 'dusk': (h, m, s)} local time
+        polar day/night: no sunrise/sunset (dawn/dusk) keys
+    """
+    utc = Sun.UTC if utc is None else utc
+    year, month, day = date
+    # Days since 2000-01-01 - integer math (single precision float safe)
+    y, m = (year - 1, month + 12) if month <= 2 else (year, month)
+    days = 365 * y + y // 4 - y // 100 + y // 400 + (153 * (m - 3) + 2) // 5 + day - 730426
+    # Julian century (J2000.0) at solar noon
+    t = (days - lon / 360) / 36525
+    l0 = radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)        # mean longitude
+    ma = radians((357.52911 + t * (35999.05029 - 0.0001537 * t)) % 360)        # mean anomaly
+    ecc = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)                    # orbit eccentricity
+    center = (sin(ma) * (1.914602 - t * (0.004817 + 0.000014 * t)) + sin(2 * ma) * (0.019993 - 0.000101 * t)
+              + sin(3 * ma) * 0.000289)
+    omega = radians(125.04 - 1934.136 * t)
+    app_lon = radians(degrees(l0) + center - 0.00569 - 0.00478 * sin(omega))   # apparent longitude
+    obliq = radians(23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+                    + 0.00256 * cos(omega))
+    decl = asin(sin(obliq) * sin(app_lon))                                      # declination
+    v = tan(obliq / 2) ** 2
+    eqtime = 4 * degrees(v * sin(2 * l0) - 2 * ecc * sin(ma) + 4 * ecc * v * sin(ma) * cos(2 * l0)
+                         - 0.5 * v * v * sin(4 * l0) - 1.25 * ecc * ecc * sin(2 * ma))
+    noon = 720 - 4 * lon - eqtime + utc             # local solar noon in minute
+    lat = radians(lat)
+    sun = {}
+    # civil twilight: 96°, sunrise/sunset: 90.833° (refraction + sun disc)
+    for key, zenith, sign in (('dawn', 96, -1), ('sunrise', 90.833, -1), ('sunset', 90.833, 1), ('dusk', 96, 1)):
+        cos_ha = cos(radians(zenith)) / (cos(lat) * cos(decl)) - tan(lat) * tan(decl)
+        if -1 <= cos_ha <= 1:
+            sun[key] = _hms(noon + sign * 4 * degrees(acos(cos_ha)))
+    return sun
+
+
+def sun_table(day=0):
+    """
+    Sun time table of today + day
+    - today: precomputed Sun.TIME (sun_update)
+    - without location: Sun.TIME (cache) for every day
+    :param day: day offset from today
+    """
+    location = _location()
+    if location is None:
+        return Sun.TIME
+    date = localtime(time() + day * 86400)[:3]
+    if date == Sun.DAY:
+        return Sun.TIME
+    return sun_calc(date, *location)
+
+
+def sun_update(*_):
+    """
+    Precompute today's sun time table (Sun.TIME) - offline calculation
+    - builtin cron at midnight, ntp sync, location change
+    - without location: Sun.TIME from cache
+    """
+    location = _location()
+    if location is None:
+        return Sun.TIME
+    Sun.DAY = localtime()[:3]
+    Sun.TIME = sun_calc(Sun.DAY, *location)
+    __sun_cache('s')              # Using Sun.TIME
+    return Sun.TIME
+
+
 def suntime():
     """
-    GET sunrise and sunset time stumps for cron scheduling
+    Sync utc shift (+location) by geolocation and update sun times
     - url: http://ip-api.com/json
-    - url: https://api.sunrise-sunset.org
-    :return: sun dict {'sunset': (h:m:s), 'sunrise': (h:m:s)}
+    - sun times: offline calculation (sun_update)
+    - blocking: use suntime_task() from async context
+    :return: sun dict {'dawn', 'sunrise', 'sunset', 'dusk': (h:m:s)}
     """
 
     cron = cfgget('cron')
@@ -133,59 +282,113 @@ def suntime():
 
     # IP-API REQUEST HANDLING
     # Get latitude, longitude, timezone, utc offset by external ip
-    url = 'http://ip-api.com/json/?fields=lat,lon,timezone,offset'
-    response = {}
     try:
-        status, response = http_get(url, jsonify=True)
-        if status != 200 or not isinstance(response, dict):
-            syslog(f'[ERR] ip-api: invalid response status={status} data: {response}')
-            return Sun.TIME
-        lat = response.get('lat')
-        lon = response.get('lon')
-        Sun.UTC = int(response.get('offset') / 60)      # IN MINUTE
-        cfgput('utc', Sun.UTC, True)
+        _ip_api(*http_get(_IP_API, jsonify=_IP_PICKS))
     except Exception as e:
-        syslog(f'[ERR] ip-api: {e} data: {response}')
-        return Sun.TIME
+        syslog(f'[ERR] ip-api: {e}')
+    return sun_update()
+
+
+#############################################
+#        async (non-blocking) time sync     #
+#############################################
 
-    # SUNSET-SUNRISE API REQUEST HANDLING
-    # Get sunrise, sunset date times by lon, lat params
-    sun = {'sunrise': (), 'sunset': ()}
-    if not (lat is None or lon is None):
-        url = f'https://api.sunrise-sunset.org/json?lat={lat}&lng={lon}&date=today&formatted=0'
+async def _antp(timeout_ms=2000):
+    """
+    Async NTP sync over non-blocking UDP socket
+    - waits for running suntime task (utc shift update)
+    - address resolved by the sync task (_ntp_addr), no DNS lookup here
+    """
+    while TaskBase.is_busy('time.sun'):
+        await asyncio.sleep_ms(200)
+    if not WLAN(STA_IF).isconnected():
+        raise OSError("STA not connected")
+    s = socket(AF_INET, SOCK_DGRAM)
+    try:
+        s.setblocking(False)
+        s.sendto(_ntp_query(), Sun.NTP_ADDR)
+        start = ticks_ms()
+        while True:
+            try:
+                msg = s.recv(48)
+                if msg:
+                    break
+            except OSError:
+                pass                    # EAGAIN: no response yet
+            if ticks_diff(ticks_ms(), start) > timeout_ms:
+                raise OSError("timeout")
+            await asyncio.sleep_ms(50)
+    finally:
+        s.close()
+    _set_rtc(_ntp_parse(msg))
+    return localtime()
+
+
+async def _asuntime():
+    """
+    Async suntime sync over urequests.aget
+    - host address resolved by the sync task (http_resolve): cached in urequests
+    """
+    _ip_api(*await http_aget(_IP_API, jsonify=_IP_PICKS))
+    return sun_update()
+
+
+async def _sync_task(tag, name, job, resolve):
+    """
+    Time sync task with retry
+    - resolve server address once, outside of the retry loop
+        getaddrinfo is blocking (no async DNS): only on cache miss,
+        or when the last run failed - attempts reuse the last good address
+    - jittered exponential backoff between attempts
+    """
+    with TaskBase.TASKS.get(tag) as my_task:
         try:
-            status, response = http_get(url, sock_size=512, jsonify=True)
-            if status != 200 or not isinstance(response, dict):
-                syslog(f'[ERR] sunrise-api: invalid response status={status} data={response}')
-            else:
-                results = response.get('results')
-                if not isinstance(results, dict):
-                    syslog(f'[ERR] sunrise-api: invalid results data: {results}')
-                else:
-                    time_regex = re_comp(r'T([0-9:]+)')
-                    sun = {'sunrise': time_regex.search(results.get('sunrise')).group(1).split(':'),
-                           'sunset': time_regex.search(results.get('sunset')).group(1).split(':')}
+            resolve(tag in Sun.REFRESH)
         except Exception as e:
-            syslog(f'[ERR] sunrise-api: {e} data: {response}')
-    # Try to parse response by expected sun_keys
-    try:
-        for key in sun:
-            sun[key] = [int(val) for val in sun[key]]
-            sun[key][0] += int(Sun.UTC / 60)
-            sun[key] = tuple(sun[key])
-    except Exception as e:
-        syslog(f'[WARN] sunrise-api parse error: {e} sun: {sun}')
-        # Retrieve cached data and return
-        __sun_cache('r')  # Using Sun.TIME
-        console_write('[suntime] loaded from cache')
-        return Sun.TIME
+            my_task.out = f"{name} resolve error: {e}"
+            syslog(f"[ERR] {my_task.out}")
+            return False
+        Sun.REFRESH.discard(tag)
+        for attempt in range(Sun.RETRY):
+            try:
+                my_task.out = f"{name}: {await job()}"
+                return True
+            except Exception as e:
+                my_task.out = f"{name} error: {e}"
+            if attempt + 1 < Sun.RETRY:
+                delay = (Sun.BACKOFF_MS << attempt) + getrandbits(10)
+                my_task.out += f" - retry in {delay}ms"
+                await my_task.feed(sleep_ms=delay)
+        Sun.REFRESH.add(tag)
+        syslog(f"[ERR] {my_task.out}")
+        return False
 
-    # Save to values class static variable for later access
-    # Save and return with updated data
-    Sun.TIME = sun
-    __sun_cache('s')              # Using Sun.TIME
-    console_write('[suntime] sync done and cached')
-    return sun
+
+def _sync_start(tag, name, job, resolve):
+    if TaskBase.is_busy(tag):
+        return {tag: "Already running"}
+    return NativeTask().create(callback=_sync_task(tag, name, job, resolve), tag=tag)
+
+
+def ntp_task():
+    """
+    Start async NTP sync task (time.ntp)
+    - non-blocking version of ntp_time
+    """
+    return _sync_start('time.ntp', 'ntptime', _antp, _ntp_addr)
+
+
+def suntime_task():
+    """
+    Start async suntime sync task (time.sun)
+    - non-blocking version of suntime
+    """
+    cron = cfgget('cron')
+    if not cron:
+        msg = f"Cron: {cron} - SKIP sync"
+        console_write(msg)
+        return msg
+    return _sync_start('time.sun', 'suntime', _asuntime, lambda force: http_resolve(_IP_API, force))
 
 
 def uptime(update=False):
@@ -202,5 +405,8 @@ def uptime(update=False):
     return f"{int(days)} {int(hours)}:{int(minutes)}:{int(sec)}"
 
 
-# Initial suntime cache load (for AP mode)
+# Initial suntime cache load (for AP mode) + offline calculation (by location)
 __sun_cache('r')
+sun_update()
+cfgwatch('lat', sun_update)
+cfgwatch('lon', sun_update)
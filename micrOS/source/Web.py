@@ -18,8 +18,8 @@ from io import BytesIO
 from uos import stat
 from Tasks import lm_exec, lm_is_loaded, TaskBase
 from Config import cfgget
-from Files import OSPath, path_join
-from Buffer import SlidingBuffer, BufferFullError, MemoryPool
+from Files import OSPath, path_join, list_fs
+from Buffer import SlidingBuffer, RingBuffer, BufferFullError, MemoryPool
 from Debug import console_write, syslog
 from Auth import AuthRequired, PWD_KEY
 
@@ -96,6 +96,42 @@ def _parse_rest_cmd(cmd:str) -> list[str]:
     return tokens
 
 
+def _json_iter(obj):
+    """
+    Streaming JSON encoder - yields str fragments
+    - dict, list, tuple and generator values are encoded item by item (never materialized as a string)
+    - non-serializable values are encoded as str(value), resolved before the fragment is yielded
+    - dict/list: shallow snapshot per container (LM tasks can mutate it between the yields)
+    - keys as dumps: bool/None/number keys -> "true", "null", "1"
+    """
+    if isinstance(obj, dict):
+        items = list(obj.items())
+        yield '{'
+        sep = ''
+        for key, value in items:
+            if not isinstance(key, str):
+                key = dumps(key) if key is None or isinstance(key, (bool, int, float)) else str(key)
+            yield f"{sep}{dumps(key)}: "
+            yield from _json_iter(value)
+            sep = ', '
+        yield '}'
+    elif isinstance(obj, (list, tuple)) or type(obj).__name__ == "generator":
+        items = list(obj) if isinstance(obj, list) else obj
+        yield '['
+        sep = ''
+        for item in items:
+            yield sep
+            yield from _json_iter(item)
+            sep = ', '
+        yield ']'
+    else:
+        try:
+            value = dumps(obj)
+        except Exception:
+            value = dumps(str(obj))
+        yield value
+
+
 class HeaderParsingError(ValueError):
     """Exception for errors occurring while parsing HTTP/MIME headers"""
 
@@ -117,16 +153,22 @@ class Buffer:
     STATE_MACHINE_SLEEP_MS = 2
     RESP_HANDLER_SLEEP_MS = 2
     RECV_TIMEOUT_SECONDS = 10
+    KEEP_ALIVE_TIMEOUT_SECONDS = 5  # Persistent connection idle timeout (waiting for the next request)
     # Static buffer pools - initialized by init_pools()
     RECV_POOL = None
     SEND_POOL = None
+    # Buffer pool wrappers: RingBuffer - no compaction on streamed requests, SlidingBuffer - flushed entirely
+    RECV_WRAPPER = RingBuffer
+    SEND_WRAPPER = SlidingBuffer
     __slots__ = (
         "engine_state",
         "__writer",
         "__reader",
         "_prev_state",
         "_recv_buf",
-        "_send_buf"
+        "_send_buf",
+        "keep_alive",
+        "_idle"
     )
 
     def __init__(self, writer, reader):
@@ -138,6 +180,8 @@ class Buffer:
         self._prev_state = None
         self._recv_buf = None
         self._send_buf = None
+        self.keep_alive = False     # Persistent connection (HTTP/1.1 keep-alive)
+        self._idle = False          # Persistent connection is waiting for the next request
         self.__writer = writer
         self.__reader = reader
 
@@ -180,8 +224,8 @@ class Buffer:
         syslog((
             f"[INFO] Webcli.init_pools: {con_limit} connection(s) allowed"
         ))
-        Buffer.RECV_POOL = MemoryPool(recv_size, con_limit, wrapper=SlidingBuffer)
-        Buffer.SEND_POOL = MemoryPool(send_size, con_limit, wrapper=SlidingBuffer)
+        Buffer.RECV_POOL = MemoryPool(recv_size, con_limit, wrapper=Buffer.RECV_WRAPPER)
+        Buffer.SEND_POOL = MemoryPool(send_size, con_limit, wrapper=Buffer.SEND_WRAPPER)
 
 
     async def _flush_response(self):
@@ -202,6 +246,17 @@ class Buffer:
                 self._send_buf = Buffer.SEND_POOL.reserve()
             await TaskBase.feed(sleep_ms=Buffer.STATE_MACHINE_SLEEP_MS)
 
+    def _release_buffers(self):
+        """Give back the reserved buffers to the pools"""
+        if self._send_buf:
+            self._send_buf.consume()
+            Buffer.SEND_POOL.release(self._send_buf)
+            self._send_buf = None
+        if self._recv_buf:
+            self._recv_buf.consume()
+            Buffer.RECV_POOL.release(self._recv_buf)
+            self._recv_buf = None
+
     async def _run_state_machine(self):
         if self._prev_state == self.engine_state or self._prev_state is None:
             num_read = await self._read_to_buf()
@@ -229,6 +284,21 @@ class Buffer:
             await self._response_handler(resp_handler)
 
     async def _read_to_buf(self):
+        if self._idle:
+            # Persistent connection: buffers are released while waiting for the next request
+            self._release_buffers()
+            error, request = await self.__reader(decoding=None,
+                                                 timeout_seconds=Buffer.KEEP_ALIVE_TIMEOUT_SECONDS,
+                                                 read_bytes=Buffer.RECV_BUF_MIN_BYTES)
+            if error or not request:
+                # Idle timeout OR closed by peer - close connection silently
+                self.keep_alive = False
+                self.engine_state = None
+                return 0
+            self._idle = False
+            await self._reserve_buffers()
+            self._recv_buf.write(request)
+            return len(request)
         buf_free = self._recv_buf.capacity - self._recv_buf.size()
         if not buf_free:
             self.on_buffer_full(self._send_buf)
@@ -302,6 +372,7 @@ class WebEngine(Buffer):
     VERSION = "n/a"
     RESP_HEADERS = (
         200, b"HTTP/1.1 200 OK",
+        304, b"HTTP/1.1 304 Not Modified",
         401, b"HTTP/1.1 401 Unauthorized",
         400, b"HTTP/1.1 400 Bad Request",
         404, b"HTTP/1.1 404 Not Found",
@@ -329,6 +400,7 @@ class WebEngine(Buffer):
     DELETE = b"DELETE"
     METHODS = (GET, POST, DELETE)
     WEB_MOUNTS = {}
+    STATIC = {}         # Static resource metadata index (/web): {resource: (path, size, etag, content-type, gz)}
 
     CONTENT_LENGTH_ERROR = b"Content-Length mismatch"
     HEADER_ERROR = b"Invalid headers"
@@ -340,6 +412,10 @@ class WebEngine(Buffer):
         super().__init__(self.writer, self.read)
         # Init WebEngine ...
         WebEngine.VERSION = version
+        self._reset()
+
+    def _reset(self):
+        """Init state machine and request/response data"""
         # [State machine]
         self.engine_state = self._parse_request_line_st
         self.status_code = None
@@ -356,6 +432,16 @@ class WebEngine(Buffer):
         self.mp_delimiter = None
         self.mp_closing_delimiter = None
 
+    def next_request(self):
+        """
+        Persistent connection (keep-alive): restart state machine for the next request
+        - with the same reserved buffers, pipelined request is processed from the receive buffer
+        """
+        self._reset()
+        self._idle = not self._recv_buf.size()
+        # None: read socket first, False: process buffered (pipelined) data first
+        self._prev_state = None if self._idle else False
+
     def _auth_execute(self, callback, *args, **kwargs):
         """Run endpoint callback, retrying @sudo callbacks with custom web auth."""
         try:
@@ -368,6 +454,18 @@ class WebEngine(Buffer):
             kwargs[PWD_KEY] = password
             return callback(*args, **kwargs)
 
+    def _part_execute(self, callback, part_headers, part_body, last):
+        """
+        Run multipart endpoint callback on the part body view(s)
+        - body across the RingBuffer wrap point: one call per view (chunks of the part, first/last semantics)
+        """
+        result = None
+        for i, body in enumerate(part_body):
+            result = self._auth_execute(callback, part_headers, body,
+                                        first=self.mp_first_part, last=last and i == len(part_body) - 1)
+            self.mp_first_part = False
+        return result
+
     def _auth_response(self, tx):
         """Write the custom auth-required HTTP response."""
         accept = self.headers.get("accept", "")
@@ -435,10 +533,86 @@ class WebEngine(Buffer):
             _update(logs, "$logs", OSPath.LOGS)
         return WebEngine.WEB_MOUNTS
 
+    @staticmethod
+    def index_static() -> int:
+        """
+        PUBLIC METHOD: Build static resource metadata index from /web (root) files
+        - uploads are redirected to the user data dir, package (re)deploys are detected by _static_lookup
+        - .gz siblings are served as precompressed resources (Content-Encoding: gzip)
+        Return number of indexed resources
+        """
+        WebEngine.STATIC = {}
+        try:
+            files = list_fs(OSPath.WEB, type_filter='f')
+        except OSError as e:
+            syslog(f"[WARN] Web static index: {e}")
+            return 0
+        for name in files:
+            if name.endswith('.gz'):
+                continue
+            try:
+                WebEngine.STATIC[name] = WebEngine._static_meta(path_join(OSPath.WEB, name),
+                                                                gz=f"{name}.gz" in files)
+            except OSError as e:
+                syslog(f"[WARN] Web static index {name}: {e}")
+        return len(WebEngine.STATIC)
+
     # =========================================
     # Static helpers for parsing
     # =========================================
 
+    @staticmethod
+    def _etag(path:str, suffix:bytes=b'') -> tuple:
+        """
+        Size and modification time based ETag of a file: (size, etag)
+        """
+        stats = stat(path)
+        return stats[6], b'"%x-%x%s"' % (stats[6], stats[8], suffix)
+
+    @staticmethod
+    def _gz_meta(path:str):
+        """
+        Precompressed .gz sibling: (gz size, gz etag) OR None
+        - own size and mtime based etag (.gz can be (re)deployed independently)
+        """
+        try:
+            return WebEngine._etag(f"{path}.gz", b'-gz')
+        except OSError:
+            return None
+
+    @staticmethod
+    def _static_meta(path:str, gz:bool=True) -> tuple:
+        """
+        Static resource metadata: (path, size, etag, content-type, gz)
+        - etag: size and modification time based
+        - gz: (size, etag) of precompressed .gz sibling OR None
+        :param path: resolved file path
+        :param gz: check .gz sibling
+        """
+        size, etag = WebEngine._etag(path)
+        return path, size, etag, WebEngine._file_type(path), WebEngine._gz_meta(path) if gz else None
+
+    @staticmethod
+    def _static_lookup(resource:str):
+        """
+        Get STATIC index entry with freshness check (Pacman can (re)deploy /web resources)
+        - file or .gz sibling size/mtime changed (or .gz added/removed) -> rebuild entry
+        - file removed -> drop entry
+        Return metadata tuple OR None (not indexed)
+        """
+        meta = WebEngine.STATIC.get(resource, None)
+        if meta is None:
+            return None
+        try:
+            etag = WebEngine._etag(meta[0])[1]
+        except OSError:
+            WebEngine.STATIC.pop(resource, None)
+            return None
+        if meta[2] != etag or meta[4] != WebEngine._gz_meta(meta[0]):
+            meta = WebEngine._static_meta(meta[0])
+            WebEngine.STATIC[resource] = meta
+        return meta
+
     @classmethod
     def _get_header(cls, status_code):
         idx = cls.RESP_HEADERS.index(status_code)
@@ -492,20 +666,6 @@ class WebEngine(Buffer):
                 boundary = multipart_match.group(1).strip()
                 return boundary if boundary else None
 
-    @staticmethod
-    def _parse_body_part(part:memoryview) -> tuple[dict, bytes]:
-        """Parse part headers and body and return them as a tuple"""
-        blank_idx = -1
-        for i in range(len(part) - 3):
-            if part[i:i+4] == b'\r\n\r\n':
-                blank_idx = i
-                break
-        if blank_idx == -1:
-            raise HeaderParsingError()
-        headers = WebEngine._parse_headers(part[:blank_idx])
-        body = part[blank_idx + 4:]
-        return headers, body
-
     # =========================================
     # Helpers for engine_state machine termination
     # =========================================
@@ -519,7 +679,10 @@ class WebEngine(Buffer):
         self.engine_state = None
         self.status_code = status_code
         self.response_headers[b"content-type"] = content_type
-        self.response_headers[b"connection"] = b"close"
+        if status_code >= 400 and not (self.method == WebEngine.GET and status_code in (401, 404)):
+            # Request (body) state is unknown: close connection
+            self.keep_alive = False
+        self.response_headers[b"connection"] = b"keep-alive" if self.keep_alive else b"close"
 
     def _write_response_head(self, tx, content_length:int = None):
         """
@@ -528,6 +691,17 @@ class WebEngine(Buffer):
         """
         # Discard already accumulated content (e.g. 500 response on unexpected errors)
         tx.consume()
+        if (self.keep_alive and content_length is None and b"content-length" not in self.response_headers
+                and b"transfer-encoding" not in self.response_headers):
+            if self.status_code == 200:
+                # Unknown body length (stream) - delimited by connection close
+                self.keep_alive = False
+                self.response_headers[b"connection"] = b"close"
+            elif self.status_code != 304:
+                # Empty body - message delimited by content-length
+                content_length = 0
+        if self.keep_alive:
+            self.response_headers[b"keep-alive"] = b"timeout=%d" % Buffer.KEEP_ALIVE_TIMEOUT_SECONDS
         tx.write(self._get_header(self.status_code))
         if content_length is not None:
             tx.write(b"\r\n")
@@ -552,9 +726,8 @@ class WebEngine(Buffer):
         elif isinstance(body, str):
             body_encoded = body.encode()
             self._write_response_head(tx, len(body_encoded))
-        elif isinstance(body, (dict, tuple, list)):
-            body_encoded = dumps(body).encode()
-            self._write_response_head(tx, len(body_encoded))
+        elif isinstance(body, (dict, tuple, list)) or type(body).__name__ == "generator":
+            return self._generate_json_response(tx, body)
         else:
             self.on_failure(tx, b"Unhandled body type")
             return
@@ -562,6 +735,74 @@ class WebEngine(Buffer):
             return BytesIO(body_encoded)
         tx.write(body_encoded)
 
+    def _generate_json_response(self, tx, body):
+        """
+        Write JSON response with the streaming encoder (_json_iter), without
+        serializing the whole body into a string
+        - body fits into the send buffer: response with content-length
+        - otherwise: chunked transfer encoding, return a closure (response handler)
+          that encodes the rest of the body chunk by chunk into the send buffer
+        """
+        fragments = _json_iter(body)
+        buffered, size = [], 0
+        for fragment in fragments:
+            fragment = fragment.encode()
+            buffered.append(fragment)
+            size += len(fragment)
+            if size > tx.capacity:
+                break
+        else:
+            # Complete body (small)
+            self._write_response_head(tx, size)
+            if size > tx.capacity - tx.size():
+                return BytesIO(b"".join(buffered))
+            for fragment in buffered:
+                tx.write(fragment)
+            return
+        self.response_headers[b"transfer-encoding"] = b"chunked"
+        self._write_response_head(tx)
+        width = len(b"%x" % tx.capacity)
+
+        def _json_chunked(tx):
+            """
+            Write chunks: size (fixed width hex placeholder) CRLF data CRLF
+            :return bool: true if the stream is completed
+            """
+            def _fragments():
+                yield from buffered
+                buffered.clear()
+                for _fragment in fragments:
+                    yield _fragment.encode()
+
+            def _end_chunk(start):
+                chunk_size = b"%x" % (tx.size() - start - width - 2)
+                tx.peek(start + width)[start:] = b"0" * (width - len(chunk_size)) + chunk_size
+                tx.write(b"\r\n")
+
+            start = None
+            for piece in _fragments():
+                while piece:
+                    if start is None:
+                        if tx.capacity - tx.size() < width + 5:
+                            # No space for chunk size + data + CRLF: flush first
+                            yield False
+                        start = tx.size()
+                        tx.write(b"0" * width + b"\r\n")
+                    free = tx.capacity - tx.size() - 2
+                    tx.write(piece[:free])
+                    piece = piece[free:]
+                    if tx.capacity - tx.size() <= 2:
+                        _end_chunk(start)
+                        start = None
+                        yield False
+            if start is not None:
+                _end_chunk(start)
+            if tx.capacity - tx.size() < 5:
+                yield False
+            tx.write(b"0\r\n\r\n")
+            yield True
+        return _json_chunked
+
     def on_client_error(self, tx, info: bytes = BAD_REQUEST_ERROR):
         """Terminate state machine and write 400 response"""
         self.terminate(400)
@@ -569,10 +810,14 @@ class WebEngine(Buffer):
         self._write_response_head(tx, len(response))
         tx.write(response)
 
-    def on_missing_resource(self, tx):
+    def on_missing_resource(self, tx, info: bytes = None):
         """Terminate state machine and write 404 response"""
         self.terminate(404)
-        self._write_response_head(tx)
+        if info is None:
+            self._write_response_head(tx)
+            return
+        self._write_response_head(tx, len(info))
+        tx.write(info)
 
     def on_method_not_allowed(self, tx):
         """Terminate state machine and write 405 response"""
@@ -608,9 +853,9 @@ class WebEngine(Buffer):
     # ================================================================================
     # Parser states
     # - all states must handle rx and tx buffer arguments for reading and writing data
-    # - mandatory methods/attributes of rx: find(), peek(), consume(), size()
+    # - mandatory methods/attributes of rx: find(), peek(), read_views(), startswith(), consume(), size()
     # - mandatory methods/attributes of tx: capacity, consume(), write(), size()
-    # - rx/tx reference implementation: SlidingBuffer (Buffer.py)
+    # - rx/tx reference implementation: SlidingBuffer, RingBuffer (Buffer.py)
     # ================================================================================
 
     def _parse_request_line_st(self, rx, tx):
@@ -644,6 +889,8 @@ class WebEngine(Buffer):
             self.on_client_error(tx, self.HEADER_ERROR)
             return
         rx.consume(blank_idx + 4)
+        # HTTP/1.1 persistent connection by default
+        self.keep_alive = "close" not in self.headers.get("connection", "").lower()
         self.engine_state = self._route_request_st
 
     def _route_request_st(self, _, tx):
@@ -675,16 +922,19 @@ class WebEngine(Buffer):
             # EXECUTE COMMAND - LoadModule
             if WebEngine.AUTH:
                 if lm_is_loaded(cmd[0]):
-                    state, out = lm_exec(cmd, jsonify=True)
+                    state, out = lm_exec(cmd, jsonify=True, raw=True)
                 else:
                     state, out = (True, 'Auth:Protected')
             else:
-                state, out = lm_exec(cmd, jsonify=True)
-            try:
-                # Load again ... hack for embedded json converter...
-                resp_schema['result'] = loads(out)
-            except:
-                resp_schema['result'] = out
+                state, out = lm_exec(cmd, jsonify=True, raw=True)
+            # LM output objects (dict, list, generator) are encoded by the streaming json encoder
+            if isinstance(out, str):
+                try:
+                    # Built-in commands and string outputs with embedded json
+                    out = loads(out)
+                except:
+                    pass
+            resp_schema['result'] = out
             resp_schema['state'] = state
         else:
             resp_schema['result'] = {"micrOS": WebEngine.VERSION,
@@ -711,11 +961,14 @@ class WebEngine(Buffer):
                     return
                 if self.headers["content-length"] > rx.size():
                     return
-                if self.headers["content-length"] < rx.size():
+                if self.headers["content-length"] < rx.size() and not self.keep_alive:
                     self.on_client_error(tx, self.CONTENT_LENGTH_ERROR)
                     return
                 self.engine_state = None
-                dtype, data = self._auth_execute(callback, self.headers, bytes(rx.peek()))
+                # Keep pipelined data (next request) in the receive buffer
+                body = bytes(rx.peek(self.headers["content-length"]))
+                rx.consume(self.headers["content-length"])
+                dtype, data = self._auth_execute(callback, self.headers, body)
                 dtype = dtype.encode("ascii")
             else:
                 if not callable(callback):
@@ -796,19 +1049,39 @@ class WebEngine(Buffer):
         return _multipart_wrapper
 
     def _send_file_st(self, _, tx, web_resource: str):
-        """State for returning a static resource"""
-        err, web_resource = url_path_resolve(web_resource)
-        if err:
-            self.on_missing_resource(tx, b"Mount not found")
-            return
+        """
+        State for returning a static resource
+        - metadata from STATIC index (/web) or stat (mounts, sub dirs)
+        - conditional request (If-None-Match: ETag) -> 304 Not Modified
+        - precompressed .gz sibling when client accepts gzip
+        """
+        accept_gzip = "gzip" in self.headers.get("accept-encoding", "")
         try:
-            file_size = stat(web_resource)[6]
-            content_type = WebEngine._file_type(web_resource)
-            self.response_headers[b"content-length"] = str(file_size).encode()
+            meta = WebEngine._static_lookup(web_resource)
+            if meta is None:
+                err, web_resource = url_path_resolve(web_resource)
+                if err:
+                    self.on_missing_resource(tx, b"Mount not found")
+                    return
+                meta = WebEngine._static_meta(web_resource, gz=accept_gzip)
+            path, size, etag, content_type, gz = meta
+            if gz is not None:
+                self.response_headers[b"vary"] = b"accept-encoding"
+                if accept_gzip:
+                    path, (size, etag) = f"{path}.gz", gz
+                    self.response_headers[b"content-encoding"] = b"gzip"
+            self.response_headers[b"etag"] = etag
+            self.response_headers[b"cache-control"] = b"no-cache"
+            if etag.decode() in self.headers.get("if-none-match", ""):
+                self.terminate(304, content_type)
+                self._write_response_head(tx)
+                return
+            self.response_headers[b"content-length"] = str(size).encode()
             self.terminate(200, content_type)
             self._write_response_head(tx)
-            return open(web_resource, "rb")
+            return open(path, "rb")
         except OSError:
+            self.response_headers = {}
             self.on_missing_resource(tx)
 
     def _start_multipart_parser_st(self, rx, tx):
@@ -820,7 +1093,7 @@ class WebEngine(Buffer):
             return
         self.mp_delimiter = b'--' + self.mp_boundary + b'\r\n'
         self.mp_closing_delimiter = b'--' + self.mp_boundary + b'--'
-        if rx.peek(start_delimiter + 2) != self.mp_delimiter:
+        if start_delimiter + 2 != len(self.mp_delimiter) or not rx.startswith(self.mp_delimiter):
             self.on_client_error(tx, self.MULTIPART_BOUNDARY_ERROR)
             return
         rx.consume(start_delimiter + 2)
@@ -828,9 +1101,13 @@ class WebEngine(Buffer):
         self.engine_state = self._parse_boundary_st
 
     def _parse_boundary_st(self, rx, _):
-        """State for parsing multipart boundary delimiter"""
-        if rx.find(b'\r\n' + self.mp_delimiter) == -1 and \
-            rx.find(b'\r\n' + self.mp_closing_delimiter) == -1:
+        """
+        State for parsing multipart boundary delimiter
+        - one search term (CRLF--boundary): cached skip table of the buffer
+        - wait for the complete (closing) delimiter, validated by the next state
+        """
+        next_delimiter = rx.find(b'\r\n--' + self.mp_boundary)
+        if next_delimiter == -1 or rx.size() < next_delimiter + 2 + len(self.mp_delimiter):
             return
         self.engine_state = self._parse_complete_part_st
 
@@ -838,18 +1115,26 @@ class WebEngine(Buffer):
         """
         State for processing complete parts in a multipart request
         - registered load module callback is required to process parts
+        - part body: zero-copy view(s) of the receive buffer, never re-arranged (RingBuffer wrap point)
         """
         next_delimiter = rx.find(b'\r\n--' + self.mp_boundary)
-        part = rx.peek(next_delimiter)
-        rx.consume(next_delimiter + 2) # Consume leading CRLF
+        blank_idx = rx.find(b'\r\n\r\n')
+        if blank_idx == -1 or blank_idx + 4 > next_delimiter:
+            self.on_client_error(tx, self.HEADER_ERROR)
+            return
+        part_head = rx.read_views(blank_idx)
+        rx.consume(blank_idx + 4)
+        # Views stay valid after consume: rx is not written until the part is processed
+        part_body = rx.read_views(next_delimiter - blank_idx - 4)
+        rx.consume(next_delimiter - blank_idx - 2) # Consume leading CRLF
         self.content_length_cnt += next_delimiter + 2
-        is_final = rx.peek(len(self.mp_closing_delimiter)) == self.mp_closing_delimiter
+        is_final = rx.startswith(self.mp_closing_delimiter)
         # Validate part and content-length
         if self.headers["content-length"] < self.content_length_cnt:
             self.on_client_error(tx, self.CONTENT_LENGTH_ERROR)
             return
         try:
-            part_headers, part_body = WebEngine._parse_body_part(part)
+            part_headers = WebEngine._parse_headers(part_head[0] if len(part_head) == 1 else b"".join(part_head))
         except HeaderParsingError:
             self.on_client_error(tx, self.HEADER_ERROR)
             return
@@ -857,15 +1142,12 @@ class WebEngine(Buffer):
         # Process complete part
         try:
             if not is_final:
-                self._auth_execute(
-                    callback, part_headers, part_body,
-                    first=self.mp_first_part, last=False)
-                if rx.peek(len(self.mp_delimiter)) != self.mp_delimiter:
+                self._part_execute(callback, part_headers, part_body, last=False)
+                if not rx.startswith(self.mp_delimiter):
                     self.on_client_error(tx, self.MULTIPART_BOUNDARY_ERROR)
                     return
                 rx.consume(len(self.mp_delimiter))
                 self.content_length_cnt += len(self.mp_delimiter)
-                self.mp_first_part = False
                 self.engine_state = self._parse_boundary_st
                 return
         except AuthRequired:
@@ -877,13 +1159,10 @@ class WebEngine(Buffer):
         self.content_length_cnt + rx.size() != self.headers["content-length"]:
             self.on_client_error(tx, self.CONTENT_LENGTH_ERROR)
             return
+        # Discard request epilogue (persistent connection)
+        rx.consume(self.headers["content-length"] - self.content_length_cnt)
         try:
-            dtype, data = self._auth_execute(
-                callback,
-                part_headers,
-                part_body,
-                first=self.mp_first_part,
-                last=True)
+            dtype, data = self._part_execute(callback, part_headers, part_body, last=True)
         except AuthRequired:
             return self._auth_response(tx)
         self.terminate(200, dtype.encode("ascii"))
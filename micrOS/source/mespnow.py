@@ -2,7 +2,8 @@
 ESPNow Session Server and Protocol Utilities
 
 This module implements:
-- Custom ESPNow message protocol with transaction IDs (tid) for secure, session-aware communication.
+- Custom binary ESPNow message protocol with transaction IDs (tid) for secure, session-aware communication.
+- Message fragmentation and reassembly for outputs larger than the ESPNow payload limit (250 bytes).
 - Asynchronous server and client logic for sending and receiving ESPNow messages.
 - Response routing using both MAC address and transaction ID to ensure correct delivery to tasks.
 - Peer management, handshake routines, and statistics reporting for ESPNow devices.
@@ -15,6 +16,7 @@ from binascii import hexlify
 from json import load, dump
 import uasyncio as asyncio
 from urandom import getrandbits
+from utime import ticks_ms, ticks_diff
 from aioespnow import AIOESPNow
 
 from Tasks import NativeTask, lm_exec, lm_is_loaded
@@ -24,32 +26,74 @@ from Files import OSPath, path_join, is_file
 
 
 # ----------- PARSE AND RENDER MSG PROTOCOL  --------------
-
-def render_packet(tid: str, oper: str, data: str, prompt: str) -> str:
+# Binary packet: | tid (8) | oper (1) | seq (1) | count (1) | flags (1) | payload (max. 238) |
+#   first fragment payload (FLAG_PROMPT): | prompt len (1) | prompt | data |
+OPER_REQ = 0xA1             # Request (command execution)
+OPER_RSP = 0xA2             # Response (command output)
+OPERS = {"REQ": OPER_REQ, "RSP": OPER_RSP}
+FLAG_PROMPT = 0x01          # Payload starts with the sender prompt (first fragment)
+HEADER_LEN = 12
+MAX_PACKET = 250            # ESPNow max. payload (MAX_DATA_LEN)
+MAX_FRAGMENTS = 32          # Max. message: ~7.5kB (RAM limit of reassembly)
+RX_BUF = MAX_FRAGMENTS * (MAX_PACKET + 13)  # Receive buffer for a max. message burst (packet + rx header), default: 526
+
+
+def render_packet(tid: bytes, oper: str, data: str, prompt: str) -> list[bytes]:
     """
-    Render ESPNow custom message (protocol)
+    Render ESPNow custom message (protocol) into binary packet fragments
+    :param tid: 8 byte transaction id
+    :param oper: REQ or RSP
+    :param data: message data (command or output)
+    :param prompt: sender device name (devfid)
     """
-    if oper not in ("REQ", "RSP"):
+    if oper not in OPERS:
         syslog(f"[ERR] espnow render_response, unknown oper: {oper}")
-    return f"{tid}|{oper}|{str(data)}|{prompt}$"
+    prompt = prompt.encode('utf-8')
+    data = bytes([len(prompt)]) + prompt + str(data).encode('utf-8')
+    size = MAX_PACKET - HEADER_LEN
+    count = (len(data) + size - 1) // size
+    if count > MAX_FRAGMENTS:
+        syslog(f"[WARN] espnow message truncated: {len(data)}b")
+        count = MAX_FRAGMENTS
+        end = size * count
+        while data[end] & 0xC0 == 0x80:
+            end -= 1        # Cut on utf-8 character boundary
+        data = data[:end]
+    oper = OPERS.get(oper, OPER_RSP)
+    data = memoryview(data)
+    return [tid + bytes((oper, seq, count, FLAG_PROMPT if seq == 0 else 0)) + data[seq*size:(seq+1)*size]
+            for seq in range(count)]
 
 
 def parse_packet(msg: bytes) -> tuple[bool, dict | str]:
     """
-    Parse ESPNow custom message protocol
+    Parse ESPNow custom message protocol (single packet / fragment)
+    Returns: tid, oper, seq, count, flags, data (bytes: fragment payload)
+    """
+    if len(msg) < HEADER_LEN:
+        return False, f"Missing header: {msg}"
+    oper, seq, count, flags = msg[8], msg[9], msg[10], msg[11]
+    if oper not in (OPER_REQ, OPER_RSP):
+        return False, f"Unknown oper: {oper}"
+    if seq >= count or count > MAX_FRAGMENTS:
+        return False, f"Invalid fragment: {seq}/{count}"
+    return True, {"tid": bytes(msg[:8]),
+                  "oper": "REQ" if oper == OPER_REQ else "RSP",
+                  "seq": seq,
+                  "count": count,
+                  "flags": flags,
+                  "data": bytes(msg[HEADER_LEN:])}
+
+
+def unpack_payload(payload: bytes) -> tuple[bool, tuple[str, str] | str]:
+    """
+    Split reassembled payload into (prompt, data) strings
     """
     try:
-        msg = msg.decode('utf-8').strip()
-    except UnicodeError:
+        plen = payload[0]
+        return True, (payload[1:plen+1].decode('utf-8'), payload[plen+1:].decode('utf-8'))
+    except (IndexError, UnicodeError):
         return False, "Invalid encoding"
-    # strip the trailing '$' then split on '|'
-    parts = msg.rstrip("$").split("|")
-    if len(parts) == 4:
-        return True, {"tid": parts[0],
-                      "oper": parts[1],
-                      "data": parts[2],
-                      "prompt": parts[3]}
-    return False, f"Missing 4 args: {msg}"
 
 
 def get_command_module(request):
@@ -65,12 +109,12 @@ def get_command_module(request):
     return command, module
 
 
-def generate_tid() -> str:
+def generate_tid() -> bytes:
     """
     Generate a secure, random transaction ID (tid).
-    Returns an 8-byte hex string.
+    Returns 8 random bytes.
     """
-    return hexlify(bytes([getrandbits(8) for _ in range(8)])).decode()
+    return bytes([getrandbits(8) for _ in range(8)])
 
 
 # ----------- ESPNOW SESSION SERVER - LISTENER AND SENDER  --------------
@@ -78,10 +122,14 @@ class ResponseRouter:
     """
     Response Router (by mac address)
     to connect sender task with receiver loop (aka server)
+    + fragment reassembly of incoming messages (by mac address and tid)
     """
-    _routes: dict[tuple[bytes, str], "ResponseRouter"] = {}
+    _routes: dict[tuple[bytes, bytes], "ResponseRouter"] = {}
+    _fragments: dict[tuple[bytes, bytes], list] = {}
+    MAX_PENDING = 4         # Max. number of parallel partial unrouted (request) messages,
+                            # awaited responses (routes: single and group send) have own slots
 
-    def __init__(self, mac: bytes, tid: str):
+    def __init__(self, mac: bytes, tid: bytes):
         self.mac = mac
         self.tid = tid
         self.response = None
@@ -98,17 +146,92 @@ class ResponseRouter:
         return self.response
 
     @staticmethod
-    def update_response(mac: bytes, tid: str, response: str) -> None:
+    def reassemble(mac: bytes, packet: dict) -> bytes | None:
+        """
+        Collect message fragments
+        :param mac: sender binary mac address
+        :param packet: parsed packet (fragment)
+        Return complete payload OR None (waiting for more fragments)
+        """
+        count = packet["count"]
+        if count == 1:
+            return packet["data"]
+        key = (mac, packet["tid"])
+        fragments = ResponseRouter._fragments.get(key, None)
+        if fragments is None or len(fragments) != count:
+            if key not in ResponseRouter._routes:
+                pending = [k for k in ResponseRouter._fragments if k not in ResponseRouter._routes]
+                if len(pending) >= ResponseRouter.MAX_PENDING:
+                    # Drop the oldest unrouted partial message (lost fragment)
+                    ResponseRouter._fragments.pop(pending[0])
+            fragments = ResponseRouter._fragments[key] = [None] * count
+        fragments[packet["seq"]] = packet["data"]
+        if None in fragments:
+            return None
+        del ResponseRouter._fragments[key]
+        return b"".join(fragments)
+
+    @staticmethod
+    def update_response(mac: bytes, tid: bytes, response: str) -> None:
         router = ResponseRouter._routes.get((mac, tid), None)
         if router is None:
-            syslog(f"[WARN][ESPNOW] No response route for {(mac, tid)}")
+            syslog(f"[WARN][ESPNOW] No response route for {(mac, hexlify(tid).decode())}")
             return
-        router.response = response
-        router._event.set()
+        router._update(mac, response)
+
+    def _update(self, mac: bytes, response: str) -> None:
+        self.response = response
+        self._event.set()
 
     def close(self) -> None:
         """Remove routing entry when done."""
         ResponseRouter._routes.pop((self.mac, self.tid), None)
+        ResponseRouter._fragments.pop((self.mac, self.tid), None)
+
+
+class GroupRouter(ResponseRouter):
+    """
+    Group Response Router (by mac addresses)
+    to collect responses of one tid from many peers (single collector)
+    """
+
+    def __init__(self, macs: list[bytes], tid: bytes):
+        self.macs = list(macs)
+        self.tid = tid
+        self.responses: dict[bytes, str] = {}
+        self.errors: dict[bytes, str] = {}
+        self._event = asyncio.Event()
+        for mac in macs:
+            ResponseRouter._routes[(mac, tid)] = self
+
+    async def get_responses(self, timeout: int=10) -> dict[bytes, str]:
+        """Wait for all expected responses until the deadline."""
+        if self.macs:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.responses
+
+    def _update(self, mac: bytes, response: str) -> None:
+        self.responses[mac] = response
+        if len(self.responses) >= len(self.macs):
+            self._event.set()
+
+    def drop(self, mac: bytes, error: str) -> None:
+        """Unreachable peer (send failed): no response expected, record the error."""
+        if mac in self.macs:
+            self.macs.remove(mac)
+            ResponseRouter._routes.pop((mac, self.tid), None)
+        self.errors[mac] = error
+        if len(self.responses) >= len(self.macs):
+            self._event.set()
+
+    def close(self) -> None:
+        """Remove all routing entries when done."""
+        for mac in self.macs:
+            ResponseRouter._routes.pop((mac, self.tid), None)
+            ResponseRouter._fragments.pop((mac, self.tid), None)
 
 
 class ESPNowSS:
@@ -129,6 +252,7 @@ class ESPNowSS:
         if not hasattr(self, '_initialized'):
             self._initialized = True
             self.espnow = AIOESPNow()                   # Instance with async support
+            self.espnow.config(rxbuf=RX_BUF)            # Fragments are sent back to back (applied on active)
             self.espnow.active(True)
             self.devfid = cfgget('devfid')
             self.__auth = cfgget('auth')
@@ -156,19 +280,29 @@ class ESPNowSS:
         Handle server input message (request), with REQ/RSP types (oper)
             oper==REQ   - command execution
             oper==RSP   - command response
-        :param msg: valid message format> "{tid}|{oper}|{data}|{prompt}$", {data} is the user input
+        :param msg: valid binary packet (fragment), see render_packet
         :param my_task: Server task instance, for my_task.out update
         :param mac: sender binary mac address
+        Return state, response packets (list) to send back
         """
 
         state, request = parse_packet(msg)
         if not state:
             my_task.out = f"[_ESPNOW] {request}"
             return state, request
+        # Wait for all fragments
+        payload = ResponseRouter.reassemble(mac, request)
+        if payload is None:
+            return False, ""
+        state, payload = unpack_payload(payload)
+        if not state:
+            my_task.out = f"[_ESPNOW] {payload}"
+            return state, payload
 
-        # parsed request: {"tid": "n/a", "oper": "n/a", "data": "n/a", "prompt": "n/a"}
+        # parsed request: {"tid": b"...", "oper": "REQ/RSP", "data": "...", "prompt": "..."}
+        request["prompt"], request["data"] = payload
         operation, prompt, tid = request["oper"], request["prompt"], request["tid"]
-        my_task.out = f"[{tid}] {operation} from {prompt}"
+        my_task.out = f"[{hexlify(tid).decode()}] {operation} from {prompt}"
         # Update known devices
         self.devices[mac] = request["prompt"]
 
@@ -185,7 +319,6 @@ class ESPNowSS:
             if not self.__auth or (self.__auth and lm_is_loaded(module)):
                 try:
                     state, out = lm_exec(command)
-                    # rendered_output: "{tid}|{oper}|{data}|{prompt}$"
                     rendered_out = render_packet(tid=tid, oper="RSP", data=out, prompt=self.devfid)
                     return state, rendered_out
                 except Exception as e:
@@ -240,11 +373,14 @@ class ESPNowSS:
         return NativeTask().create(callback=self._server(tag), tag=tag)
 
     #----------- SEND METHODS --------------
-    async def __asend_raw(self, mac: bytes, msg: str):
+    async def __asend_raw(self, mac: bytes, packets: list[bytes]):
         """
-        ESPnow send message to mac address
+        ESPnow send message (packet fragments) to mac address
         """
-        return await self.espnow.asend(mac, msg.encode("utf-8"))
+        for packet in packets:
+            if not await self.espnow.asend(mac, packet):
+                return False
+        return True
 
     async def _asend_task(self, tid: str, peer: bytes, tag: str, msg: str):
         """
@@ -253,10 +389,9 @@ class ESPNowSS:
         with NativeTask.TASKS.get(tag, None) as my_task:
             try:
                 router = ResponseRouter(peer, tid)
-                # rendered_output: "{tid}|{oper}|{data}|{prompt}$"
                 rendered_out = render_packet(tid=tid, oper="REQ", data=msg, prompt=self.devfid)
                 if await self.__asend_raw(peer, rendered_out):
-                    my_task.out = f"[ESPNOW SEND] {rendered_out}"
+                    my_task.out = f"[ESPNOW SEND] {hexlify(tid).decode()} {msg}"
                     my_task.out = await router.get_response()
                 else:
                     my_task.out = "[ESPNOW SEND] Peer not responding"
@@ -292,14 +427,62 @@ class ESPNowSS:
         # Create an asynchronous sending task.
         return NativeTask().create(callback=self._asend_task(tid, peer, task_id, msg), tag=task_id)
 
+    async def _agroup_send_task(self, tid: bytes, peers: list[bytes], tag: str, msg: str, timeout: int):
+        """
+        ESPNow group client task: send one command (tid) to many peers, collect all responses.
+        """
+        with NativeTask.TASKS.get(tag, None) as my_task:
+            router = GroupRouter(peers, tid)
+            start = ticks_ms()
+            try:
+                rendered_out = render_packet(tid=tid, oper="REQ", data=msg, prompt=self.devfid)
+                my_task.out = f"[ESPNOW GROUP SEND] {hexlify(tid).decode()} {msg}"
+                for peer in peers:
+                    try:
+                        if not await self.__asend_raw(peer, rendered_out):
+                            router.drop(peer, "Peer not responding")
+                    except OSError as e:
+                        router.drop(peer, f"Send error: {e}")
+                # Wait only for the reachable peers
+                responses = await router.get_responses(timeout)
+            except Exception as e:
+                my_task.out = f"[ERR][ESPNOW GROUP SEND] {e}"
+                return
+            finally:
+                router.close()
+            def name(mac):
+                return self.devices.get(mac, hexlify(mac, ':').decode())
+            my_task.out = {"responses": {name(mac): out for mac, out in responses.items()},
+                           "timeout": [name(mac) for mac in router.macs if mac not in responses],
+                           "unreachable": {name(mac): err for mac, err in router.errors.items()},
+                           "ms": ticks_diff(ticks_ms(), start)}
+
+    def group_send(self, msg: str, peers: list[bytes | str] = None, timeout: int=10) -> dict:
+        """
+        Send a command to many peers over ESPNow with one tid and one collector task.
+        :param msg: String command message to send.
+        :param peers: Binary MAC addresses or device names (default: all known devices)
+        :param timeout: response collection deadline in seconds
+        Task output: {"responses": {peer name: output}, "timeout": [...], "unreachable": {peer name: error}, "ms": elapsed}
+        """
+        macs = []
+        for peer in list(self.devices) if peers is None else peers:
+            mac = self.mac_by_peer_name(peer) if isinstance(peer, str) else peer
+            if mac is None:
+                return {peer: "Unknown device"}
+            macs.append(mac)
+        _, module_name = get_command_module(msg)
+        tid = generate_tid()
+        # Unique tag per group send (parallel group sends of the same module)
+        task_id = f"con.espnow.group.{module_name}.{hexlify(tid).decode()[:6]}"
+        return NativeTask().create(callback=self._agroup_send_task(tid, macs, task_id, msg, timeout),
+                                   tag=task_id)
+
     def cluster_send(self, msg):
         """
-        Send message for all peers
+        Send message for all peers (group send)
         """
-        _tasks = []
-        for peer_name in self.devices.values():
-            _tasks.append(self.send(peer_name, msg))
-        return _tasks
+        return self.group_send(msg)
 
     # ----------- OTHER METHODS --------------
     def save_peers(self):
@@ -65,10 +65,11 @@ def micrOS():
     nwmd = auto_nw_config()
     if nwmd == 'STA':
         # Set UTC + SUN TIMES FROM API ENDPOINTS
-        from Time import ntp_time, suntime
-        suntime()
+        # - async tasks: started with the event loop (time.sun, time.ntp)
+        from Time import ntp_task, suntime_task
+        suntime_task()
         # Set NTP - RTC + UTC shift + update uptime (boot time)
-        ntp_time()
+        ntp_task()
     else:
         # AP mode - no ntp sync set uptime anyway
         from Time import uptime
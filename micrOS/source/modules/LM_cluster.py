@@ -10,7 +10,7 @@ ShellCli (socket) extension (todo)
 
 from binascii import hexlify
 from machine import soft_reset
-from Config import cfgget, cfgput
+from Config import cfgget, cfgput, cfgbatch, cfgflush
 from Network import _select_available_wifi_nw, ifconfig, WLAN, STA_IF, AP_IF
 from Common import micro_task, exec_cmd, syslog
 if cfgget("espnow"):
@@ -37,6 +37,7 @@ async def _reboot(tag:str):
     """
     with micro_task(tag) as my_task:
         await my_task.feed(5000)
+        cfgflush(force=True)
         soft_reset()
 
 
@@ -60,8 +61,9 @@ def _update_wifi(ssid:str, pwd:str):
         essids_list.append(_ssid)
         passwords_list.append(_pwd)
         # Serialize back wifi settings to config file
-        cfgput("staessid",";".join(essids_list))
-        cfgput("stapwd", ";".join(passwords_list))
+        with cfgbatch():
+            cfgput("staessid",";".join(essids_list))
+            cfgput("stapwd", ";".join(passwords_list))
         # REBOOT
         _reboot()
         return "Soft reboot, apply wifi settings"
@@ -1,5 +1,5 @@
 from microIO import bind_pin, pinmap_search
-from Common import data_logger
+from Common import data_series
 from Types import resolve
 
 #########################################
@@ -46,16 +46,18 @@ def measure(log=False):
     _temp, _hum = __temp_hum()
     data = {'temp[C]': round(_temp, 2), 'hum[%]': round(_hum, 2)}
     if log:
-        data_logger(_LOG_NAME, data=str(data))
+        data_series(_LOG_NAME, data=data)
     return data
 
 
-def logger():
+def logger(start=None, points=100):
     """
-    Return temp, hum logged data
+    Return temp, hum logged data (binary time-series)
+    :param start: from unix epoch (sec), default: oldest sample
+    :param points: max number of (averaged) points
+    :return dict: fields, data
     """
-    data_logger(_LOG_NAME)
-    return ''
+    return data_series(_LOG_NAME, start=start, points=points)
 
 
 #######################
@@ -80,4 +82,4 @@ def help(widgets=False):
         (widgets=True) list of widget json for UI generation
     """
     return resolve(('GRAPH measure log=False',
-                             'logger', 'load', 'pinmap'), widgets=widgets)
+                             'logger start=None points=100', 'load', 'pinmap'), widgets=widgets)
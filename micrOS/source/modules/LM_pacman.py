@@ -1,7 +1,7 @@
-from sys import modules
 from Common import socket_stream
 from Files import list_fs, ilist_fs, remove_file, remove_dir, OSPath, path_join, is_protected
 from Auth import sudo
+from Tasks import lm_unload
 
 
 #############################################
@@ -222,9 +222,8 @@ def unload(module=None):
     :return str: verdict
     """
     if module.startswith("LM_") or module.startswith("IO_"):
-        if module in modules.keys():
-            del modules[module]
-            return f"Module unload {unload} done"
+        if lm_unload(module):
+            return f"Module unload {module} done"
         else:
             return f"No such module as {module}"
     else:
@@ -330,6 +329,9 @@ def delmod(mod):
     else:
         return f'Invalid {mod}, must ends with .py or .mpy'
     try:
-        return remove_file(path_join(OSPath.MODULES, to_remove))
+        verdict = remove_file(path_join(OSPath.MODULES, to_remove))
+        # Drop deleted module from memory + dispatch cache
+        lm_unload(to_remove.rsplit('.', 1)[0])
+        return verdict
     except Exception as e:
         return f'Cannot delete: {mod}: {e}'
@@ -1,5 +1,5 @@
 from urequests import get as http_get
-from urequests import aget as http_aget
+from urequests import session as http_session
 from Common import micro_task
 
 
@@ -52,7 +52,7 @@ async def __task(subdomain, tag):
             domain = subdomain
         else:
             domain = _subdomain(subdomain)
-        status_code, response = await http_aget(domain, jsonify=True)
+        status_code, response = await http_session().get(domain, jsonify=True)
         my_task.out = f'status: {status_code}, response: {response}'
     return {'status': status_code, 'response': response}
 
@@ -4,7 +4,7 @@ from network import WLAN, STA_IF, AP_IF
 from binascii import hexlify
 from Common import socket_stream, console
 from Network import get_mac, ifconfig as network_config
-from Time import ntp_time, set_time, uptime
+from Time import ntp_task, set_time, uptime
 from Tasks import Manager
 from Types import resolve
 from Notify import Notify
@@ -96,6 +96,18 @@ def alarms(clean=False, msgobj=None):
     return {'NOK alarm': errcnt} if errcnt > 0 else {'OK alarm': errcnt}
 
 
+@socket_stream
+def logs(level='user', msgobj=None):
+    """
+    Show system logs in time order - RAM (recent, all levels) and flash (persisted) logs merged
+    :param level str: min. log level: err, warn, boot, info, user (default: all)
+    :return dict: verdict
+    """
+    from Logger import syslog_read
+    errcnt = syslog_read(level=level, msgobj=msgobj)
+    return {'NOK alarm': errcnt} if errcnt > 0 else {'OK alarm': errcnt}
+
+
 #############################
 #           TIME            #
 #############################
@@ -115,26 +127,26 @@ def clock():
 def ntp():
     """
     Trigger NTP time sync
+    - async task: time.ntp (task show time.ntp)
     """
     try:
         # Automatic setup - over wifi - ntp
-        state = ntp_time()
-        return state, localtime()
+        return ntp_task()
     except Exception as e:
         return False, f"ntp error:{e}"
 
 
 def sun(refresh=False):
     """
-    Get sunset/sunrise time stumps
+    Get dawn/sunrise/sunset/dusk time stumps
     Parameters:
-        (bool) refresh: trigger sync with sun rest-api
+        (bool) refresh: trigger utc + location sync (geolocation api) - async task: time.sun
     Return:
         (dict) sun time
     """
-    from Time import suntime, Sun
+    from Time import suntime_task, Sun
     if refresh:
-        return suntime()
+        return suntime_task()
     return Sun.TIME
 
 
@@ -270,7 +282,7 @@ def help(widgets=False):
     """
     return resolve(('info', 'GRAPH{"refresh":5000} top', 'gclean', 'heartbeat', 'clock',
                     'setclock year month mday hour minute sec',
-                    'ntp', 'rssi', 'list_stations', 'pinmap key="builtin"', 'alarms clean=False',
+                    'ntp', 'rssi', 'list_stations', 'pinmap key="builtin"', 'alarms clean=False', 'logs level="user"',
                     'notifications enable=<None,True,False>',
                     'notify "msg" *',
                     'sun refresh=False', 'ifconfig', 'memory_usage',
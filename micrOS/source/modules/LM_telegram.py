@@ -18,6 +18,10 @@ class Telegram(Notify):
     _TOKEN = None  # Telegram token
     _CHAT_IDS = set()  # Telegram bot chat IDs - multi group support - persistent caching
     _API_PARAMS = "?offset=-1&limit=1&timeout=2"  # Generic API params - optimization
+    # getUpdates fields picked from the streamed response (no full json tree)
+    _MSG_PICKS = ("ok", "description", "result.*.message.message_id", "result.*.message.text",
+                  "result.*.message.chat.id", "result.*.message.chat.username",
+                  "result.*.message.chat.first_name", "result.*.message.chat.last_name")
     _IN_MSG_ID = None
     _FILE_CACHE = data_dir('telegram.cache')
 
@@ -77,8 +81,8 @@ class Telegram(Notify):
             if isinstance(reply_to, int):
                 data['reply_to_message_id'] = reply_to
                 Telegram._IN_MSG_ID = reply_to
-            _, _resp = urequests.post(url, headers={"Content-Type": "application/json"}, json=data, jsonify=True,
-                                      sock_size=128)
+            _, _resp = urequests.post(url, headers={"Content-Type": "application/json"}, json=data,
+                                      jsonify=("ok", "description"), sock_size=128)
             console_write(f"\tSend message:\n{data}\nresponse:\n{_resp}")
             return _resp
 
@@ -115,11 +119,11 @@ class Telegram(Notify):
     def __update_chat_ids(resp_json:dict):
         """
         Update known chat_id-s and cache them
-        - return active chat_id frm resp_json
+        - return active chat_id frm resp_json (_MSG_PICKS)
         """
         _cid = None
-        if resp_json.get("ok", None) and len(resp_json["result"]) > 0:
-            _cid = resp_json["result"][-1]["message"]["chat"]["id"]
+        if resp_json.get("ok", None) and "result.*.message.chat.id" in resp_json:
+            _cid = resp_json["result.*.message.chat.id"]
             # LIMIT Telegram._CHAT_IDS NOTIFICATION CACHE TO 3 IDs
             if len(Telegram._CHAT_IDS) < 4 and _cid not in Telegram._CHAT_IDS:
                 console_write("[NTFY GET] update chatIDs")
@@ -134,6 +138,19 @@ class Telegram(Notify):
                 raise Exception(f"Error retrieving chat ID: {error_message}")
         return _cid
 
+    @staticmethod
+    def __parse_msg(resp_json, response):
+        """
+        Fill response with the last message fields (_MSG_PICKS)
+        """
+        if "result.*.message.message_id" in resp_json:
+            response['c_id'] = Telegram.__update_chat_ids(resp_json)
+            username = resp_json.get("result.*.message.chat.username", None)
+            response['sender'] = (f"{resp_json.get('result.*.message.chat.first_name', '')}"
+                                  f"{resp_json.get('result.*.message.chat.last_name', '')}") if username is None else username
+            response['text'] = resp_json.get("result.*.message.text", None)
+            response['m_id'] = resp_json["result.*.message.message_id"]
+
     @staticmethod
     def get_msg():
         """
@@ -148,14 +165,9 @@ class Telegram(Notify):
         url = f"https://api.telegram.org/bot{bot_token}/getUpdates{Telegram._API_PARAMS}"
         console_write(f"\t[GET] request: {url}")
 
-        _, resp_json = urequests.get(url, jsonify=True, sock_size=128)
+        _, resp_json = urequests.get(url, jsonify=Telegram._MSG_PICKS, sock_size=128)
 
-        if len(resp_json["result"]) > 0:
-            response['c_id'] = Telegram.__update_chat_ids(resp_json)
-            resp = resp_json["result"][-1]["message"]
-            response['sender'] = f"{resp['chat']['first_name']}{resp['chat']['last_name']}" if resp['chat'].get(
-                'username', None) is None else resp['chat']['username']
-            response['text'], response['m_id'] = resp['text'], resp['message_id']
+        Telegram.__parse_msg(resp_json, response)
         console_write(f"\t\t[GET] response: {response}")
         return response
 
@@ -173,14 +185,10 @@ class Telegram(Notify):
         url = f"https://api.telegram.org/bot{bot_token}/getUpdates{Telegram._API_PARAMS}"
         console_write(f"\t[aGET] request: {url}")
 
-        _, resp_json = await urequests.aget(url, jsonify=True, sock_size=128)
+        # Keep-alive session: polling the same host - no TLS handshake per call
+        _, resp_json = await urequests.session().get(url, jsonify=Telegram._MSG_PICKS, sock_size=128)
 
-        if len(resp_json["result"]) > 0:
-            response['c_id'] = Telegram.__update_chat_ids(resp_json)
-            resp = resp_json["result"][-1]["message"]
-            response['sender'] = f"{resp['chat']['first_name']}{resp['chat']['last_name']}" if resp['chat'].get(
-                'username', None) is None else resp['chat']['username']
-            response['text'], response['m_id'] = resp['text'], resp['message_id']
+        Telegram.__parse_msg(resp_json, response)
         console_write(f"\t\t[aGET] response: {response}")
         return response
 
@@ -290,8 +298,8 @@ class Telegram(Notify):
                              {"command": "cmd_select",
                               "description": "Same as cmd, only first param must be device name."},
                              ]}
-        _, resp_json = urequests.post(url, headers={"Content-Type": "application/json"}, json=data, jsonify=True,
-                                      sock_size=128)
+        _, resp_json = urequests.post(url, headers={"Content-Type": "application/json"}, json=data,
+                                      jsonify=("ok", "description"), sock_size=128)
         return 'Custom commands was set' if resp_json['ok'] else str(resp_json)
 
 #########################################
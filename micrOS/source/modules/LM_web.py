@@ -7,7 +7,7 @@ Web backend loader
 from json import dumps, loads
 
 from Common import web_endpoint, web_mounts
-from Config import cfgget, cfgput
+from Config import cfgget, cfgput, cfgbatch, cfgflush
 from Auth import sudo
 
 def load(dashboard=True, fileserver:bool=False, fs_explore:bool=False, config=True):
@@ -67,18 +67,19 @@ def _cfg_set_clb(_, body):
         incoming_data = loads(body.decode('utf-8'))
         print('Received config update request:', incoming_data)
         failed_keys = []
-        for k, v in incoming_data.items():
-            try:
-                if isinstance(v, str) and not v.strip():
-                    if k == 'devfid':
-                        raise Exception("Device name cannot be empty")
-                    v = 'n/a'
-                state = cfgput(k, v, type_check=True)
-            except Exception as e:
-                state = False
-                k = f"{k}: {e}"
-            if not state:
-                failed_keys.append(k)
+        with cfgbatch():
+            for k, v in incoming_data.items():
+                try:
+                    if isinstance(v, str) and not v.strip():
+                        if k == 'devfid':
+                            raise Exception("Device name cannot be empty")
+                        v = 'n/a'
+                    state = cfgput(k, v, type_check=True)
+                except Exception as e:
+                    state = False
+                    k = f"{k}: {e}"
+                if not state:
+                    failed_keys.append(k)
         if failed_keys:
             return _cfg_json({
                 "state": False,
@@ -102,6 +103,7 @@ def _reboot_clb(*_):
     async def _soft_reboot(tag):
         with micro_task(tag) as my_task:
             await my_task.feed(1000)
+            cfgflush(force=True)
             soft_reset()
 
     return _cfg_json({"state": bool(_soft_reboot()), "result": "Soft reboot scheduled"})
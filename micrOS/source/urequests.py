@@ -11,11 +11,14 @@ try:
     from ussl import wrap_socket    # Legacy micropython ssl usage (+simulator mode)
 except ImportError:
     from ssl import wrap_socket     # From micropython 1.23...
+from utime import ticks_ms, ticks_diff
+from uos import remove, rename
 from Debug import syslog
 import uasyncio as asyncio
 
 
 ADDR_CACHE = {}
+SESSION = None          # Shared ASession instance (session)
 
 #############################################
 #  micropython request - helper functions   #
@@ -34,27 +37,6 @@ def _host_to_addr(host, port, force=False):
     return addr
 
 
-def _chunked(_body):
-    decoded = bytearray()
-    while _body:
-        line_end = _body.find(b"\r\n")
-        if line_end < 0:
-            break
-        try:
-            chunk_size = int(bytes(_body[:line_end]).decode('ascii'), 16)
-        except ValueError:
-            break
-        if chunk_size == 0:
-            break
-        data_start = line_end + 2
-        data_end = data_start + chunk_size
-        decoded.extend(_body[data_start:data_end])
-        if _body[data_end:data_end + 2] != b"\r\n":
-            break
-        _body = _body[data_end + 2:]
-    return decoded
-
-
 def _parse_url(url):
     # PARSE URL -> proto (http/https), host, path + SET PORT
     proto, _, host, path = url.split('/', 3)
@@ -66,7 +48,7 @@ def _parse_url(url):
     return host, port, proto, path
 
 
-def _build_request(host, method, path, headers, data=None, json=None):
+def _build_request(host, method, path, headers, data=None, json=None, keep_alive=False):
     body = b'' if data is None and json is None else \
            data.encode('utf-8') if data is not None else dumps(json).encode('utf-8')
     if body:
@@ -77,7 +59,8 @@ def _build_request(host, method, path, headers, data=None, json=None):
     req = bytearray(f'{method} /{path} HTTP/1.1\r\n'.encode('utf-8'))
     for k, v in headers.items():
         req.extend(f'{k}: {v}\r\n'.encode('utf-8'))
-    req.extend(f'Host: {host}\r\nConnection: close\r\n\r\n'.encode('utf-8'))
+    connection = 'keep-alive' if keep_alive else 'close'
+    req.extend(f'Host: {host}\r\nConnection: {connection}\r\n\r\n'.encode('utf-8'))
     req.extend(body)
     return req
 
@@ -96,22 +79,280 @@ def _parse_response_head(raw):
     return status_code, headers, header_end + 4
 
 
-def _body_requires_more(headers, body):
-    if headers.get(b'Transfer-Encoding', b'') == b'chunked':
-        return not body.endswith(b'0\r\n\r\n')
-    content_len = headers.get(b'Content-Length')
-    if content_len is not None:
-        return len(body) < int(content_len.decode('ascii'))
-    return True
+def _reusable(headers, method='GET'):
+    """
+    Connection can be kept alive: framed body (Content-Length / chunked) or no body (HEAD)
+    and no close by the server
+    """
+    if headers.get(b'Connection', b'').lower() == b'close':
+        return False
+    if method == 'HEAD':
+        return True
+    return headers.get(b'Content-Length') is not None or headers.get(b'Transfer-Encoding', b'') == b'chunked'
+
+
+class _Body:
+    """
+    Incremental HTTP body decoder
+    - Content-Length / chunked (de-chunked on the fly) / read until close
+    - feed: raw socket data, readinto: decoded body bytes
+    """
+    __slots__ = ("buf", "pos", "left", "chunked", "eof", "truncated")
+
+    def __init__(self, status_code, headers, data=b'', method='GET'):
+        self.buf = bytearray(data)
+        self.pos = 0
+        # No body: HEAD request, 204, 304 - do not wait for body bytes / connection close (keep-alive)
+        no_body = method == 'HEAD' or status_code in (204, 304)
+        self.chunked = not no_body and headers.get(b'Transfer-Encoding', b'') == b'chunked'
+        length = b'0' if no_body else headers.get(b'Content-Length')
+        # Content-Length / chunk bytes left, -1: read until close, chunked: 0 chunk end, -1 size line, -2 trailer
+        self.left = -1 if self.chunked or length is None else int(length)
+        self.eof = self.left == 0
+        self.truncated = False      # Connection closed before the end of a framed body
+
+    def feed(self, data):
+        if not data:
+            # Connection closed (Content-Length bytes left / chunked before the last chunk: truncated)
+            self.truncated = not self.eof and (self.left > 0 or self.chunked)
+            self.eof = True
+            return
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf.extend(data)
+
+    def _line(self):
+        end = self.buf.find(b'\r\n', self.pos)
+        if end < 0:
+            return None
+        line = bytes(self.buf[self.pos:end])
+        self.pos = end + 2
+        return line
+
+    def readinto(self, mv):
+        """
+        Copy decoded body bytes into memoryview
+        Returns byte count, 0: more data needed (or eof)
+        """
+        while self.chunked and self.left <= 0 and not self.eof:
+            line = self._line()
+            if line is None:
+                return 0
+            if self.left == 0:
+                self.left = -1                  # CRLF after chunk data
+            elif self.left == -1:
+                size = int(line.split(b';')[0], 16)
+                self.left = size if size else -2
+            elif not line:
+                self.eof = True                 # End of trailer
+        if self.eof:
+            return 0
+        n = min(len(mv), len(self.buf) - self.pos)
+        if self.left > 0:
+            n = min(n, self.left)
+        if n:
+            mv[:n] = memoryview(self.buf)[self.pos:self.pos + n]
+            self.pos += n
+            if self.left > 0:
+                self.left -= n
+                self.eof = self.left == 0 and not self.chunked
+        return n
+
+    def out_buffer(self):
+        """
+        Body buffer: preallocated with Content-Length (single allocation)
+        """
+        return bytearray(self.left) if self.left > 0 and not self.chunked else None
+
+
+_J_VALUE, _J_KEY, _J_COLON, _J_NEXT, _J_STR, _J_LIT = range(6)
+_J_WS = (0x20, 0x09, 0x0D, 0x0A)                  # whitespace: space \t \r \n
+_J_END = (0x2C, 0x7D, 0x5D) + _J_WS                 # literal end: , } ] whitespace
+
 
+class JsonPick:
+    """
+    Streamed JSON path picker - pull parser over body chunks, no full object tree
+    - paths: dot separated keys / array indexes, * matches any key or index
+        example: ("lat", "results.sunrise", "result.*.message.text")
+    - feed(chunk): parse the next body chunk
+    - result: {path: value} of the found paths (last match wins)
+    - bounded memory: only picked values are stored,
+      max_value limits a picked value (raw json) size - ValueError
+    """
+    __slots__ = ("result", "max_value", "_paths", "_stack", "_state", "_tok", "_esc",
+                 "_key", "_hit", "_cap", "_cap_path", "_cap_depth")
+
+    def __init__(self, paths, max_value=1024):
+        self.result = {}
+        self.max_value = max_value
+        self._paths = tuple((path, path.split('.')) for path in paths)
+        self._stack = []            # Open containers: [is_object, key / index, live (picked path below)]
+        self._state = _J_VALUE
+        self._tok = None            # Picked scalar / object key raw bytes (None: skip)
+        self._esc = False           # String escape sequence
+        self._key = False           # String is an object key
+        self._hit = None            # Picked path of the actual scalar
+        self._cap = None            # Picked object / array raw bytes
+        self._cap_path = None
+        self._cap_depth = 0
+
+    def _match(self):
+        """
+        Actual value location vs paths
+        Returns picked path (or None), descend (path under the value)
+        """
+        loc = [str(item[1]) for item in self._stack]
+        hit, descend = None, False
+        for path, parts in self._paths:
+            if len(parts) >= len(loc) and all(p == '*' or p == l for p, l in zip(parts, loc)):
+                if len(parts) == len(loc):
+                    hit = path
+                else:
+                    descend = True
+        return hit, descend
+
+    def _limit(self, buf):
+        if len(buf) > self.max_value:
+            raise ValueError(f"JsonPick value over {self.max_value} bytes")
+
+    def _start(self, c):
+        hit, descend = self._match() if (self._stack[-1][2] if self._stack else True) else (None, False)
+        if c in (0x7B, 0x5B):
+            obj = c == 0x7B
+            self._stack.append([obj, None if obj else 0, descend])
+            if hit is not None and self._cap is None:
+                self._cap, self._cap_path, self._cap_depth = bytearray((c,)), hit, len(self._stack)
+            self._state = _J_KEY if obj else _J_VALUE
+            return
+        self._hit, self._key = hit, False
+        if c == 0x22:
+            self._tok, self._state = (None if hit is None else bytearray()), _J_STR
+        else:
+            self._tok, self._state = (None if hit is None else bytearray((c,))), _J_LIT
 
-def _finalize_body(headers, body):
-    if headers.get(b'Transfer-Encoding', b'') == b'chunked':
-        return bytes(_chunked(body))
-    content_len = headers.get(b'Content-Length')
-    if content_len is not None:
-        body = body[:int(content_len.decode('ascii'))]
-    return body.decode('utf-8')
+    def _end(self):
+        """
+        String / literal finished: object key or (picked) scalar
+        """
+        tok, self._tok = self._tok, None
+        if self._key:
+            self._stack[-1][1] = None if tok is None else (loads(b'"' + tok + b'"') if b'\\' in tok else tok.decode())
+            self._state = _J_COLON
+            return
+        if tok is not None:
+            self.result[self._hit] = loads(b'"' + tok + b'"') if self._state == _J_STR else loads(tok)
+        self._state = _J_NEXT
+
+    def _close(self):
+        self._stack.pop()
+        if self._cap is not None and len(self._stack) < self._cap_depth:
+            self.result[self._cap_path] = loads(self._cap)
+            self._cap = None
+        self._state = _J_NEXT
+
+    def _step(self, c):
+        if self._cap is not None:
+            self._cap.append(c)
+            self._limit(self._cap)
+        state = self._state
+        if state == _J_STR:
+            if self._esc:
+                self._esc = False
+            elif c == 0x5C:
+                self._esc = True
+            elif c == 0x22:
+                self._end()
+                return
+            if self._tok is not None:
+                self._tok.append(c)
+                self._limit(self._tok)
+            return
+        if state == _J_LIT:
+            if c not in _J_END:
+                if self._tok is not None:
+                    self._tok.append(c)
+                    self._limit(self._tok)
+                return
+            self._end()
+            state = _J_NEXT
+        if c in _J_WS:
+            return
+        if state == _J_VALUE:
+            if c == 0x5D:
+                self._close()               # Empty array
+            else:
+                self._start(c)
+        elif state == _J_KEY:
+            if c == 0x22:
+                self._tok = bytearray() if self._stack[-1][2] else None
+                self._key, self._state = True, _J_STR
+            elif c == 0x7D:
+                self._close()               # Empty object
+        elif state == _J_COLON:
+            if c == 0x3A:
+                self._state = _J_VALUE
+        elif c == 0x2C:
+            top = self._stack[-1]
+            if top[0]:
+                self._state = _J_KEY
+            else:
+                top[1] += 1
+                self._state = _J_VALUE
+        elif c in (0x7D, 0x5D):
+            self._close()
+
+    def feed(self, data):
+        data = bytes(data)
+        i, n = 0, len(data)
+        while i < n:
+            if self._state == _J_STR and not self._esc:
+                # Bulk copy string content until the next quote / escape
+                end = n
+                for mark in (b'"', b'\\'):
+                    j = data.find(mark, i)
+                    if 0 <= j < end:
+                        end = j
+                if end > i:
+                    for buf in (self._tok, self._cap):
+                        if buf is not None:
+                            buf.extend(data[i:end])
+                            self._limit(buf)
+                    i = end
+                    continue
+            self._step(data[i])
+            i += 1
+        return self.result
+
+
+def _body_result(body, out):
+    """
+    Legacy body output: chunked -> bytes, others -> str
+    """
+    return bytes(out) if body.chunked else out.decode('utf-8')
+
+
+def _picks(jsonify):
+    """
+    jsonify: True (full json) OR json paths (tuple/list) to pick
+    """
+    return jsonify if isinstance(jsonify, (tuple, list)) else None
+
+
+def _result(status_code, body, jsonify):
+    """
+    Request output - raw (bytearray) body is used with jsonify (no str copy for loads)
+    """
+    if isinstance(body, dict):
+        # Picked json paths (JsonPick)
+        return status_code, body
+    if jsonify and status_code == 200:
+        # Empty body (HEAD, no content): empty json
+        return status_code, loads(body) if body else {}
+    if isinstance(body, bytearray):
+        body = body.decode('utf-8')
+    return status_code, body
 
 
 def _sock_write(sock, data):
@@ -125,7 +366,7 @@ def _sock_read_factory(sock):
     return sock.read if hasattr(sock, "read") else sock.recv
 
 
-def _read_response(receive, sock_size):
+def _read_head(receive, sock_size, method='GET'):
     raw = bytearray()
     while b'\r\n\r\n' not in raw:
         chunk = receive(sock_size)
@@ -133,58 +374,102 @@ def _read_response(receive, sock_size):
             break
         raw.extend(chunk)
     status_code, headers, body_start = _parse_response_head(raw)
-    body = raw[body_start:]
-    while _body_requires_more(headers, body):
-        chunk = receive(sock_size)
-        if not chunk:
-            break
-        body.extend(chunk)
-        if headers.get(b'Content-Length') is None and headers.get(b'Transfer-Encoding', b'') != b'chunked':
-            continue
-    return status_code, _finalize_body(headers, body)
+    return status_code, headers, _Body(status_code, headers, raw[body_start:], method)
 
 
-async def _aread_response(reader, sock_size):
-    raw = bytearray()
+async def _aread_head(reader, sock_size, head=b'', method='GET'):
+    raw = bytearray(head)
     while b'\r\n\r\n' not in raw:
         chunk = await reader.read(sock_size)
         if not chunk:
             break
         raw.extend(chunk)
     status_code, headers, body_start = _parse_response_head(raw)
-    body = raw[body_start:]
-    while _body_requires_more(headers, body):
-        chunk = await reader.read(sock_size)
-        if not chunk:
-            break
-        body.extend(chunk)
-        if headers.get(b'Content-Length') is None and headers.get(b'Transfer-Encoding', b'') != b'chunked':
-            continue
-    return status_code, _finalize_body(headers, body)
+    return status_code, headers, _Body(status_code, headers, raw[body_start:], method)
 
 
-#############################################
-#          micropython HTTP request         #
-#############################################
+def _read_response(receive, sock_size, raw=False, picks=None, method='GET'):
+    """
+    Read full response: status code, body
+    :param raw: return decoded body as bytearray (skip legacy str/bytes conversion)
+    :param picks: json paths to pick from the streamed body (JsonPick) - 200 status code only
+    """
+    status_code, _, body = _read_head(receive, sock_size, method)
+    if picks and status_code == 200:
+        picker, chunk = JsonPick(picks), memoryview(bytearray(sock_size))
+        while not body.eof:
+            n = body.readinto(chunk)
+            if n:
+                picker.feed(chunk[:n])
+            else:
+                body.feed(receive(sock_size))
+        return status_code, picker.result
+    out = body.out_buffer()
+    if out is None:
+        out, chunk = bytearray(), memoryview(bytearray(sock_size))
+        while not body.eof:
+            n = body.readinto(chunk)
+            if n:
+                out.extend(chunk[:n])
+            else:
+                body.feed(receive(sock_size))
+    else:
+        size, mv = 0, memoryview(out)
+        while size < len(out) and not body.eof:
+            n = body.readinto(mv[size:])
+            if n:
+                size += n
+            else:
+                body.feed(receive(sock_size))
+        out = out if size == len(out) else out[:size]
+    return status_code, out if raw else _body_result(body, out)
 
-def request(method:str, url:str, data:str=None, json=None, headers:dict=None, sock_size=256, jsonify=False):
+
+async def _aread_response(reader, sock_size, raw=False, picks=None, head=b'', method='GET'):
     """
-    Micropython syncronous HTTP request function for REST API handling
-    :param method: GET/POST
-    :param url: URL for REST API
-    :param data: string body (handle bare string as data for POST method)
-    :param json: json body (handle json as data for POST method)
-    :param headers: define headers
-    :param sock_size: socket buffer size (chuck size), default 256 byte (micropython defualt)
-    :param jsonify: convert response body to json
+    Async read full response: status code, headers, body
+    :param raw: return decoded body as bytearray (skip legacy str/bytes conversion)
+    :param picks: json paths to pick from the streamed body (JsonPick) - 200 status code only
+    :param head: already received first bytes of the response
+    :param method: request method (HEAD: no response body)
     """
+    status_code, headers, body = await _aread_head(reader, sock_size, head, method)
+    if picks and status_code == 200:
+        picker, chunk = JsonPick(picks), memoryview(bytearray(sock_size))
+        while not body.eof:
+            n = body.readinto(chunk)
+            if n:
+                picker.feed(chunk[:n])
+            else:
+                body.feed(await reader.read(sock_size))
+        return status_code, headers, picker.result
+    out = body.out_buffer()
+    if out is None:
+        out, chunk = bytearray(), memoryview(bytearray(sock_size))
+        while not body.eof:
+            n = body.readinto(chunk)
+            if n:
+                out.extend(chunk[:n])
+            else:
+                body.feed(await reader.read(sock_size))
+    else:
+        size, mv = 0, memoryview(out)
+        while size < len(out) and not body.eof:
+            n = body.readinto(mv[size:])
+            if n:
+                size += n
+            else:
+                body.feed(await reader.read(sock_size))
+        out = out if size == len(out) else out[:size]
+    return status_code, headers, out if raw else _body_result(body, out)
 
-    # Parse HTTP(S) URL and headers
-    headers = {} if headers is None else headers
-    host, port, proto, path = _parse_url(url)
-    addr = _host_to_addr(host, port)
 
-    # [1] CONNECT - create socket object
+def _connect(host, port, proto):
+    """
+    Open socket connection (https: ssl wrapped)
+    - refresh host address and reconnect on connection error
+    """
+    addr = _host_to_addr(host, port)
     sock = socket()
     sock.settimeout(3)
     # [1.1] CONNECT - if https handle ssl
@@ -201,11 +486,74 @@ def request(method:str, url:str, data:str=None, json=None, headers:dict=None, so
                 sock = wrap_socket(sock, server_hostname=host)
             except TypeError:
                 sock = wrap_socket(sock)
-        else:
-            sock = sock
     except Exception as e:
         syslog(f'[ERR] https soc-wrap: {e}')
         raise
+    return sock
+
+
+async def _aconnect(host, port, proto):
+    """
+    Open async connection (reader, writer)
+    - refresh host address and reconnect on EHOSTUNREACH
+        (blocking getaddrinfo: cache miss or refresh only)
+    """
+    addr = _host_to_addr(host, port)
+    try:
+        return await asyncio.open_connection(addr[0], port, ssl=(proto == 'https:'))
+    except Exception as e:
+        if "EHOSTUNREACH" not in str(e):
+            raise
+    addr = _host_to_addr(host, port, force=True)
+    return await asyncio.open_connection(addr[0], port, ssl=(proto == 'https:'))
+
+
+async def _aclose(writer):
+    try:
+        writer.close()
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+def _aerror(e):
+    """
+    Async request error message (syslog)
+    """
+    # https://github.com/micropython/micropython/blob/8785645a952c03315dbf93667b5f7c7eec49762f/cc3200/simplelink/include/device.h
+    if "-104" == str(e):
+        body = "[WARN] arequest: ASSOC_REJECT"
+    elif "ECONNABORTED" in str(e):
+        body = f"[WARN] arequest: {e}"
+    else:
+        body = f"[ERR] arequest: {e}"
+    syslog(body)
+    return body
+
+
+#############################################
+#          micropython HTTP request         #
+#############################################
+
+def request(method:str, url:str, data:str=None, json=None, headers:dict=None, sock_size=256, jsonify=False):
+    """
+    Micropython syncronous HTTP request function for REST API handling
+    :param method: GET/POST
+    :param url: URL for REST API
+    :param data: string body (handle bare string as data for POST method)
+    :param json: json body (handle json as data for POST method)
+    :param headers: define headers
+    :param sock_size: socket buffer size (chuck size), default 256 byte (micropython defualt)
+    :param jsonify: convert response body to json
+        OR tuple of json paths: pick only these values from the streamed body - {path: value}
+    """
+
+    # Parse HTTP(S) URL and headers
+    headers = {} if headers is None else headers
+    host, port, proto, path = _parse_url(url)
+
+    # [1] CONNECT - create socket object
+    sock = _connect(host, port, proto)
 
     # [1] BUILD REQUEST
     http_request = _build_request(host, method, path, headers, data, json)
@@ -216,14 +564,12 @@ def request(method:str, url:str, data:str=None, json=None, headers:dict=None, so
         receive = _sock_read_factory(sock)
 
         # [3][4] RECEIVE + PARSE RESPONSE
-        status_code, body = _read_response(receive, sock_size)
+        status_code, body = _read_response(receive, sock_size, raw=jsonify, picks=_picks(jsonify), method=method)
     finally:
         sock.close()
 
     # Return status code, body (text or json)
-    if jsonify and status_code == 200:
-        return status_code, loads(body.decode('utf-8') if isinstance(body, (bytes, bytearray)) else body)
-    return status_code, body
+    return _result(status_code, body, jsonify)
 
 
 #############################################
@@ -240,28 +586,18 @@ async def arequest(method:str, url:str, data:str=None, json=None, headers:dict=N
     :param headers: define headers
     :param sock_size: socket buffer size (chunk size), default 256 bytes (micropython default)
     :param jsonify: convert response body to json
+        OR tuple of json paths: pick only these values from the streamed body - {path: value}
     """
     headers = {} if headers is None else headers
     host, port, proto, path = _parse_url(url)
-    addr = _host_to_addr(host, port)
 
     # Open a connection
     try:
-        reader, writer = await asyncio.open_connection(addr[0], port, ssl=(proto == 'https:'))
+        reader, writer = await _aconnect(host, port, proto)
     except Exception as e:
-        # Refresh host address & reconnect
-        if "EHOSTUNREACH" in str(e):
-            addr = _host_to_addr(host, port, force=True)
-            try:
-                reader, writer = await asyncio.open_connection(addr[0], port, ssl=(proto == 'https:'))
-            except Exception as e2:
-                body = f"[ERR] arequest connection: {e2}"
-                syslog(body)
-                return 500, {} if jsonify else body
-        else:
-            body = f"[ERR] arequest connection: {e}"
-            syslog(body)
-            return 500, {} if jsonify else body
+        body = f"[ERR] arequest connection: {e}"
+        syslog(body)
+        return 500, {} if jsonify else body
 
     # Send request + Wait for the response
     try:
@@ -273,24 +609,371 @@ async def arequest(method:str, url:str, data:str=None, json=None, headers:dict=N
         await writer.drain()
 
         # Receive response
-        status_code, body = await _aread_response(reader, sock_size)
+        status_code, _, body = await _aread_response(reader, sock_size, raw=jsonify, picks=_picks(jsonify),
+                                                     method=method)
     except Exception as e:
         status_code = 500
-        # https://github.com/micropython/micropython/blob/8785645a952c03315dbf93667b5f7c7eec49762f/cc3200/simplelink/include/device.h
-        if "-104" == str(e):
-            body = "[WARN] arequest: ASSOC_REJECT"
-        elif "ECONNABORTED" in str(e):
-            body = f"[WARN] arequest: {e}"
-        else:
-            body = f"[ERR] arequest: {e}"
-        syslog(body)
+        body = _aerror(e)
     finally:
         if writer:
             writer.close()
             await writer.wait_closed()
-    if jsonify and status_code == 200:
-        return status_code, loads(body.decode('utf-8') if isinstance(body, (bytes, bytearray)) else body)
-    return status_code, body
+    return _result(status_code, body, jsonify)
+
+
+#############################################
+#        streamed HTTP response body        #
+#############################################
+
+def _save_check(headers, body, size):
+    """
+    Saved body check: connection closed early OR written size differs from Content-Length -> OSError
+    """
+    length = headers.get(b'Content-Length')
+    if body.truncated or (length is not None and not body.chunked and int(length) != size):
+        raise OSError(f"Incomplete body: {size}/{'?' if length is None else int(length)} bytes")
+
+
+def _save_commit(tmp, path, ok):
+    """
+    Complete download: replace target file with the .tmp file (write-then-rename)
+    Failed download: drop the .tmp file (target file is kept)
+    """
+    if not ok:
+        try:
+            remove(tmp)
+        except OSError:
+            pass
+        return
+    try:
+        rename(tmp, path)
+    except OSError:
+        # Filesystem without rename-replace support (littlefs)
+        remove(path)
+        rename(tmp, path)
+
+
+class Response:
+    """
+    Streamed HTTP response - status_code and headers first, body on demand
+    (body is never collected in memory)
+    - readinto(buf): fill caller buffer with decoded body bytes, 0: end of body
+    - iter_content(chunk_size): body chunk generator
+    - save(path): stream body into file
+    Use as context manager (or call close) to release the socket
+    """
+    __slots__ = ("status_code", "headers", "_body", "_sock", "_receive", "_sock_size")
+
+    def __init__(self, sock, status_code, headers, body, sock_size):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+        self._sock = sock
+        self._receive = _sock_read_factory(sock)
+        self._sock_size = sock_size
+
+    def readinto(self, buf):
+        """
+        Fill buffer with body bytes - returns byte count (less than buffer size: end of body)
+        """
+        mv, size = memoryview(buf), 0
+        while size < len(mv):
+            n = self._body.readinto(mv[size:])
+            if n:
+                size += n
+            elif self._body.eof:
+                break
+            else:
+                self._body.feed(self._receive(self._sock_size))
+        return size
+
+    def iter_content(self, chunk_size=256):
+        buf = bytearray(chunk_size)
+        n = self.readinto(buf)
+        while n:
+            yield bytes(memoryview(buf)[:n])
+            n = self.readinto(buf)
+
+    def save(self, path):
+        """
+        Stream body into file - returns written byte count
+        - written into path.tmp, renamed to path on complete body only
+        - incomplete body (connection closed early): OSError, target file is kept
+        """
+        tmp, size, buf, ok = f"{path}.tmp", 0, bytearray(self._sock_size), False
+        try:
+            with open(tmp, 'wb') as f:
+                n = self.readinto(buf)
+                while n:
+                    f.write(memoryview(buf)[:n])
+                    size += n
+                    n = self.readinto(buf)
+            _save_check(self.headers, self._body, size)
+            ok = True
+        finally:
+            _save_commit(tmp, path, ok)
+        return size
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class AResponse:
+    """
+    Async streamed HTTP response - same as Response with awaitable body access
+    - await readinto(buf), async for chunk in response, await save(path)
+    """
+    __slots__ = ("status_code", "headers", "_body", "_reader", "_writer", "_sock_size")
+
+    def __init__(self, reader, writer, status_code, headers, body, sock_size):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+        self._reader = reader
+        self._writer = writer
+        self._sock_size = sock_size
+
+    async def readinto(self, buf):
+        """
+        Fill buffer with body bytes - returns byte count (less than buffer size: end of body)
+        """
+        mv, size = memoryview(buf), 0
+        while size < len(mv):
+            n = self._body.readinto(mv[size:])
+            if n:
+                size += n
+            elif self._body.eof:
+                break
+            else:
+                self._body.feed(await self._reader.read(self._sock_size))
+        return size
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        buf = bytearray(self._sock_size)
+        n = await self.readinto(buf)
+        if not n:
+            raise StopAsyncIteration
+        return buf if n == len(buf) else buf[:n]
+
+    async def save(self, path):
+        """
+        Stream body into file - returns written byte count
+        - written into path.tmp, renamed to path on complete body only
+        - incomplete body (connection closed early): OSError, target file is kept
+        """
+        tmp, size, buf, ok = f"{path}.tmp", 0, bytearray(self._sock_size), False
+        try:
+            with open(tmp, 'wb') as f:
+                n = await self.readinto(buf)
+                while n:
+                    f.write(memoryview(buf)[:n])
+                    size += n
+                    n = await self.readinto(buf)
+            _save_check(self.headers, self._body, size)
+            ok = True
+        finally:
+            _save_commit(tmp, path, ok)
+        return size
+
+    async def close(self):
+        await _aclose(self._writer)
+
+
+def stream(method:str, url:str, data:str=None, json=None, headers:dict=None, sock_size=256) -> Response:
+    """
+    Streamed HTTP request - returns Response after the headers are received
+    (connection errors are raised - like request)
+    """
+    headers = {} if headers is None else headers
+    host, port, proto, path = _parse_url(url)
+    sock = _connect(host, port, proto)
+    try:
+        _sock_write(sock, _build_request(host, method, path, headers, data, json))
+        status_code, rsp_headers, body = _read_head(_sock_read_factory(sock), sock_size, method)
+    except Exception:
+        sock.close()
+        raise
+    return Response(sock, status_code, rsp_headers, body, sock_size)
+
+
+async def astream(method:str, url:str, data:str=None, json=None, headers:dict=None, sock_size=256) -> AResponse:
+    """
+    Async streamed HTTP request - returns AResponse after the headers are received
+    (connection errors are raised)
+    """
+    headers = {} if headers is None else headers
+    host, port, proto, path = _parse_url(url)
+    reader, writer = await _aconnect(host, port, proto)
+    try:
+        writer.write(_build_request(host, method, path, headers, data, json))
+        await writer.drain()
+        status_code, rsp_headers, body = await _aread_head(reader, sock_size, method=method)
+    except Exception:
+        await _aclose(writer)
+        raise
+    return AResponse(reader, writer, status_code, rsp_headers, body, sock_size)
+
+
+def download(url:str, path:str, headers:dict=None, sock_size=512):
+    """
+    Download HTTP GET body into file (streamed, constant memory)
+    - file is written only on 200 status code and complete body (.tmp then rename)
+    Returns status code, written byte count (500 on incomplete body)
+    """
+    with stream('GET', url, headers=headers, sock_size=sock_size) as response:
+        if response.status_code != 200:
+            return response.status_code, 0
+        try:
+            return 200, response.save(path)
+        except OSError as e:
+            syslog(f"[ERR] download {url}: {e}")
+            return 500, 0
+
+
+async def adownload(url:str, path:str, headers:dict=None, sock_size=512):
+    """
+    Async download HTTP GET body into file (streamed, constant memory)
+    - file is written only on 200 status code and complete body (.tmp then rename)
+    Returns status code, written byte count (500 on connection error / incomplete body)
+    """
+    try:
+        response = await astream('GET', url, headers=headers, sock_size=sock_size)
+    except Exception as e:
+        _aerror(e)
+        return 500, 0
+    try:
+        if response.status_code != 200:
+            return response.status_code, 0
+        return 200, await response.save(path)
+    except Exception as e:
+        _aerror(e)
+        return 500, 0
+    finally:
+        await response.close()
+
+
+#############################################
+#     async HTTP keep-alive session         #
+#############################################
+
+class ASession:
+    """
+    Async HTTP session with keep-alive connection reuse
+    - idle connections are pooled per (host, port, proto): no new socket / TLS handshake per call
+    - pooled connection expires after idle_ms
+    - max_per_host: max number of pooled connections per (host, port, proto)
+    - connection closed by the server: automatic reconnect and resend (once)
+      only GET/HEAD without any received response byte (no duplicated side effects)
+    """
+    __slots__ = ("pool", "idle_ms", "max_per_host")
+
+    def __init__(self, idle_ms=20000, max_per_host=2):
+        self.pool = {}                  # Idle connections: {(host, port, proto): [(reader, writer, ticks_ms), ...]}
+        self.idle_ms = idle_ms
+        self.max_per_host = max_per_host
+
+    async def _acquire(self, key):
+        """
+        Get most recently used, not expired idle connection (or None)
+        """
+        conns = self.pool.get(key, [])
+        while conns:
+            reader, writer, last_used = conns.pop()
+            if ticks_diff(ticks_ms(), last_used) < self.idle_ms:
+                return reader, writer
+            await _aclose(writer)
+        return None
+
+    async def _release(self, key, reader, writer, keep):
+        """
+        Return connection to the pool (max_per_host) OR close it
+        """
+        conns = self.pool.setdefault(key, [])
+        if keep and len(conns) < self.max_per_host:
+            conns.append((reader, writer, ticks_ms()))
+            return True
+        await _aclose(writer)
+        return False
+
+    async def request(self, method:str, url:str, data:str=None, json=None, headers:dict=None, sock_size=256, jsonify=False):
+        """
+        Async HTTP request over keep-alive connection - same interface as arequest
+        """
+        headers = {} if headers is None else headers
+        host, port, proto, path = _parse_url(url)
+        key = (host, port, proto)
+        http_request = _build_request(host, method, path, headers, data, json, keep_alive=True)
+        status_code, body = 500, None
+        for _ in range(2):
+            conn = await self._acquire(key)
+            reused = conn is not None
+            if not reused:
+                try:
+                    conn = await _aconnect(host, port, proto)
+                except Exception as e:
+                    body = f"[ERR] arequest connection: {e}"
+                    syslog(body)
+                    return 500, {} if jsonify else body
+            reader, writer = conn
+            head = b''
+            try:
+                writer.write(http_request)
+                await writer.drain()
+                head = await reader.read(sock_size)
+                status_code, rsp_headers, body = await _aread_response(reader, sock_size, raw=jsonify,
+                                                                       picks=_picks(jsonify), head=head, method=method)
+            except Exception as e:
+                await _aclose(writer)
+                if reused and not head and method in ('GET', 'HEAD'):
+                    # Idle connection was closed by the server - drop pooled connections and reconnect
+                    for _, stale, _ in self.pool.pop(key, ()):
+                        await _aclose(stale)
+                    continue
+                status_code, body = 500, _aerror(e)
+                break
+            await self._release(key, reader, writer, keep=_reusable(rsp_headers, method))
+            break
+        return _result(status_code, body, jsonify)
+
+    async def get(self, url:str, headers:dict=None, sock_size=256, jsonify=False):
+        return await self.request('GET', url, headers=headers, sock_size=sock_size, jsonify=jsonify)
+
+    async def post(self, url:str, data=None, json=None, headers:dict=None, sock_size=256, jsonify=False):
+        return await self.request('POST', url, data=data, json=json, headers=headers, sock_size=sock_size, jsonify=jsonify)
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        for conns in self.pool.values():
+            for _, writer, _ in conns:
+                await _aclose(writer)
+        self.pool = {}
+
+    def status(self):
+        """
+        Pooled connections per host: {"host:port": count}
+        """
+        return {f"{key[0]}:{key[1]}": len(conns) for key, conns in self.pool.items() if conns}
+
+
+def session() -> ASession:
+    """
+    Shared keep-alive session - for periodic polling of the same hosts
+    """
+    global SESSION
+    if SESSION is None:
+        SESSION = ASession()
+    return SESSION
 
 
 #############################################
@@ -331,6 +1014,16 @@ async def apost(url, data=None, json=None, headers:dict=None, sock_size=256, jso
     return await arequest('POST', url, data=data, json=json, headers=headers, sock_size=sock_size, jsonify=jsonify)
 
 
+def resolve(url, force=False):
+    """
+    Resolve (cached) url host address
+    - blocking getaddrinfo: only on cache miss or force
+    - pre-resolve from async context to keep DNS out of retry loops
+    """
+    host, port, *_ = _parse_url(url)
+    return _host_to_addr(host, port, force)
+
+
 def host_cache() -> dict:
     """
     Return address cache
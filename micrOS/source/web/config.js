@@ -1,8 +1,8 @@
 const menuStructure = {
-  'Device': ['devfid', 'boothook', 'appwd', 'dbg', 'aioqueue', 'utc', 'boostmd'],
+  'Device': ['devfid', 'boothook', 'appwd', 'dbg', 'loglvl', 'aioqueue', 'aioshed', 'utc', 'boostmd'],
   'Network': ['devip', 'staessid', 'stapwd', 'nwmd', 'espnow', 'ha'],
   'Web': ['webui', 'webui_max_con'],
-  'Scheduler': ['cron', 'crontasks'],
+  'Scheduler': ['cron', 'crontasks', 'aiocron', 'lat', 'lon'],
   'Interrupts': ['timirq', 'timirqcbf', 'timirqseq', 'irq1', 'irq1_cbf', 'irq1_trig', 'irq2', 'irq2_cbf', 'irq2_trig', 'irq3', 'irq3_cbf', 'irq3_trig', 'irq4', 'irq4_cbf', 'irq4_trig', 'irq_prell_ms'],
   'Pin-mapping': ['cstmpmap'],
 };
@@ -11,7 +11,9 @@ const configLabelMap = {
   'boothook': 'Startup Actions',
   'appwd': 'Admin Password',
   'dbg': 'Debug Mode',
+  'loglvl': 'Persisted Log Level',
   'aioqueue': 'Allowed Number of Tasks',
+  'aioshed': 'Task Shed Policy',
   'utc': 'UTC',
   'boostmd': 'Boost Mode',
   'devip': 'Device IP',
@@ -22,12 +24,17 @@ const configLabelMap = {
   'ha': 'High Availability',
   'cron': 'Enable Scheduler',
   'crontasks': 'Scheduled Tasks',
+  'aiocron': 'Async Scheduler',
+  'lat': 'Latitude',
+  'lon': 'Longitude',
   'webui': 'Enable',
   'webui_max_con': 'Allowed Number of Connections',
   'irq_prell_ms': 'Interrupt Debounce',
 };
 const configSelectOptions = {
   'nwmd': ['STA', 'AP'],
+  'aioshed': ['none', 'loop', 'prio'],
+  'loglvl': ['user', 'info', 'boot', 'warn', 'err'],
   'irq_trig': ['up', 'down', 'both'],
 };
 const categoryIconMap = {
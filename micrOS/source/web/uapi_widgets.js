@@ -17,7 +17,7 @@ function moduleCommandSuggestions(response) {
     )]
         .flatMap(command => {
             if (command === 'task') {
-                return ['task list', 'task show <taskID>', 'task kill <taskID>'];
+                return ['task list', 'task stats', 'task show <taskID>', 'task kill <taskID>'];
             }
             return [`${command} help`];
         });
@@ -32,6 +32,7 @@ class BufferTestBase(unittest.TestCase):
     Tests for the core functionality of the state machine.
     """
     buffer_type = bytearray
+    wrapper = "SlidingBuffer"
 
     def make_buffer(self, data):
         return self.buffer_type(data)
@@ -42,7 +43,7 @@ class BufferTestBase(unittest.TestCase):
 
 
     def setUp(self):
-        self.buf = self.buffer_module.SlidingBuffer(self.make_buffer(8))
+        self.buf = getattr(self.buffer_module, self.wrapper)(self.make_buffer(8))
 
 
     def test_empty_buffer(self):
@@ -131,6 +132,68 @@ class BufferTestBase(unittest.TestCase):
         self.assertEqual(self.buf.find(b'fgh'), 2)
 
 
+    def test_find_skip_table(self):
+        self.buf.write(b'a\r\nb\r\n\r\n')
+        self.assertEqual(self.buf.find(b'\r\n\r\n'), 4)
+        self.assertEqual(self.buf.find(b'\r\n'), 1)
+        self.assertEqual(self.buf.find(b'a\r\nb\r\n\r\nc'), -1)
+        self.assertEqual(self.buf.find(b''), 0)
+
+
+    def test_skip_tables_not_rebuilt(self):
+        builds = []
+        real = self.buffer_module._skip_table
+        self.buffer_module._skip_table = lambda term: builds.append(bytes(term)) or real(term)
+        try:
+            self.buf.write(b'--xy\r\nab')
+            for _ in range(3):
+                # Header terms (shared tables) and one boundary term (cached slot)
+                self.assertEqual(self.buf.find(b'\r\n'), 4)
+                self.assertEqual(self.buf.find(b'\r\n\r\n'), -1)
+                self.assertEqual(self.buf.find(b'--xy'), 0)
+        finally:
+            self.buffer_module._skip_table = real
+        self.assertEqual(builds, [b'--xy'])
+
+
+    def test_compaction_small_start(self):
+        self.buf.write(b'abcdefgh')
+        self.buf.consume(1)
+        self.buf.write(b'X')  # overlapping shift by 1 byte
+        self.assertEqual(bytes(self.buf.readable_view()), b'bcdefghX')
+        self.buf.consume(3)
+        self.buf.write(b'YZW')
+        self.assertEqual(bytes(self.buf.readable_view()), b'efghXYZW')
+
+
+    def test_compaction_no_overlapping_copy(self):
+        copies = []
+
+        class _RecordingView:
+            """Slice copy recorder: (destination, source) slices"""
+            def __init__(self, mv):
+                self.mv, self.src = mv, None
+
+            def __getitem__(self, key):
+                self.src = key
+                return self.mv[key]
+
+            def __setitem__(self, key, value):
+                copies.append((key, self.src))
+                self.mv[key] = value
+
+        self.buf.write(b'abcdefg')
+        self.buf.consume(2)
+        mv, self.buf._mv = self.buf._mv, _RecordingView(self.buf._mv)
+        self.buf._compact()
+        self.buf._mv = mv
+        self.assertEqual(bytes(self.buf.peek()), b'cdefg')
+        self.assertEqual(len(copies), 3)
+        for dst, src in copies:
+            # Slice assignment is memcpy in MicroPython: source and destination must not overlap
+            self.assertTrue(dst.stop <= src.start or src.stop <= dst.start, (dst, src))
+
+
     def test_prepare_commit(self):
         self.buf.prepare(3)
         self.buf.commit(3)
@@ -155,6 +218,48 @@ class BufferTestBase(unittest.TestCase):
             self.buf.prepare(9)
 
 
+class TestBufferBenchmark(unittest.TestCase):
+    """
+    Micro-benchmark: 4 KB HTTP request parsing throughput (WebEngine access pattern)
+    """
+    REQUESTS = 200
+    CHUNK = 512
+
+    @classmethod
+    def setUpClass(cls):
+        cls.buffer_module = _load_buffer_module()
+        headers = b"".join(b"X-Header-%d: %s\r\n" % (i, b"v" * 40) for i in range(60))
+        body = b"b" * (4096 - len(headers) - 64)
+        cls.request = (b"POST /rest/bench HTTP/1.1\r\n" + headers +
+                       b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    def _parse(self, rx):
+        request = self.request
+        for i in range(0, len(request), self.CHUNK):
+            rx.write(request[i:i + self.CHUNK])
+        status_line_sep = rx.find(b'\r\n')
+        rx.consume(status_line_sep + 2)
+        blank_idx = rx.find(b'\r\n\r\n')
+        headers = bytes(rx.peek(blank_idx)).split(b'\r\n')
+        rx.consume(blank_idx + 4)
+        body_len = rx.size()
+        rx.consume()
+        return len(headers), body_len
+
+    def test_request_parsing_throughput(self):
+        from time import perf_counter
+        pool = self.buffer_module.MemoryPool(8192, 1, wrapper=self.buffer_module.SlidingBuffer)
+        rx = pool.reserve()
+        start = perf_counter()
+        for _ in range(self.REQUESTS):
+            headers, body_len = self._parse(rx)
+        delta = perf_counter() - start
+        self.assertEqual(headers, 61)
+        self.assertEqual(rx.size(), 0)
+        kbps = self.REQUESTS * len(self.request) / 1024 / delta
+        print(f"[bench] 4KB request parsing: {self.REQUESTS / delta:.0f} req/s, {kbps:.0f} KB/s")
+
+
 class TestWithBytearray(BufferTestBase):
     buffer_type = bytearray
 
@@ -165,5 +270,79 @@ class TestWithMemoryview(BufferTestBase):
         return memoryview(bytearray(data))
 
 
+class TestRingWithBytearray(BufferTestBase):
+    buffer_type = bytearray
+    wrapper = "RingBuffer"
+
+
+    def test_wrapped_views(self):
+        self.buf.write(b'abcdef')
+        self.buf.consume(4)
+        self.buf.write(b'ghijk')  # wraps around, no compaction
+        views = self.buf.read_views()
+        self.assertEqual(len(views), 2)
+        self.assertEqual(b''.join(bytes(v) for v in views), b'efghijk')
+        self.assertEqual(len(self.buf.read_views(3)), 1)
+        self.assertEqual(self.buf.find(b'hij'), 3)
+        self.assertEqual(self.buf.find(b'fgh'), 1)
+        self.assertEqual(self.buf.writable(), 1)
+        self.assertTrue(self.buf.startswith(b'efghi'))        # across the wrap point, no re-arrange
+        self.assertFalse(self.buf.startswith(b'efgxi'))
+        self.assertFalse(self.buf.startswith(b'efghijkl'))
+        self.assertEqual(len(self.buf.read_views()), 2)
+        self.assertEqual(bytes(self.buf.peek()), b'efghijk')  # contiguous (re-arranged)
+        self.assertEqual(len(self.buf.read_views()), 1)
+
+
+    def test_write_views_prepare_commit(self):
+        self.buf.write(b'abcdef')
+        self.buf.consume(5)
+        views = self.buf.write_views()
+        self.assertEqual([len(v) for v in views], [2, 5])
+        views[0][0:2] = b'gh'
+        self.buf.commit(2)
+        self.buf.prepare(4)
+        view = self.buf.writable_view()
+        view[0:4] = b'ijkl'
+        self.buf.commit(4)
+        self.assertEqual(bytes(self.buf.peek()), b'fghijkl')
+
+
+    def test_random_ops_against_reference(self):
+        import random
+        rnd = random.Random(7)
+        ref = b''
+        for _ in range(2000):
+            op = rnd.randint(0, 3)
+            if op == 0:
+                data = bytes(rnd.randint(97, 100) for _ in range(rnd.randint(0, 8 - len(ref))))
+                self.buf.write(data)
+                ref += data
+            elif op == 1:
+                n = rnd.randint(0, len(ref))
+                self.buf.consume(n)
+                ref = ref[n:]
+            elif op == 2:
+                term = bytes(rnd.randint(97, 100) for _ in range(rnd.randint(1, 3)))
+                self.assertEqual(self.buf.find(term), ref.find(term))
+            else:
+                self.assertEqual(bytes(self.buf.peek()), ref)
+            self.assertEqual(b''.join(bytes(v) for v in self.buf.read_views()), ref)
+
+
+    def test_pool_wrapper(self):
+        pool = self.buffer_module.MemoryPool(8, 2, wrapper=self.buffer_module.RingBuffer)
+        block = pool.reserve()
+        block.write(b'abcdefgh')
+        self.assertEqual(block.size(), 8)
+        self.assertEqual(pool.reserve().size(), 0)
+
+
+class TestRingWithMemoryview(TestRingWithBytearray):
+    @staticmethod
+    def buffer_type(data):
+        return memoryview(bytearray(data))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
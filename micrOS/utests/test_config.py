@@ -22,6 +22,7 @@ class _ConfigStubEnv:
         self.config_dir = root / "config"
         self.logs = []
         self.console = []
+        self.ticks = 0
         self._saved = {}
 
     def _resolve(self, path):
@@ -29,7 +30,7 @@ class _ConfigStubEnv:
         return path if path.is_absolute() else self.root / path
 
     def install(self):
-        for name in ("Debug", "Files", "uos", "microIO"):
+        for name in ("Debug", "Files", "uos", "utime", "microIO"):
             self._saved[name] = sys.modules.get(name)
 
         env = self
@@ -67,9 +68,20 @@ class _ConfigStubEnv:
 
         uos_mod = types.ModuleType("uos")
         uos_mod.remove = lambda path: env._resolve(path).unlink()
-        uos_mod.rename = lambda src, dst: env._resolve(src).rename(env._resolve(dst))
+        def rename(src, dst):
+            # littlefs: rename does not overwrite an existing file
+            if env._resolve(dst).exists():
+                raise OSError(17, "EEXIST")
+            env._resolve(src).rename(env._resolve(dst))
+
+        uos_mod.rename = rename
         sys.modules["uos"] = uos_mod
 
+        utime_mod = types.ModuleType("utime")
+        utime_mod.ticks_ms = lambda: env.ticks
+        utime_mod.ticks_diff = lambda a, b: a - b
+        sys.modules["utime"] = utime_mod
+
         microio_mod = types.ModuleType("microIO")
         microio_mod.set_pinmap = None
         sys.modules["microIO"] = microio_mod
@@ -82,7 +94,7 @@ class _ConfigStubEnv:
                 sys.modules[name] = module
 
 
-def _load_config_module(raw_config=None):
+def _load_config_module(raw_config=None, raw_tmp=None, raw_bad=None):
     tempdir = tempfile.TemporaryDirectory()
     root = Path(tempdir.name)
     config_dir = root / "config"
@@ -91,6 +103,10 @@ def _load_config_module(raw_config=None):
     config_path = config_dir / "node_config.json"
     if raw_config is not None:
         config_path.write_text(raw_config, encoding="utf-8")
+    if raw_tmp is not None:
+        config_path.with_name("node_config.json.tmp").write_text(raw_tmp, encoding="utf-8")
+    if raw_bad is not None:
+        config_path.with_name("node_config.json.bad").write_text(raw_bad, encoding="utf-8")
 
     env = _ConfigStubEnv(root)
     env.install()
@@ -147,6 +163,148 @@ class TestConfig(unittest.TestCase):
         persisted = json.loads(config_path.read_text(encoding="utf-8"))
         self.assertEqual(persisted["devfid"], "orig")
 
+    def test_cfgwatch_notified_on_change_only(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        changes = []
+        self.assertTrue(mod.cfgwatch("timirqcbf", changes.append))
+        self.assertFalse(mod.cfgwatch("no_such_key", changes.append))
+        self.assertTrue(mod.cfgput("timirqcbf", "system heartbeat"))
+        self.assertTrue(mod.cfgput("timirqcbf", "system heartbeat"))
+        self.assertEqual(changes, ["system heartbeat"])
+
+
+    def test_atomic_write_leaves_no_tmp(self):
+        mod, env, tempdir, config_path = _load_config_module(raw_config='{"devfid": "orig"}')
+        self.addCleanup(tempdir.cleanup)
+
+        self.assertTrue(mod.cfgput("devfid", "updated"))
+        self.assertFalse(config_path.with_name("node_config.json.tmp").exists())
+        self.assertEqual(json.loads(config_path.read_text(encoding="utf-8"))["devfid"], "updated")
+
+    def test_interrupted_write_restored_from_tmp(self):
+        # Power loss between remove and rename: only the complete .tmp file exists
+        mod, env, tempdir, config_path = _load_config_module(raw_tmp='{"devfid": "from_tmp"}')
+        self.addCleanup(tempdir.cleanup)
+
+        self.assertEqual(mod.cfgget("devfid"), "from_tmp")
+        self.assertFalse(config_path.with_name("node_config.json.tmp").exists())
+        self.assertEqual(json.loads(config_path.read_text(encoding="utf-8"))["devfid"], "from_tmp")
+
+    def test_corrupted_config_falls_back_to_tmp(self):
+        mod, env, tempdir, config_path = _load_config_module(raw_config='{"devfid": "bro',
+                                                             raw_tmp='{"devfid": "from_tmp"}')
+        self.addCleanup(tempdir.cleanup)
+
+        self.assertTrue(config_path.with_name("node_config.json.bad").is_file())
+        self.assertEqual(mod.cfgget("devfid"), "from_tmp")
+
+    def test_corrupted_config_replaces_old_quarantine(self):
+        mod, env, tempdir, config_path = _load_config_module(raw_config='{"devfid": "bro',
+                                                             raw_tmp='{"devfid": "from_tmp"}',
+                                                             raw_bad='{"old": "corruption"')
+        self.addCleanup(tempdir.cleanup)
+
+        self.assertEqual(config_path.with_name("node_config.json.bad").read_text(encoding="utf-8"),
+                         '{"devfid": "bro')
+        self.assertFalse(any("quarantine failed" in msg for msg in env.logs))
+        self.assertEqual(mod.cfgget("devfid"), "from_tmp")
+
+    def test_cfgbatch_single_write(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        changes = []
+        mod.cfgwatch("staessid", changes.append)
+        with mock.patch.object(mod.Config, "write_cfg_file", wraps=mod.Config.write_cfg_file) as write:
+            with mod.cfgbatch():
+                self.assertTrue(mod.cfgput("staessid", "wifi1;wifi2"))
+                self.assertTrue(mod.cfgput("stapwd", "pwd1;pwd2"))
+                with mod.cfgbatch():
+                    self.assertTrue(mod.cfgput("soctout", "20", type_check=True))
+                self.assertEqual(write.call_count, 0)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(changes, ["wifi1;wifi2"])
+        persisted = json.loads(config_path.read_text(encoding="utf-8"))
+        self.assertEqual((persisted["staessid"], persisted["stapwd"], persisted["soctout"]),
+                         ("wifi1;wifi2", "pwd1;pwd2", 20))
+
+    def test_cfgbatch_rollback_on_error(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        changes = []
+        mod.cfgwatch("staessid", changes.append)
+        with self.assertRaises(ValueError):
+            with mod.cfgbatch():
+                mod.cfgput("staessid", "wifi1")
+                raise ValueError("abort")
+        self.assertEqual(mod.cfgget("staessid"), "your_wifi_name")
+        self.assertEqual(changes, ["wifi1", "your_wifi_name"])
+        persisted = json.loads(config_path.read_text(encoding="utf-8"))
+        self.assertEqual(persisted["staessid"], "your_wifi_name")
+
+    def test_cfgflush_debounced_write(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        self.assertFalse(mod.cfgflush())            # idle task: enable debounced mode
+        for i in range(5):
+            env.ticks += 100
+            self.assertTrue(mod.cfgput("soctout", i + 10))
+            self.assertFalse(mod.cfgflush())
+        self.assertEqual(json.loads(config_path.read_text(encoding="utf-8"))["soctout"], 30)
+        env.ticks += mod.Config.DEBOUNCE_MS
+        self.assertTrue(mod.cfgflush())
+        self.assertEqual(json.loads(config_path.read_text(encoding="utf-8"))["soctout"], 14)
+        self.assertFalse(mod.cfgflush())
+        # Reboot: force write pending change
+        mod.cfgput("soctout", 15)
+        self.assertTrue(mod.cfgflush(force=True))
+        self.assertEqual(json.loads(config_path.read_text(encoding="utf-8"))["soctout"], 15)
+
+    def test_offloaded_key_read_cache(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        guimeta = config_path.with_name(".guimeta.key")
+        guimeta.write_text('{"widget": 1}', encoding="utf-8")
+        with mock.patch("builtins.open", wraps=open) as _open:
+            for _ in range(5):
+                self.assertEqual(mod.cfgget("guimeta"), '{"widget": 1}')
+        self.assertEqual(_open.call_count, 1)
+        # Write invalidates the cached value
+        self.assertTrue(mod.cfgput("guimeta", '{"widget": 2}'))
+        self.assertEqual(mod.cfgget("guimeta"), '{"widget": 2}')
+
+    def test_offloaded_key_cache_budget(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        mod.Config.KEY_CACHE_BUDGET = 10
+        self.assertTrue(mod.Config.cache_put("a", "aaaa"))
+        self.assertTrue(mod.Config.cache_put("b", "bbbb"))
+        self.assertEqual(mod.Config.cache_get("a"), "aaaa")      # a: most recent
+        self.assertTrue(mod.Config.cache_put("c", "cccc"))       # evicts b
+        self.assertEqual([k for k, _ in mod.Config.KEY_CACHE], ["a", "c"])
+        self.assertFalse(mod.Config.cache_put("d", "d" * 11))    # over budget: not cached
+        self.assertIsNone(mod.Config.cache_get("d"))
+
+    def test_cfgstream_chunks(self):
+        mod, env, tempdir, config_path = _load_config_module()
+        self.addCleanup(tempdir.cleanup)
+
+        value = "x" * 1000
+        mod.Config.KEY_CACHE_BUDGET = 100
+        config_path.with_name(".guimeta.key").write_text(value, encoding="utf-8")
+        chunks = list(mod.cfgstream("guimeta", chunk_size=256))
+        self.assertEqual([len(c) for c in chunks], [256, 256, 256, 232])
+        self.assertEqual(mod.cfgget("guimeta"), value)           # over budget: not cached
+        self.assertEqual(mod.Config.KEY_CACHE, [])
+        self.assertEqual(list(mod.cfgstream("soctout")), ["30"])
+        self.assertEqual(list(mod.cfgstream("no_such_key")), [])
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
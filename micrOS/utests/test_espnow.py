@@ -0,0 +1,346 @@
+"""
+mespnow.py unit test - binary packet protocol and local loopback
+
+Run:
+  python3 -m unittest -v utests.test_espnow
+
+This:
+- loads ../source/mespnow.py via importlib (no package needed)
+- stubs micrOS imports (Tasks, Config, Debug, Files)
+- uses the simulator aioespnow stand-in (toolkit/simulator_lib) as loopback bus:
+  request -> espnow server -> response on a single "device"
+"""
+
+import asyncio
+import importlib.util
+import random
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve()
+SOURCE = HERE.parent.parent / "source"
+SIM_LIB = HERE.parent.parent.parent / "toolkit" / "simulator_lib"
+PEER = b"\x50\x02\x91\x86\x34\x28"
+PEERS = {bytes((0x50, 0x02, 0x91, 0x86, 0x34, i)): f"light{i:02d}" for i in range(20)}
+LONG_OUTPUT = "|".join(f"task{i}: ✓ running" for i in range(120))     # ~2.5kB with separators + utf-8
+
+
+def setUpModule():
+    print(f"== RUN {Path(__file__).name} ==")
+
+
+class NativeTaskStub:
+    TASKS = {}
+
+    def __init__(self):
+        self.tag = None
+        self.out = ""
+        self.done = asyncio.Event()
+
+    def create(self, callback=None, tag=None):
+        self.tag = tag
+        NativeTaskStub.TASKS[tag] = self
+        asyncio.get_event_loop().create_task(callback)
+        return {tag: "Starting"}
+
+    async def await_result(self, timeout=5):
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return "Timeout has beed exceeded"
+        return self.out
+
+    def __enter__(self):
+        self.done.clear()
+        return self
+
+    def __exit__(self, *_):
+        self.done.set()
+
+
+def _lm_exec(command):
+    if command[:2] == ["task", "list"]:
+        return True, LONG_OUTPUT
+    return True, " ".join(command)
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_mespnow():
+    stubs = {}
+    m = stubs["Tasks"] = types.ModuleType("Tasks")
+    m.NativeTask = NativeTaskStub
+    m.lm_exec = _lm_exec
+    m.lm_is_loaded = lambda *_a, **_k: True
+    m = stubs["Config"] = types.ModuleType("Config")
+    m.cfgget = {"devfid": "node01", "auth": False}.get
+    m = stubs["Debug"] = types.ModuleType("Debug")
+    m.syslog = lambda *_a, **_k: True
+    m = stubs["Files"] = types.ModuleType("Files")
+    m.OSPath = types.SimpleNamespace(DATA="/data")
+    m.path_join = lambda *parts: "/".join(parts)
+    m.is_file = lambda *_a, **_k: False
+    m = stubs["urandom"] = types.ModuleType("urandom")
+    m.getrandbits = random.getrandbits
+    m = stubs["utime"] = types.ModuleType("utime")
+    m.ticks_ms = lambda: int(time.monotonic() * 1000)
+    m.ticks_diff = lambda a, b: a - b
+    stubs["uasyncio"] = asyncio
+    with mock.patch.dict(sys.modules, stubs):
+        sys.modules["aioespnow"] = _load_module("aioespnow", SIM_LIB / "aioespnow.py")
+        return _load_module("mespnow_under_test", SOURCE / "mespnow.py")
+
+
+class TestPacketProtocol(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.now = _load_mespnow()
+
+    def _reassemble(self, packets, mac=PEER):
+        payload = None
+        for packet in packets:
+            state, parsed = self.now.parse_packet(packet)
+            self.assertTrue(state, parsed)
+            payload = self.now.ResponseRouter.reassemble(mac, parsed)
+        return self.now.unpack_payload(payload)
+
+    def test_single_packet_layout(self):
+        tid = self.now.generate_tid()
+        packets = self.now.render_packet(tid=tid, oper="REQ", data="system info", prompt="node01")
+        self.assertEqual(len(packets), 1)
+        packet = packets[0]
+        self.assertEqual(len(tid), 8)
+        self.assertEqual(packet[:8], tid)
+        self.assertEqual(tuple(packet[8:12]), (self.now.OPER_REQ, 0, 1, self.now.FLAG_PROMPT))
+        state, parsed = self.now.parse_packet(packet)
+        self.assertTrue(state)
+        self.assertEqual((parsed["tid"], parsed["oper"]), (tid, "REQ"))
+        self.assertEqual(self.now.unpack_payload(parsed["data"]), (True, ("node01", "system info")))
+
+    def test_fragmentation_out_of_order(self):
+        tid = self.now.generate_tid()
+        packets = self.now.render_packet(tid=tid, oper="RSP", data=LONG_OUTPUT, prompt="node02")
+        self.assertGreater(len(packets), 10)
+        self.assertTrue(all(len(p) <= self.now.MAX_PACKET for p in packets))
+        # Separator and multibyte characters are data, not protocol
+        packets = packets[1:] + packets[:1]
+        self.assertEqual(self._reassemble(packets), (True, ("node02", LONG_OUTPUT)))
+        self.assertEqual(self.now.ResponseRouter._fragments, {})
+
+    def test_interleaved_transactions(self):
+        out1, out2 = "a" * 600, "b" * 700
+        p1 = self.now.render_packet(tid=b"\x01" * 8, oper="RSP", data=out1, prompt="n1")
+        p2 = self.now.render_packet(tid=b"\x02" * 8, oper="RSP", data=out2, prompt="n2")
+        results = []
+        for packet in [p for pair in zip(p1, p2) for p in pair] + p2[len(p1):]:
+            _, parsed = self.now.parse_packet(packet)
+            payload = self.now.ResponseRouter.reassemble(PEER, parsed)
+            if payload is not None:
+                results.append(self.now.unpack_payload(payload)[1])
+        self.assertEqual(results, [("n1", out1), ("n2", out2)])
+
+    def test_truncate_on_character_boundary(self):
+        data = "é" * 5000
+        packets = self.now.render_packet(tid=b"\x03" * 8, oper="RSP", data=data, prompt="n1")
+        self.assertEqual(len(packets), self.now.MAX_FRAGMENTS)
+        state, (_, out) = self._reassemble(packets)
+        self.assertTrue(state)
+        self.assertTrue(data.startswith(out))
+        self.assertGreater(len(out), 3000)
+
+    def test_invalid_packets(self):
+        legacy = b"0123456789abcdef|REQ|system info|node01$"
+        self.assertFalse(self.now.parse_packet(legacy)[0])
+        self.assertFalse(self.now.parse_packet(b"\x00" * 5)[0])
+        bad_seq = b"\x00" * 8 + bytes((self.now.OPER_RSP, 3, 2, 0))
+        self.assertFalse(self.now.parse_packet(bad_seq)[0])
+
+
+class TestLoopback(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.now = _load_mespnow()
+
+    def setUp(self):
+        self.now.ESPNowSS._instance = None
+        NativeTaskStub.TASKS.clear()
+
+    def _run(self, command, timeout=2):
+        async def _main():
+            node = self.now.ESPNowSS()
+            node.start_server()
+            node.espnow.add_peer(PEER)
+            node.devices[PEER] = "node02"
+            sender = node.send(peer="node02", msg=command)
+            result = await NativeTaskStub.TASKS[list(sender)[0]].await_result(timeout=timeout)
+            return node, result
+        return asyncio.run(_main())
+
+    def test_hello(self):
+        _, result = self._run("hello")
+        self.assertEqual(result, "hello node01")
+
+    def test_long_response(self):
+        node, result = self._run("task list")
+        self.assertEqual(result, LONG_OUTPUT)
+        self.assertEqual(self.now.ResponseRouter._routes, {})
+        self.assertGreater(node.espnow.stats()[0], 10)
+        self.assertEqual(node.espnow.stats()[2], 0)
+
+
+class TestReceiveBuffer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.now = _load_mespnow()
+
+    def setUp(self):
+        self.now.ESPNowSS._instance = None
+        self.now.ResponseRouter._fragments.clear()
+
+    def _burst(self, espnow, tid):
+        data = "x" * (237 * self.now.MAX_FRAGMENTS - 10)
+        packets = self.now.render_packet(tid=tid, oper="RSP", data=data, prompt="n1")
+        async def _main():
+            # Fragments back to back: the receiver task is not scheduled in between
+            for packet in packets:
+                espnow.send(PEER, packet)
+            payload = None
+            while not espnow.queue.empty():
+                mac, msg = espnow.queue.get_nowait()
+                _, parsed = self.now.parse_packet(msg)
+                payload = self.now.ResponseRouter.reassemble(mac, parsed) or payload
+            return payload
+        payload = asyncio.run(_main())
+        return len(packets), payload, espnow.stats()[4]
+
+    def test_default_rxbuf_drops_fragments(self):
+        count, payload, dropped = self._burst(self.now.AIOESPNow(), tid=b"\x05" * 8)
+        self.assertEqual(count, self.now.MAX_FRAGMENTS)
+        self.assertIsNone(payload)
+        self.assertEqual(dropped, count - 2)
+
+    def test_session_rxbuf_holds_max_message(self):
+        node = self.now.ESPNowSS()
+        count, payload, dropped = self._burst(node.espnow, tid=b"\x06" * 8)
+        self.assertEqual((count, dropped), (self.now.MAX_FRAGMENTS, 0))
+        self.assertEqual(self.now.unpack_payload(payload)[1], ("n1", "x" * (237 * self.now.MAX_FRAGMENTS - 10)))
+
+
+class TestGroupLoopback(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.now = _load_mespnow()
+
+    def setUp(self):
+        self.now.ESPNowSS._instance = None
+        NativeTaskStub.TASKS.clear()
+
+    def _run(self, command, peers=None, timeout=1, offline=(), failed=(), interleave=False):
+        async def _main():
+            responses = {}
+            node = self.now.ESPNowSS()
+            # loopback: one receive buffer for all simulated devices
+            node.espnow.config(rxbuf=len(PEERS) * self.now.RX_BUF)
+            node.start_server()
+            for mac, name in PEERS.items():
+                node.espnow.add_peer(mac)
+                node.devices[mac] = name
+            real_handler, real_send = node._request_handler, node.espnow.send
+            def _handler(msg, my_task, mac):
+                # loopback: every request/response carries the own prompt, keep the peer names
+                out = real_handler(msg, my_task, mac)
+                node.devices[mac] = PEERS[mac]
+                return out
+            node._request_handler = _handler
+            def _send(mac, msg):
+                # offline peers: packet sent (acked) but never answered, failed peers: send not acked
+                if mac in failed:
+                    return False
+                if interleave:
+                    # interleave: peer response fragments are collected, then sent round-robin (parallel peers)
+                    _, packet = self.now.parse_packet(msg)
+                    responses[mac] = self.now.render_packet(tid=packet["tid"], oper="RSP",
+                                                            data=LONG_OUTPUT, prompt=PEERS[mac])
+                    return True
+                return True if mac in offline else real_send(mac, msg)
+            node.espnow.send = _send
+            sender = node.group_send(command, peers=peers, timeout=timeout)
+            if interleave:
+                while len(responses) < len(peers):
+                    await asyncio.sleep(0.01)
+                for i in range(max(len(packets) for packets in responses.values())):
+                    for mac, packets in responses.items():
+                        if i < len(packets):
+                            real_send(mac, packets[i])
+            task = NativeTaskStub.TASKS[list(sender)[0]]
+            result = await task.await_result(timeout=timeout + 1)
+            return task, result
+        return asyncio.run(_main())
+
+    def test_group_all_members(self):
+        task, result = self._run("rgb toggle")
+        self.assertTrue(task.tag.startswith("con.espnow.group.rgb."))
+        self.assertEqual(result["responses"], {name: "rgb toggle" for name in PEERS.values()})
+        self.assertEqual(result["timeout"], [])
+        self.assertEqual(self.now.ResponseRouter._routes, {})
+
+    def test_group_timeout_stats(self):
+        offline = [mac for mac in PEERS if mac[-1] % 5 == 0]
+        _, result = self._run("task list", timeout=0.3, offline=offline)
+        self.assertEqual(len(result["responses"]), 16)
+        self.assertTrue(all(out == LONG_OUTPUT for out in result["responses"].values()))
+        self.assertEqual(result["timeout"], [PEERS[mac] for mac in offline])
+        self.assertGreaterEqual(result["ms"], 250)
+
+    def test_group_unreachable_not_awaited(self):
+        failed = [mac for mac in PEERS if mac[-1] % 5 == 0]
+        _, result = self._run("rgb toggle", timeout=5, failed=failed)
+        self.assertEqual(len(result["responses"]), len(PEERS) - len(failed))
+        self.assertEqual(result["timeout"], [])
+        self.assertEqual(result["unreachable"], {PEERS[mac]: "Peer not responding" for mac in failed})
+        self.assertLess(result["ms"], 1000)      # collector finished without waiting for the deadline
+        self.assertEqual(self.now.ResponseRouter._routes, {})
+
+    def test_group_interleaved_fragmented_responses(self):
+        peers = list(PEERS.values())[:8]
+        _, result = self._run("task list", peers=peers, timeout=2, interleave=True)
+        self.assertEqual(result["responses"], {name: LONG_OUTPUT for name in peers})
+        self.assertEqual(result["timeout"], [])
+        self.assertEqual(self.now.ResponseRouter._fragments, {})
+
+    def test_group_unique_tags(self):
+        async def _main():
+            node = self.now.ESPNowSS()
+            node.devices.update(PEERS)
+            node.espnow.send = lambda *_a: True
+            first = node.group_send("rgb toggle", peers=["light01"], timeout=0.1)
+            second = node.group_send("rgb toggle", peers=["light01"], timeout=0.1)
+            for task in list(NativeTaskStub.TASKS.values()):
+                await task.await_result(timeout=1)
+            return first, second
+        first, second = asyncio.run(_main())
+        self.assertNotEqual(list(first), list(second))
+        self.assertEqual(list(first.values()) + list(second.values()), ["Starting", "Starting"])
+
+    def test_group_unknown_peer(self):
+        node = self.now.ESPNowSS()
+        node.devices.update(PEERS)
+        self.assertEqual(node.group_send("hello", peers=["light01", "nope"]), {"nope": "Unknown device"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,286 @@
+"""
+InterConnect.py unit test - group fan-out (send_cmd_group), persistent session pool
+
+Run:
+  python3 -m unittest -v utests.test_interconnect
+
+This:
+- loads ../source/InterConnect.py via importlib (no package needed)
+- stubs micrOS imports (Tasks, Config, Debug, Server), uasyncio: asyncio
+- stubs InterCon.send_cmd (no sockets): per host delay and output
+- stubs open_connection with a socket shell stand-in (prompt, command echo) for the session pool
+"""
+
+import asyncio
+import importlib.util
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve()
+SOURCE = HERE.parent.parent / "source"
+
+
+def setUpModule():
+    print(f"== RUN {Path(__file__).name} ==")
+
+
+class NativeTaskStub:
+    TASKS = {}
+
+    def __init__(self):
+        self.tag = None
+        self.out = ""
+        self.done = asyncio.Event()
+
+    def create(self, callback=None, tag=None):
+        if tag in NativeTaskStub.TASKS and not NativeTaskStub.TASKS[tag].done.is_set():
+            callback.close()
+            return {tag: "Already running"}
+        self.tag = tag
+        NativeTaskStub.TASKS[tag] = self
+        asyncio.get_event_loop().create_task(callback)
+        return {tag: "Starting"}
+
+    @staticmethod
+    def is_busy(tag):
+        task = NativeTaskStub.TASKS.get(tag)
+        return task is not None and not task.done.is_set()
+
+    async def feed(self, sleep_ms=1):
+        await asyncio.sleep(sleep_ms / 1000)
+
+    async def await_result(self, timeout=5):
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return "Timeout has beed exceeded"
+        return self.out
+
+    def __enter__(self):
+        self.done.clear()
+        return self
+
+    def __exit__(self, *_):
+        self.done.set()
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_interconnect():
+    stubs = {}
+    m = stubs["Tasks"] = types.ModuleType("Tasks")
+    m.NativeTask = NativeTaskStub
+    m.TaskBase = NativeTaskStub
+    m = stubs["Config"] = types.ModuleType("Config")
+    m.cfgget = {"espnow": False, "socport": 9008, "appwd": "ADmin123"}.get
+    m = stubs["Debug"] = types.ModuleType("Debug")
+    m.syslog = lambda *_a, **_k: True
+    m = stubs["Server"] = types.ModuleType("Server")
+    m.Server = types.SimpleNamespace(reply_all=lambda *_a, **_k: None)
+    m = stubs["utime"] = types.ModuleType("utime")
+    m.ticks_ms = lambda: int(time.monotonic() * 1000)
+    m.ticks_diff = lambda a, b: a - b
+    stubs["uasyncio"] = asyncio
+    with mock.patch.dict(sys.modules, stubs):
+        return _load_module("interconnect_under_test", SOURCE / "InterConnect.py")
+
+
+class TestGroupSend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ic = _load_interconnect()
+
+    def setUp(self):
+        NativeTaskStub.TASKS.clear()
+        self.active, self.peak = 0, 0
+
+    def _run(self, hosts, cmd, limit=4, timeout=1, delays=None, outputs=None):
+        delays, outputs = delays or {}, outputs or {}
+
+        async def _send_cmd(_self, host, command):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(delays.get(host, 0.01))
+            finally:
+                self.active -= 1
+            return outputs.get(host, f"{host}: {' '.join(command)}")
+
+        async def _main():
+            state = self.ic.send_cmd_group(hosts, cmd, limit=limit, timeout=timeout)
+            tag = list(state)[0]
+            return tag, await NativeTaskStub.TASKS[tag].await_result(timeout=timeout + 1)
+
+        with mock.patch.object(self.ic.InterCon, "send_cmd", _send_cmd):
+            return asyncio.run(_main())
+
+    def test_aggregated_output(self):
+        hosts = ["node01.local", "node02.local", "10.0.1.3"]
+        tag, result = self._run(hosts, "rgb toggle", outputs={"node02.local": ""})
+        self.assertTrue(tag.startswith("con.group.rgb."))
+        self.assertEqual(list(result), hosts)
+        self.assertEqual(result["node01.local"]["out"], "node01.local: rgb toggle")
+        self.assertIsNone(result["node01.local"]["err"])
+        self.assertEqual(result["node02.local"]["err"], "NoReply")
+        self.assertEqual(result["10.0.1.3"]["out"], "10.0.1.3: rgb toggle")
+
+    def test_concurrency_limit(self):
+        hosts = [f"node{i:02d}.local" for i in range(7)]
+        _, result = self._run(hosts, ["system", "info"], limit=2, delays={h: 0.05 for h in hosts})
+        self.assertEqual(self.peak, 2)
+        self.assertTrue(all(r["err"] is None for r in result.values()))
+
+    def test_deadline_timeout(self):
+        hosts = ["fast.local", "slow.local"]
+        _, result = self._run(hosts, "rgb toggle", limit=2, timeout=0.2, delays={"slow.local": 5})
+        self.assertIsNone(result["fast.local"]["err"])
+        self.assertEqual(result["slow.local"], {"out": None, "ms": 200, "err": "Timeout"})
+
+    def test_unique_group_tags(self):
+        async def _main():
+            first = self.ic.send_cmd_group(["a.local"], "rgb toggle")
+            second = self.ic.send_cmd_group(["b.local"], "rgb toggle")
+            again = self.ic.send_cmd_group(["a.local"], "rgb toggle")
+            for task in list(NativeTaskStub.TASKS.values()):
+                await task.await_result(timeout=2)
+            return first, second, again
+
+        with mock.patch.object(self.ic.InterCon, "send_cmd", mock.AsyncMock(return_value="ok")):
+            first, second, again = asyncio.run(_main())
+        self.assertNotEqual(list(first), list(second))
+        self.assertEqual(list(first.values()), ["Starting"])
+        self.assertEqual(list(second.values()), ["Starting"])
+        self.assertEqual(again, {list(first)[0]: "Already running"})
+
+
+class ShellStub:
+    """Socket shell stand-in: prompt on connect, '<cmd> ok' + prompt per command, closed_after: commands"""
+    PROMPT = b"node01 $ "
+
+    def __init__(self, closed_after=None, busy=False):
+        self.rx = asyncio.Queue()
+        self.rx.put_nowait(b"Connection is busy. Bye!" if busy else ShellStub.PROMPT)
+        self.closed_after = closed_after
+        self.commands = []
+        self.closed = False
+
+    async def read(self, _n):
+        return await self.rx.get()
+
+    def write(self, data):
+        self.commands.append(data.decode())
+        if self.closed_after is not None and len(self.commands) > self.closed_after:
+            self.rx.put_nowait(b"")                 # stale session: closed by peer
+        else:
+            self.rx.put_nowait(data + b" ok\n" + ShellStub.PROMPT)
+
+    async def drain(self):
+        await asyncio.sleep(0.01)
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        return None
+
+
+class TestSessionPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ic = _load_interconnect()
+
+    def setUp(self):
+        NativeTaskStub.TASKS.clear()
+        self.ic.InterCon.POOL.clear()
+        self.ic.InterCon.CONN_MAP.clear()
+        self.shells = []
+
+    def _connect(self, *closed_after, busy=0):
+        closed_after = list(closed_after)
+        busy = [busy]
+
+        async def _open_connection(_host, _port):
+            shell = ShellStub(closed_after.pop(0) if closed_after else None, busy=busy[0] > 0)
+            busy[0] -= 1
+            self.shells.append(shell)
+            return shell, shell
+        return mock.patch.object(self.ic, "open_connection", _open_connection)
+
+    def test_session_reused(self):
+        async def _main():
+            com = self.ic.InterCon()
+            return [await com.send_cmd("10.0.1.5", ["rgb", "toggle"]) for _ in range(3)]
+
+        with self._connect():
+            outputs = asyncio.run(_main())
+        self.assertEqual([out.strip() for out in outputs], ["rgb toggle ok"] * 3)
+        self.assertEqual(len(self.shells), 1)
+        self.assertEqual(self.shells[0].commands, ["rgb toggle"] * 3)
+        self.assertIn("10.0.1.5", self.ic.InterCon.POOL)
+
+    def test_failed_session_dropped_before_queued_command(self):
+        async def _main():
+            return await asyncio.gather(self.ic.InterCon().send_cmd("10.0.1.5", ["first"]),
+                                        self.ic.InterCon().send_cmd("10.0.1.5", ["second"]))
+
+        # First connection is closed by peer on the first command
+        with self._connect(0):
+            first, second = asyncio.run(_main())
+        self.assertIsNone(first)
+        self.assertEqual(second.strip(), "second ok")
+        # Queued command did not reuse the failed (closed) connection
+        self.assertEqual(len(self.shells), 2)
+        self.assertEqual(self.shells[0].commands, ["first"])
+        self.assertTrue(self.shells[0].closed)
+        self.assertEqual(self.shells[1].commands, ["second"])
+
+    def test_busy_reply_releases_session(self):
+        async def _main():
+            com = self.ic.InterCon()
+            busy = await com.send_cmd("10.0.1.5", ["rgb", "toggle"])
+            pooled = "10.0.1.5" in self.ic.InterCon.POOL
+            return busy, pooled, await com.send_cmd("10.0.1.5", ["rgb", "toggle"])
+
+        with self._connect(busy=1):
+            busy, pooled, output = asyncio.run(_main())
+        self.assertIsNone(busy)
+        self.assertFalse(pooled)
+        self.assertTrue(self.shells[0].closed)             # remote server slot released
+        self.assertEqual(self.shells[0].commands, [])
+        self.assertEqual(output.strip(), "rgb toggle ok")
+
+    def test_gc_closes_idle_sessions(self):
+        async def _main():
+            com = self.ic.InterCon()
+            await com.send_cmd("10.0.1.5", ["rgb", "toggle"])
+            self.ic.InterCon._pool_add("10.0.1.6")      # never connected: writer None
+            await NativeTaskStub.TASKS["con.pool"].await_result(timeout=1)
+
+        with self._connect(), mock.patch.object(self.ic.InterCon, "POOL_IDLE_MS", -1), \
+                mock.patch.object(NativeTaskStub, "feed", lambda _self, sleep_ms=1: asyncio.sleep(0)), \
+                mock.patch.object(self.ic, "syslog") as syslog:
+            asyncio.run(_main())
+        self.assertEqual(self.ic.InterCon.POOL, {})
+        self.assertTrue(self.shells[0].closed)
+        syslog.assert_not_called()
+
+    def test_close_none_writer(self):
+        with mock.patch.object(self.ic, "syslog") as syslog:
+            asyncio.run(self.ic.InterCon._close(None))
+        syslog.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
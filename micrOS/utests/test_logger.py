@@ -0,0 +1,285 @@
+"""
+Logger.py unit test - append-only segmented log with write-behind queue
+
+Run:
+  python3 -m unittest -v utests.test_logger
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve()
+SOURCE = HERE.parent.parent / "source"
+
+
+def setUpModule():
+    print(f"== RUN {Path(__file__).name} ==")
+
+
+def _load_logger(root):
+    stubs = {}
+    m = stubs["uos"] = types.ModuleType("uos")
+    m.remove = os.remove
+    m.rename = os.rename
+    m = stubs["Files"] = types.ModuleType("Files")
+    m.OSPath = types.SimpleNamespace(_ROOT=root, LOGS=os.path.join(root, "logs"), DATA=os.path.join(root, "data"))
+    m.path_join = os.path.join
+    m.is_dir = os.path.isdir
+    m.is_file = os.path.isfile
+    m.ilist_fs = lambda path, type_filter='*': (f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f)))
+    with mock.patch.dict(sys.modules, stubs):
+        spec = importlib.util.spec_from_file_location("logger_under_test", str(SOURCE / "Logger.py"))
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    return mod
+
+
+class TestSegmentedLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp.name, "logs"))
+        os.mkdir(os.path.join(self.tmp.name, "data"))
+        self.log = _load_logger(self.tmp.name)
+        self.data = os.path.join(self.tmp.name, "data")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, f_name):
+        lines = []
+        self.log.log_get(f_name, msgobj=lines.append)
+        return [line.split(" ", 1)[1] for line in lines[1:]]
+
+    def test_segment_names(self):
+        self.assertEqual(self.log._segment("/logs/err.sys.log", 0), "/logs/err.sys.log")
+        self.assertEqual(self.log._segment("/logs/err.sys.log", 1), "/logs/err.1.sys.log")
+        self.assertEqual(self.log._segment("/data/temp.dat", 2), "/data/temp.2.dat")
+
+    def test_write_behind(self):
+        self.assertTrue(self.log.logger("v1", "temp.dat", 5))
+        self.assertTrue(self.log.logger("v2", "temp.dat", 5))
+        self.assertFalse(os.path.exists(os.path.join(self.data, "temp.dat")))
+        with mock.patch("builtins.open", wraps=open) as _open:
+            self.assertTrue(self.log.log_flush())
+        self.assertEqual(_open.call_count, 2)       # line count (first write) + one append
+        with open(os.path.join(self.data, "temp.dat")) as f:
+            self.assertEqual([line.split(" ", 1)[1] for line in f], ["v1\n", "v2\n"])
+        self.assertEqual(self.log.Log.PENDING, 0)
+
+    def test_rotation_drops_oldest_segment(self):
+        for i in range(23):
+            self.log.logger(f"v{i}", "temp.dat", 5)
+            if i % 3 == 0:
+                self.log.log_flush()
+        self.assertEqual(sorted(os.listdir(self.data)), ["temp.1.dat", "temp.dat"])
+        # Active segment: 3 lines, rotated: 5 lines - oldest first
+        self.assertEqual(self._read("temp.dat"), [f"v{i}" for i in range(15, 23)])
+
+    def test_limit_above_legacy_cap(self):
+        for i in range(130):
+            self.log.logger(f"v{i}", "temp.dat", 60)
+        self.assertEqual(self._read("temp.dat"), [f"v{i}" for i in range(60, 130)])
+
+    def test_queue_limit_sync_flush(self):
+        for i in range(self.log.Log.QUEUE_MAX + 1):
+            self.log.logger(f"v{i}", "temp.dat", 50)
+        self.assertEqual(self.log.Log.PENDING, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.data, "temp.dat")))
+
+    def test_failed_write_requeued(self):
+        for i in range(3):
+            self.log.logger(f"v{i}", "temp.dat", 50)
+        with mock.patch("builtins.open", side_effect=OSError(28, "ENOSPC")):
+            self.assertFalse(self.log.log_flush())
+        self.assertEqual(self.log.Log.PENDING, 3)
+        self.log.logger("v3", "temp.dat", 50)
+        self.assertTrue(self.log.log_flush())
+        self.assertEqual(self.log.Log.PENDING, 0)
+        self.assertEqual(self._read("temp.dat"), ["v0", "v1", "v2", "v3"])
+
+    def test_failed_write_requeue_bounded(self):
+        with mock.patch("builtins.open", side_effect=OSError(28, "ENOSPC")):
+            for i in range(self.log.Log.QUEUE_MAX * 2):
+                self.log.logger(f"v{i}", "temp.dat", 50)
+        self.assertEqual(self.log.Log.PENDING, self.log.Log.QUEUE_MAX)
+        # Newest lines are kept
+        last = self.log.Log.QUEUE_MAX * 2 - 1
+        self.assertEqual(self._read("temp.dat")[-1], f"v{last}")
+
+    def test_syslog_error_sync_flush(self):
+        self.log.syslog("[WARN] w1")
+        self.assertEqual(self.log.Log.PENDING, 1)          # write-behind
+        self.assertTrue(self.log.syslog("[ERR] e1"))
+        # Error line (and the queued lines before it) are on flash right away
+        self.assertEqual(self.log.Log.PENDING, 0)
+        with open(os.path.join(self.tmp.name, "logs", "err.sys.log")) as f:
+            self.assertTrue(f.read().endswith("[ERR] e1\n"))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "logs", "warn.sys.log")))
+
+    def test_syslog_levels_and_clean(self):
+        self.log.syslog("[ERR] e1")
+        self.log.syslog("[WARN] w1")
+        self.log.syslog("user line")
+        lines = []
+        self.assertEqual(self.log.syslog(msgobj=lines.append), 1)
+        self.assertTrue(any("[ERR] e1" in line for line in lines))
+        self.assertTrue(any("user line" in line for line in lines))
+        self.log.syslog("[ERR] e2")
+        self.log.log_clean()
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "logs")), [])
+        self.assertEqual(self.log.Log.PENDING, 0)
+        self.assertEqual(self.log.syslog(), 0)
+
+
+class TestSyslogTiers(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp.name, "logs"))
+        self.log = _load_logger(self.tmp.name)
+        self.logs = os.path.join(self.tmp.name, "logs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_min_persisted_level(self):
+        self.assertEqual(self.log.log_level("WARN"), 3)
+        for msg in ("[INFO] i1", "[ERR] e1", "[PLED] custom", "[WARN] w1", "[BOOT] b1"):
+            self.assertTrue(self.log.syslog(msg))
+        self.log.log_flush()
+        self.assertEqual(sorted(os.listdir(self.logs)), ["err.sys.log", "warn.sys.log"])
+        ring = [e for e in self.log.Log.RING if e is not None]
+        self.assertEqual([(e[1], e[2]) for e in ring],
+                         [("info", False), ("err", True), ("user", False), ("warn", True), ("boot", False)])
+        self.assertEqual(self.log.log_level("invalid"), 0)
+
+    def test_ring_overwrite(self):
+        size = len(self.log.Log.RING)
+        self.log.log_level("err")
+        for i in range(size + 5):
+            self.log.syslog(f"[INFO] i{i}")
+        msgs = sorted(int(e[3][8:]) for e in self.log.Log.RING)
+        self.assertEqual(msgs, list(range(5, size + 5)))
+        self.assertEqual(os.listdir(self.logs), [])
+
+    def test_read_merges_ram_and_flash(self):
+        with open(os.path.join(self.logs, "err.sys.log"), "w") as f:
+            f.write("2023.1.1-0:0:0 [ERR] old boot\n")
+        self.log.log_level("warn")
+        with mock.patch.object(self.log, "localtime", return_value=(2024, 5, 1, 9, 3, 0, 0, 0)), \
+                mock.patch.object(self.log, "time", return_value=1):
+            self.log.syslog("[INFO] ram only")
+            self.log.syslog("[ERR] persisted")
+            self.log.syslog("[BOOT] ram boot")
+            lines = []
+            self.assertEqual(self.log.syslog_read(msgobj=lines.append), 2)
+        self.assertEqual(lines, ["2023.1.1-0:0:0 [ERR] old boot", "2024.5.1-9:3:0 [INFO] ram only",
+                                 "2024.5.1-9:3:0 [ERR] persisted", "2024.5.1-9:3:0 [BOOT] ram boot"])
+        lines = []
+        self.log.syslog_read(level="boot", msgobj=lines.append)
+        self.assertEqual(len(lines), 3)
+
+
+class TestTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = _load_logger(self.tmp.name)
+        self.path = os.path.join(self.tmp.name, "bme.tsd")
+        self.fields = {"temp": "f", "hum": "f", "lux": "h"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _fill(self, n, capacity=100, t0=1_700_000_000):
+        series = self.log.TimeSeries(self.path, self.fields, capacity)
+        for i in range(n):
+            series.append((20 + i / 10, 40.5, i), epoch=t0 + i * 60)
+        return series
+
+    def test_fixed_width_records(self):
+        self._fill(10)
+        series = self.log.TimeSeries(self.path)     # reopen: header only
+        self.assertEqual(series.names, ("temp", "hum", "lux"))
+        self.assertEqual(series.rec, 4 + 4 + 4 + 2)
+        self.assertEqual(os.path.getsize(self.path), series.offset + 10 * series.rec)
+        epoch, temp, hum, lux = list(series.query())[-1]
+        self.assertEqual((epoch, lux), (1_700_000_000 + 540, 9))
+        self.assertAlmostEqual(temp, 20.9, places=5)
+
+    def test_ring_buffer_wrap(self):
+        self._fill(250, capacity=100)
+        series = self.log.TimeSeries(self.path)
+        self.assertEqual((series.count, series.head), (100, 50))
+        self.assertEqual([r[3] for r in series.query()], list(range(150, 250)))
+        self.assertEqual(os.path.getsize(self.path), series.offset + 100 * series.rec)
+
+    def test_range_query(self):
+        series = self._fill(250, capacity=100)
+        t0 = 1_700_000_000
+        records = list(series.query(start=t0 + 200 * 60, end=t0 + 210 * 60))
+        self.assertEqual([r[3] for r in records], list(range(200, 211)))
+        self.assertEqual(list(series.query(start=t0 + 999 * 60)), [])
+        self.assertEqual([r[3] for r in series.query(end=t0 + 151 * 60)], [150, 151])
+
+    def test_downsampled_read(self):
+        series = self._fill(90, capacity=100)
+        points = list(series.query(points=10))
+        self.assertEqual(len(points), 10)
+        self.assertEqual(points[0][0], 1_700_000_000)
+        self.assertAlmostEqual(points[0][3], 4.0)       # lux average of 0..8
+        self.assertAlmostEqual(points[-1][3], 85.0)
+
+    def test_int32_field(self):
+        series = self.log.TimeSeries(self.path, {"count": "i"}, 10)
+        self.assertTrue(series.append((100_000,), epoch=1_700_000_000))
+        self.assertEqual(series.rec, 4 + 4)
+        self.assertEqual(list(self.log.TimeSeries(self.path).query()), [(1_700_000_000, 100_000)])
+
+    def test_unsynced_and_out_of_order_skipped(self):
+        series = self._fill(5)
+        t_last = 1_700_000_000 + 4 * 60
+        self.assertFalse(series.append((1, 2, 3), epoch=self.log.TimeSeries.EPOCH + 60))   # RTC not synced
+        self.assertFalse(series.append((1, 2, 3), epoch=t_last - 1))                      # older than newest
+        self.assertEqual(self.log.TimeSeries(self.path).last, t_last)                       # reopen: newest epoch
+        self.assertTrue(series.append((1, 2, 3), epoch=t_last))
+        self.assertEqual(series.count, 6)
+        self.assertEqual([r[0] for r in series.query(start=t_last)], [t_last, t_last])
+
+    def test_long_field_names(self):
+        fields = {f"sensor_{i:02d}_temperature": "f" for i in range(11)}     # header over 256 bytes
+        series = self.log.TimeSeries(self.path, fields, 10)
+        self.assertTrue(series.append(range(11), epoch=1_700_000_000))
+        series = self.log.TimeSeries(self.path)
+        self.assertEqual(series.names, tuple(fields))
+        self.assertGreater(series.offset, 256)
+        self.assertEqual(list(series.query()), [(1_700_000_000,) + tuple(float(i) for i in range(11))])
+
+    def test_cache_dropped_on_removed_file(self):
+        series = self.log.TimeSeries.get(self.path, self.fields, 10)
+        series.append((1, 2, 3), epoch=1_700_000_000)
+        os.remove(self.path)
+        self.assertRaises(OSError, self.log.TimeSeries.get, self.path)
+        self.assertNotIn(self.path, self.log.TimeSeries.CACHE)
+        # Recreated on the next append
+        series = self.log.TimeSeries.get(self.path, self.fields, 10)
+        self.assertTrue(series.append((1, 2, 3), epoch=1_700_000_000))
+        self.assertEqual(series.count, 1)
+
+    def test_new_fields_recreate(self):
+        self._fill(5)
+        series = self.log.TimeSeries(self.path, {"temp": "f"}, 10)
+        self.assertEqual((series.names, series.count, series.capacity), (("temp",), 0, 10))
+        self.assertRaises(OSError, self.log.TimeSeries, os.path.join(self.tmp.name, "none.tsd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -65,7 +65,7 @@ class _PacmanStubEnv:
         for path in (self.lib, self.modules, self.web, self.data, self.config):
             path.mkdir()
 
-        for name in ("Auth", "Common", "Debug", "Files", "mip", "Pacman", "uos", "urequests"):
+        for name in ("Auth", "Common", "Debug", "Files", "mip", "Pacman", "Tasks", "uos", "urequests"):
             self._saved[name] = sys.modules.get(name)
 
         env = self
@@ -84,6 +84,10 @@ class _PacmanStubEnv:
         common_mod.socket_stream = lambda callback: callback
         sys.modules["Common"] = common_mod
 
+        tasks_mod = types.ModuleType("Tasks")
+        tasks_mod.lm_unload = lambda lm_mod: sys.modules.pop(lm_mod, None) is not None
+        sys.modules["Tasks"] = tasks_mod
+
         debug_mod = types.ModuleType("Debug")
         debug_mod.console_write = lambda *_a, **_k: None
         debug_mod.syslog = lambda msg, *_a, **_k: env.logs.append(str(msg))
@@ -38,8 +38,9 @@ def setUpModule():
 #   sunrise / sunset / sunrise+30 / sunset-15 (uses SUN_TIME mapping)
 #
 # NOTE: Builtins are always present in Scheduler.scheduler():
-#   "*:3:0:0" -> suntime
-#   "*:3:5:0" -> ntp_time
+#   "*:0:0:0" -> sun_update
+#   "*:3:0:0" -> suntime_task
+#   "*:3:5:0" -> ntp_task
 #
 TEST_TASKS = [
     # Fires daily at noon
@@ -80,6 +81,7 @@ def _install_import_stubs():
     if "Tasks" not in sys.modules:
         m = types.ModuleType("Tasks")
         m.exec_lm_pipe_schedule = lambda *_a, **_k: True
+        m.TaskBase = type("TaskBase", (), {"TASKS": {}})
         sys.modules["Tasks"] = m
 
     if "Debug" not in sys.modules:
@@ -95,13 +97,17 @@ def _install_import_stubs():
             TIME: Dict[str, Tuple[int, int, int]] = {}
 
         m.Sun = _Sun
-        m.suntime = lambda: "stub_suntime"
-        m.ntp_time = lambda: "stub_ntp_time"
+        m.sun_table = lambda day=0: m.Sun.TIME
+        m.sun_update = lambda *_a: m.Sun.TIME
+        m.suntime_task = lambda: "stub_suntime"
+        m.ntp_task = lambda: "stub_ntp_time"
         sys.modules["Time"] = m
 
     if "Config" not in sys.modules:
         m = types.ModuleType("Config")
         m.cfgget = lambda _k: ""
+        m.cfgstream = lambda _k, *_a: iter(("",))
+        m.cfgwatch = lambda *_a, **_k: True
         sys.modules["Config"] = m
 
 
@@ -271,7 +277,8 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
         cls.S = _load_scheduler_module()
 
     def setUp(self):
-        self.S.LAST_CRON_TASKS.clear()
+        self.S.CronTable.TASKS = None
+        self.S.CronTable.CLOCK = None
 
     def test_one_year_metrics_and_counts(self):
         S = self.S
@@ -280,10 +287,12 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
         cron_data = ";".join(f"{t['time']}!{t['lm']}" for t in TEST_TASKS)
 
         aggs: Dict[str, Agg] = {
+            "BUILTIN:sun_update": Agg(),
             "BUILTIN:suntime": Agg(),
             "BUILTIN:ntp_time": Agg(),
         }
         expected_counts: Dict[str, int] = {
+            "BUILTIN:sun_update": RUN_DAYS,
             "BUILTIN:suntime": RUN_DAYS,
             "BUILTIN:ntp_time": RUN_DAYS,
         }
@@ -298,12 +307,13 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
         # Patch Scheduler dependencies in-module
         S.console_write = lambda *_a, **_k: None
         S.syslog = lambda *_a, **_k: None
-        S.cfgget = lambda k: cron_data if k == "crontasks" else ""
+        S.cfgstream = lambda k, *_a: iter((cron_data,) if k == "crontasks" else ("",))
 
         class _SunObj:
             TIME = dict(SUN_TIME)
 
         S.Sun = _SunObj
+        S.sun_table = lambda day=0: _SunObj.TIME
 
         current_localtime: Optional[Tuple[int, int, int, int, int, int, int, int]] = None
 
@@ -322,6 +332,10 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
             dt = act_sec - req_sec
             aggs[key].add(dt, tol=EXEC_PERIOD_SEC)
 
+        def fake_sun_update():
+            _record("BUILTIN:sun_update", 0, 0, 0)
+            return "sun table ok"
+
         def fake_suntime():
             _record("BUILTIN:suntime", 3, 0, 0)
             return "sun ok"
@@ -330,8 +344,9 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
             _record("BUILTIN:ntp_time", 3, 5, 0)
             return "ntp ok"
 
-        S.suntime = fake_suntime
-        S.ntp_time = fake_ntp_time
+        S.sun_update = fake_sun_update
+        S.suntime_task = fake_suntime
+        S.ntp_task = fake_ntp_time
 
         def fake_exec_lm_pipe_schedule(cmd: str):
             cmd = str(cmd).strip()
@@ -435,5 +450,136 @@ class TestSchedulerSingleYearMetrics(unittest.TestCase):
         self.assertTrue(True)
 
 
+class TestCronTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.S = _load_scheduler_module()
+
+    def setUp(self):
+        self.executed = []
+        S = self.S
+        S.CronTable.TASKS = None
+        S.CronTable.CLOCK = None
+        S.syslog = lambda *_a, **_k: None
+        S.console_write = lambda *_a, **_k: None
+        S.exec_lm_pipe_schedule = lambda cmd: self.executed.append(cmd) or True
+        S.sun_update = lambda: "sun table ok"
+        S.sun_table = lambda day=0: {}
+        S.suntime_task = lambda: "sun ok"
+        S.ntp_task = lambda: "ntp ok"
+
+    def _tick(self, wd, h, m, s):
+        return self.S.CronTable.tick((2024, 1, 1, h, m, s, wd, 0))
+
+    def test_decremental_weekday_range(self):
+        self.S.cfgstream = lambda k, *_a: iter(("5-1:10:0:0!LM_RANGE",) if k == "crontasks" else ("",))
+        for wd in range(7):
+            self._tick(wd, 9, 59, 55)
+            self._tick(wd, 10, 0, 0)
+        self.assertEqual(self.executed, ["LM_RANGE"] * 4)
+
+    def test_clock_jump_reindex_without_catch_up(self):
+        self.S.cfgstream = lambda k, *_a: iter(("*:12:0:0!LM_NOON",) if k == "crontasks" else ("",))
+        self._tick(0, 0, 0, 0)
+        # NTP sync like jump over the scheduled time: no catch-up execution
+        self._tick(0, 13, 0, 0)
+        self.assertEqual(self.executed, [])
+        # Late tick (within jump limit) executes due task
+        self._tick(1, 11, 59, 55)
+        self._tick(1, 12, 0, 20)
+        self.assertEqual(self.executed, ["LM_NOON"])
+
+    def test_crontasks_change_rebuilds_table(self):
+        self.S.cfgstream = lambda k, *_a: iter(("*:12:0:0!LM_OLD",) if k == "crontasks" else ("",))
+        self._tick(0, 11, 0, 0)
+        self.S.CronTable.build("*:11:30:0!LM_NEW")
+        self._tick(0, 11, 30, 0)
+        self._tick(0, 12, 0, 0)
+        self.assertEqual(self.executed, ["LM_NEW"])
+
+    def test_sun_tags_resolved_by_day(self):
+        # Offline sun table by day offset (today: self.today), day 2: polar night - no sunset
+        tables = {0: {"sunset": (18, 0, 0)}, 1: {"sunset": (18, 5, 0)}, 2: {}, 3: {"sunset": (18, 10, 0)}}
+        self.today = 0
+        self.S.sun_table = lambda day=0: tables.get(self.today + day, {})
+        self.S.cfgstream = lambda k, *_a: iter(("sunset!LM_SUNSET",) if k == "crontasks" else ("",))
+        self._tick(0, 17, 0, 0)
+        self._tick(0, 18, 0, 0)
+        self.today = 1
+        self._tick(1, 18, 0, 0)
+        self.assertEqual(self.executed, ["LM_SUNSET"])
+        self._tick(1, 18, 5, 0)
+        self.assertEqual(self.executed, ["LM_SUNSET"] * 2)
+        fire = [f for f, i in self.S.CronTable.HEAP if self.S.CronTable.TASKS[i][4] == "sunset"]
+        self.assertEqual(fire, [3 * 86400 + 18 * 3600 + 10 * 60])
+
+    def test_sleep_sec_until_next_due_task(self):
+        CronTable = self.S.CronTable
+        self.S.cfgstream = lambda k, *_a: iter(("*:12:0:0!LM_NOON;;*:12:0:1!LM_NEXT",) if k == "crontasks" else ("",))
+        self.assertEqual(CronTable.sleep_sec(), CronTable.MAX_SLEEP)     # not indexed yet
+        self._tick(0, 11, 59, 30)
+        self.assertEqual(CronTable.sleep_sec(), 30)
+        self._tick(0, 11, 0, 0)                                           # step back: due in 1h
+        self.assertEqual(CronTable.sleep_sec(), CronTable.MAX_SLEEP)
+        self._tick(0, 12, 0, 0)
+        self.assertEqual(self.executed, ["LM_NOON"])
+        self.assertEqual(CronTable.sleep_sec(), 1)
+        CronTable.HEAP = []
+        self.assertEqual(CronTable.sleep_sec(), CronTable.MAX_SLEEP)
+
+    def test_aio_scheduler_sleeps_until_due(self):
+        import asyncio
+        now = [0, 11, 59, 50]       # virtual clock: wd, h, m, s
+        sleeps = []
+
+        class _Task:
+            out = ""
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_):
+                return False
+
+            async def feed(self, sleep_ms):
+                sleeps.append(sleep_ms)
+                if len(sleeps) == 3:
+                    raise asyncio.CancelledError()
+                sec = now[1] * 3600 + now[2] * 60 + now[3] + sleep_ms // 1000
+                now[1:] = [sec // 3600, sec % 3600 // 60, sec % 60]
+
+        task = _Task()
+        self.S.TaskBase.TASKS["cron"] = task
+        self.S.localtime = lambda: (2024, 1, 1, now[1], now[2], now[3], now[0], 0)
+        self.S.cfgstream = lambda k, *_a: iter(("*:12:0:0!LM_NOON",) if k == "crontasks" else ("",))
+        try:
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(self.S.aio_scheduler("cron"))
+        finally:
+            self.S.TaskBase.TASKS.pop("cron", None)
+            self.S.localtime = __import__("time").localtime
+        # 11:59:50 -> wake up at the due task (12:00:00), then max sleep (next: tomorrow)
+        self.assertEqual(sleeps, [10_000, 60_000, 60_000])
+        self.assertEqual(self.executed, ["LM_NOON"])
+        self.assertTrue(task.out.startswith("cron tasks: "))
+
+    def test_deserialize_chunked_stream(self):
+        raw = "*:1:0:0!LM_A;LM_B;; *:2:0:0!LM_C;;n/a;;"
+        expected = (("*:1:0:0", "LM_A;LM_B"), (" *:2:0:0", "LM_C"))
+        for size in (1, 2, 3, 7, len(raw)):
+            chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+            opened = []
+            self.S.cfgstream = lambda k, *_a: opened.append(k) or iter(chunks)
+            self.assertEqual(self.S.deserialize_raw_tasks(), expected, size)
+            self.assertEqual(opened, ["crontasks"])         # single pass read
+        # Missing crontasks key: empty stream
+        self.S.cfgstream = lambda k, *_a: iter(())
+        self.assertEqual(self.S.deserialize_raw_tasks(), ())
+        self.assertEqual(self.S.deserialize_raw_tasks("n/a"), ())
+        self.assertEqual(self.S.deserialize_raw_tasks("*:1:0:0!LM_A;*:2:0:0!LM_B"),
+                         (("*:1:0:0", "LM_A"), ("*:2:0:0", "LM_B")))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
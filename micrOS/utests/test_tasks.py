@@ -0,0 +1,262 @@
+"""
+Tasks.py unit test - task queue admission control, task runtime profiler, LM call parameter parsing
+
+Run:
+  python3 -m unittest -v utests.test_tasks
+
+This:
+- loads ../source/Tasks.py via importlib (no package needed)
+- stubs micrOS imports (Debug, Config), micropython, utime, uasyncio: asyncio (+sleep_ms)
+- uses an in-memory load module (LM_dummy) as task callback target
+"""
+
+import asyncio
+import importlib.util
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve()
+SOURCE = HERE.parent.parent / "source"
+
+
+def setUpModule():
+    print(f"== RUN {Path(__file__).name} ==")
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_tasks():
+    stubs = {}
+    m = stubs["uasyncio"] = types.ModuleType("uasyncio")
+    m.__dict__.update({k: v for k, v in vars(asyncio).items() if not k.startswith('__')})
+    m.sleep_ms = lambda ms: asyncio.sleep(ms / 1000)
+    m = stubs["micropython"] = types.ModuleType("micropython")
+    m.schedule = lambda func, arg: func(arg)
+    m = stubs["utime"] = types.ModuleType("utime")
+    m.ticks_ms = lambda: int(time.perf_counter() * 1000)
+    m.ticks_us = lambda: int(time.perf_counter() * 1_000_000)
+    m.ticks_diff = lambda a, b: a - b
+    m = stubs["Debug"] = types.ModuleType("Debug")
+    m.console_write = lambda *_a, **_k: None
+    m.syslog = lambda *_a, **_k: None
+    m = stubs["Config"] = types.ModuleType("Config")
+    m.cfgget = {"aioqueue": 3, "aioshed": "none", "ha": False}.get
+    m.cfgwatch = lambda *_a, **_k: None
+    m.cfgflush = lambda *_a, **_k: None
+    with mock.patch.dict(sys.modules, stubs):
+        return _load_module("tasks_under_test", SOURCE / "Tasks.py")
+
+
+def _load_dummy_lm():
+    m = types.ModuleType("LM_dummy")
+    for name in ("a", "b", "c", "d", "e", "u1", "u2", "i1"):
+        setattr(m, name, lambda *args, **kwargs: "ok")
+    sys.modules["LM_dummy"] = m
+
+
+class TestAdmission(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tasks = _load_tasks()
+        _load_dummy_lm()
+
+    def setUp(self):
+        self.TaskBase, self.Manager = self.tasks.TaskBase, self.tasks.Manager
+        self.TaskBase.TASKS.clear()
+        self.TaskBase.ACTIVE = 0
+        self.TaskBase.QUEUE_SIZE = 2
+        self.Manager.WAITING.clear()
+        self.Manager.SHED = "none"
+
+    def tearDown(self):
+        # Stopped tasks: object destructor must not release queue slots of the next test
+        for task in self.TaskBase.TASKS.values():
+            task.done.set()
+
+    def _create(self, func, loop=True, delay=1000, prio=None):
+        return self.Manager.create_task(["dummy", func], loop=loop, delay=delay, prio=prio)
+
+    def _run(self, scenario):
+        async def _main():
+            out = scenario()
+            await asyncio.sleep(0)      # started tasks are awaited (cancelled on exit)
+            return out
+        return asyncio.run(_main())
+
+    def test_queue_full_wait_and_admit(self):
+        def scenario():
+            states = [self._create("a"), self._create("b"), self._create("c"), self._create("d")]
+            self.assertRaises(Exception, self._create, "e")     # wait queue full
+            waiting = ['.'.join(w[0][0:2]) for w in self.Manager.WAITING]
+            killed = self.Manager.kill("dummy.a")
+            return states, waiting, killed
+        states, waiting, killed = self._run(scenario)
+        self.assertEqual(states, [{"dummy.a": "Starting"}, {"dummy.b": "Starting"},
+                                  {"dummy.c": "Queued"}, {"dummy.d": "Queued"}])
+        self.assertEqual(waiting, ["dummy.c", "dummy.d"])
+        self.assertTrue(killed[0])
+        # Freed slot: first waiting task admitted
+        self.assertTrue(self.TaskBase.is_busy("dummy.c"))
+        self.assertEqual([w[0][1] for w in self.Manager.WAITING], ["d"])
+        self.assertEqual(self.TaskBase.ACTIVE, 2)
+
+    def test_priority_ordered_wait_queue(self):
+        self.TaskBase.QUEUE_SIZE = 3
+        def scenario():
+            for func in ("a", "b", "c"):
+                self._create(func)
+            self._create("u1")
+            self._create("i1", prio=self.TaskBase.IRQ)
+            self._create("u2")
+            self.assertEqual(self._create("u1"), {"dummy.u1": "Already queued"})
+            return [w[0][1] for w in self.Manager.WAITING]
+        self.assertEqual(self._run(scenario), ["i1", "u1", "u2"])
+
+    def test_wildcard_kill_drops_waiting(self):
+        def scenario():
+            for func in ("a", "b", "c", "d"):
+                self._create(func)
+            return self.Manager.kill("dummy.*")
+        state, msg = self._run(scenario)
+        self.assertTrue(state)
+        self.assertEqual(self.Manager.WAITING, [])
+        self.assertEqual(msg, "Kill: dummy.c|queued, dummy.d|queued, dummy.a|True, dummy.b|True")
+        # Killed running tasks did not admit the dropped ones
+        self.assertFalse(self.TaskBase.is_busy("dummy.c"))
+        self.assertEqual(self.TaskBase.ACTIVE, 0)
+
+    def test_shed_loop_policy(self):
+        self.Manager.SHED = "loop"
+        def scenario():
+            self._create("a", loop=False)                       # one-shot (sleeping)
+            self._create("b", loop=True, prio=self.TaskBase.IRQ)
+            queued = self._create("c")                          # USER can not shed IRQ loop
+            shed = self._create("e", prio=self.TaskBase.IRQ)    # IRQ sheds same priority loop
+            return queued, shed
+        queued, shed = self._run(scenario)
+        self.assertEqual(queued, {"dummy.c": "Queued"})
+        self.assertEqual(shed, {"dummy.e": "Starting"})
+        self.assertTrue(self.TaskBase.is_busy("dummy.e"))
+        self.assertFalse(self.TaskBase.is_busy("dummy.b"))
+        self.assertTrue(self.TaskBase.is_busy("dummy.a"))       # one-shot task is never shed
+        self.assertEqual([w[0][1] for w in self.Manager.WAITING], ["c"])
+
+    def test_shed_prio_policy(self):
+        self.Manager.SHED = "prio"
+        def scenario():
+            self._create("a", loop=False)
+            self._create("b", loop=True)
+            queued = self._create("c")                          # same priority: no shed
+            shed = self._create("i1", loop=False, prio=self.TaskBase.IRQ)
+            return queued, shed
+        queued, shed = self._run(scenario)
+        self.assertEqual(queued, {"dummy.c": "Queued"})
+        self.assertEqual(shed, {"dummy.i1": "Starting"})
+        # Looped lower priority task is shed first, one-shot keeps running
+        self.assertFalse(self.TaskBase.is_busy("dummy.b"))
+        self.assertTrue(self.TaskBase.is_busy("dummy.a"))
+        self.assertEqual(self.TaskBase.ACTIVE, 2)
+
+
+class TestTaskProfiler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tasks = _load_tasks()
+
+    def setUp(self):
+        self.tasks.TaskBase.TASKS.clear()
+
+    def tearDown(self):
+        for task in self.tasks.TaskBase.TASKS.values():
+            task.done.set()
+
+    @staticmethod
+    def _busy(ms):
+        end = time.perf_counter() + ms / 1000
+        while time.perf_counter() < end:
+            pass
+
+    def _run(self, coro, tag):
+        async def _main():
+            self.tasks.NativeTask().create(callback=coro, tag=tag)
+            await asyncio.gather(self.tasks.TaskBase.TASKS[tag].task, return_exceptions=True)
+            return self.tasks.TaskBase.TASKS[tag].stats
+        return asyncio.run(_main())
+
+    def test_profiled_coroutine_counters(self):
+        async def job():
+            for ms in (2, 10, 2):
+                self._busy(ms)
+                await asyncio.sleep(0)
+            return "done"
+
+        wakeups, total_us, max_us, err = self._run(job(), "prof.job")
+        self.assertEqual(wakeups, 4)                # 3 yields + completion
+        self.assertGreaterEqual(total_us, 14_000)
+        self.assertGreaterEqual(max_us, 10_000)
+        self.assertLess(max_us, total_us)
+        self.assertEqual(err, "")
+        stats = self.tasks.Manager.task_stats(json=True)["prof.job"]
+        self.assertEqual((stats["wakeups"], stats["max_ms"]), (4, max_us // 1000))
+
+    def test_profiled_coroutine_error(self):
+        async def job():
+            await asyncio.sleep(0)
+            raise ValueError("sensor timeout")
+
+        wakeups, _, _, err = self._run(job(), "prof.err")
+        self.assertEqual((wakeups, err), (2, "sensor timeout"))
+        self.assertIn("prof.err  [ERR] sensor timeout", self.tasks.Manager.task_stats())
+
+
+class TestLMParams(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tasks = _load_tasks()
+        _load_dummy_lm()
+
+    def test_positional_values(self):
+        self.assertEqual(self.tasks._lm_params([]), ([], {}))
+        self.assertEqual(self.tasks._lm_params(["1", "-2", "2.5", "True", "False", "None", "[1,2]", "(3,4)"]),
+                         ([1, -2, 2.5, True, False, None, [1, 2], (3, 4)], {}))
+
+    def test_keyword_values(self):
+        self.assertEqual(self.tasks._lm_params(["10", "br=50", "speed=0.5", "color=(1,2,3)", "on=True"]),
+                         ([10], {"br": 50, "speed": 0.5, "color": (1, 2, 3), "on": True}))
+
+    def test_quoted_values(self):
+        # Shell splits on spaces: quoted values are joined back into one parameter
+        self.assertEqual(self.tasks._lm_params(['"hello', 'world"', "'x'", 'text="a', 'b"']),
+                         (["hello world", "x"], {"text": "a b"}))
+        # Separator inside quotes is not a keyword, escaped quotes fall back to the literal evaluation
+        self.assertEqual(self.tasks._lm_params(['"a=b"', 'msg="say', '\\"hi\\""']),
+                         (["a=b"], {"msg": 'say "hi"'}))
+        self.assertEqual(self.tasks._lm_value('"1"'), "1")
+        self.assertEqual(self.tasks._lm_value("''"), "")
+
+    def test_malformed_params(self):
+        self.assertRaises(SyntaxError, self.tasks._lm_params, ['"unterminated'])
+        self.assertRaises(NameError, self.tasks._lm_params, ["bare_word"])
+        self.assertRaises(SyntaxError, self.tasks._lm_params, ["x=="])
+        # Executor reports parsing errors without calling (or unloading) the module
+        state, out = self.tasks._exec_lm_core(["dummy", "a", "[1,", "2]"])
+        self.assertFalse(state)
+        self.assertTrue(out.startswith("Core error: LM_dummy->a:"))
+        self.assertIn("LM_dummy", sys.modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
+import asyncio
+import contextlib
 import importlib.util
+import random
+import struct
 import sys
 import types
 import unittest
@@ -9,13 +13,49 @@ def setUpModule():
     print(f"== RUN {Path(__file__).name} ==")
 
 
-def _install_import_stubs(http_get_impl=None, cfg_store=None, log_store=None):
+class NativeTaskStub:
+    TASKS = {}
+
+    def __init__(self):
+        self.tag = None
+        self.out = ""
+        self.done = False
+        self.coro = None
+        self.sleeps = []
+
+    @staticmethod
+    def is_busy(tag):
+        task = NativeTaskStub.TASKS.get(tag)
+        return task is not None and not task.done
+
+    def create(self, callback=None, tag=None):
+        self.tag, self.coro = tag, callback
+        NativeTaskStub.TASKS[tag] = self
+        return {tag: "Starting"}
+
+    async def feed(self, sleep_ms=1):
+        self.sleeps.append(sleep_ms)
+
+    def __enter__(self):
+        self.done = False
+        return self
+
+    def __exit__(self, *_):
+        self.done = True
+
+
+RESOLVED = []
+
+
+def _install_import_stubs(http_get_impl=None, http_aget_impl=None, cfg_store=None, log_store=None, rtc_store=None):
     cfg_store = {} if cfg_store is None else cfg_store
     log_store = [] if log_store is None else log_store
+    rtc_store = [] if rtc_store is None else rtc_store
 
     m = types.ModuleType("machine")
     class RTC:
-        def datetime(self, *_args, **_kwargs):
+        def datetime(self, *args, **_kwargs):
+            rtc_store.extend(args)
             return None
     m.RTC = RTC
     sys.modules["machine"] = m
@@ -35,17 +75,34 @@ def _install_import_stubs(http_get_impl=None, cfg_store=None, log_store=None):
     m.time = lambda: 1000
     m.mktime = lambda *_a, **_k: 0
     m.localtime = lambda *_a, **_k: (2026, 1, 1, 12, 0, 0, 3, 1)
+    m.ticks_ms = lambda: 0
+    m.ticks_diff = lambda a, b: a - b
     sys.modules["utime"] = m
 
+    m = types.ModuleType("urandom")
+    m.getrandbits = random.getrandbits
+    sys.modules["urandom"] = m
+
+    m = types.ModuleType("uasyncio")
+    m.sleep_ms = lambda ms: asyncio.sleep(ms / 1000)
+    sys.modules["uasyncio"] = m
+
+    m = types.ModuleType("Tasks")
+    m.NativeTask = NativeTaskStub
+    m.TaskBase = NativeTaskStub
+    sys.modules["Tasks"] = m
+
     m = types.ModuleType("Config")
     def cfgget(key):
-        defaults = {"utc": 60, "cron": True}
+        defaults = {"utc": 60, "cron": True, "lat": "n/a", "lon": "n/a"}
         return cfg_store.get(key, defaults.get(key))
     def cfgput(key, value, *_a, **_k):
         cfg_store[key] = value
         return True
     m.cfgget = cfgget
     m.cfgput = cfgput
+    m.cfgbatch = contextlib.nullcontext
+    m.cfgwatch = lambda *_a, **_k: True
     sys.modules["Config"] = m
 
     m = types.ModuleType("Debug")
@@ -62,12 +119,19 @@ def _install_import_stubs(http_get_impl=None, cfg_store=None, log_store=None):
 
     m = types.ModuleType("urequests")
     m.get = http_get_impl or (lambda *_a, **_k: (500, ""))
+    async def _aget(*args, **kwargs):
+        return (http_aget_impl or (lambda *_a, **_k: (500, {})))(*args, **kwargs)
+    m.aget = _aget
+    m.resolve = lambda url, force=False: RESOLVED.append((url, force)) or ("5.6.7.8", 80)
     sys.modules["urequests"] = m
-    return cfg_store, log_store
+    return cfg_store, log_store, rtc_store
 
 
-def _load_time_module(http_get_impl=None):
-    cfg_store, log_store = _install_import_stubs(http_get_impl=http_get_impl)
+def _load_time_module(http_get_impl=None, http_aget_impl=None, cfg=None):
+    NativeTaskStub.TASKS.clear()
+    RESOLVED.clear()
+    cfg_store, log_store, rtc_store = _install_import_stubs(http_get_impl=http_get_impl, http_aget_impl=http_aget_impl,
+                                                            cfg_store=cfg)
     here = Path(__file__).resolve()
     time_path = (here.parent.parent / "source" / "Time.py").resolve()
     module_name = "micros_time_under_test"
@@ -76,9 +140,60 @@ def _load_time_module(http_get_impl=None):
     mod = importlib.util.module_from_spec(spec)
     sys.modules[module_name] = mod
     spec.loader.exec_module(mod)
+    mod.RTC_STORE = rtc_store
     return mod, cfg_store, log_store
 
 
+def _pick(response, paths):
+    # urequests jsonify=(paths): {path: value} of the found json paths
+    picked = {}
+    for path in paths:
+        value = response
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            picked[path] = value
+    return picked
+
+
+def _fake_api(url, **kwargs):
+    assert "ip-api.com" in url
+    response = {"lat": 47.5, "lon": 19.0412, "timezone": "Europe/Budapest", "offset": 3600}
+    print(f"[time-api] request url={url}")
+    print(f"[time-api] response status=200 body={response!r}")
+    return 200, _pick(response, kwargs["jsonify"])
+
+
+def _minutes(hms):
+    return hms[0] * 60 + hms[1] + hms[2] / 60
+
+
+class _FakeUDP:
+    """Non-blocking UDP socket: answers after `wait` EAGAIN polls"""
+    def __init__(self, ntp_time, wait=2):
+        self.msg = bytes(40) + struct.pack("!I", ntp_time + 3155673600) + bytes(4)
+        self.wait = wait
+        self.closed = False
+
+    def __call__(self, *_a):
+        return self
+
+    def setblocking(self, flag):
+        assert flag is False
+
+    def sendto(self, data, addr):
+        assert data[0] == 0x1B and addr == ("1.2.3.4", 123)
+
+    def recv(self, _size):
+        if self.wait:
+            self.wait -= 1
+            raise BlockingIOError(11, "EAGAIN")
+        return self.msg
+
+    def close(self):
+        self.closed = True
+
+
 class TestTime(unittest.TestCase):
     def test_suntime_returns_cached_time_when_ip_api_response_is_invalid(self):
         mod, _cfg, logs = _load_time_module(http_get_impl=lambda *_a, **_k: (500, "bad"))
@@ -86,27 +201,161 @@ class TestTime(unittest.TestCase):
         self.assertEqual(mod.suntime(), mod.Sun.TIME)
         self.assertTrue(any("ip-api: invalid response" in msg for msg in logs))
 
-    def test_suntime_uses_https_sunrise_endpoint_and_updates_utc(self):
+    def test_suntime_sets_location_and_calculates_offline(self):
         calls = []
         def fake_get(url, **kwargs):
             calls.append((url, kwargs))
-            if "ip-api.com" in url:
-                response = {"lat": 47.5, "lon": 19.0412, "timezone": "Europe/Budapest", "offset": 3600}
-                print(f"[time-api] request url={url}")
-                print(f"[time-api] response status=200 body={response!r}")
-                return 200, response
-            response = {"results": {"sunrise": "2026-01-01T06:30:00+00:00",
-                                    "sunset": "2026-01-01T16:00:00+00:00"}}
-            print(f"[time-api] request url={url}")
-            print(f"[time-api] response status=200 body={response!r}")
-            return 200, response
+            return _fake_api(url, **kwargs)
         mod, cfg, logs = _load_time_module(http_get_impl=fake_get)
         sun = mod.suntime()
-        self.assertEqual(sun["sunrise"], (7, 30, 0))
-        self.assertEqual(sun["sunset"], (17, 0, 0))
+        self.assertEqual(len(calls), 1)         # ip-api only: no sun time api
+        self.assertEqual((cfg["utc"], cfg["lat"], cfg["lon"]), (60, 47.5, 19.0412))
+        self.assertEqual(list(sun), ["dawn", "sunrise", "sunset", "dusk"])
+        self.assertAlmostEqual(_minutes(sun["sunrise"]), 7 * 60 + 31, delta=2)
+        self.assertAlmostEqual(_minutes(sun["sunset"]), 16 * 60 + 3, delta=2)
+        self.assertEqual(mod.Sun.DAY, (2026, 1, 1))
+        self.assertEqual(logs, [])
+
+    def test_suntime_keeps_configured_location(self):
+        cfg = {"lat": "-33.8688", "lon": "151.2093"}
+        mod, cfg, _logs = _load_time_module(http_get_impl=_fake_api, cfg=cfg)
+        sun = mod.suntime()
+        self.assertEqual((cfg["lat"], cfg["lon"]), ("-33.8688", "151.2093"))
+        # Sydney 05:47 (AEDT: utc+11h) shown with the ip-api utc shift (+1h)
+        self.assertAlmostEqual(_minutes(sun["sunrise"]), 19 * 60 + 47, delta=2)
+
+
+class TestAsyncTimeSync(unittest.TestCase):
+
+    def test_ntp_task_non_blocking_udp(self):
+        mod, _cfg, logs = _load_time_module()
+        udp = _FakeUDP(ntp_time=800_000_000)
+        mod.socket = udp
+        mod.getaddrinfo = lambda *_a: [(0, 0, 0, "", ("1.2.3.4", 123))]
+        shifts = []
+        mod.localtime = lambda *args: shifts.extend(args) or (2026, 1, 1, 12, 0, 0, 3, 1)
+        self.assertEqual(mod.ntp_task(), {"time.ntp": "Starting"})
+        self.assertEqual(mod.ntp_task(), {"time.ntp": "Already running"})
+        task = NativeTaskStub.TASKS["time.ntp"]
+        self.assertTrue(asyncio.run(task.coro))
+        self.assertTrue(udp.closed)
+        self.assertEqual((mod.Sun.NTP, mod.Sun.BOOTIME), (1000, 1000))
+        self.assertEqual(mod.Sun.NTP_ADDR, ("1.2.3.4", 123))
+        self.assertEqual(shifts, [800_000_000 + 60 * 60])     # utc shift: 60 minutes
+        self.assertEqual(mod.RTC_STORE, [(2026, 1, 1, 4, 12, 0, 0, 0)])
+        self.assertTrue(task.out.startswith("ntptime: "))
+        self.assertEqual((task.sleeps, logs), ([], []))
+
+    def test_ntp_task_resolves_once_and_keeps_address(self):
+        mod, _cfg, logs = _load_time_module()
+        lookups = []
+        mod.getaddrinfo = lambda *_a: lookups.append(_a) or [(0, 0, 0, "", ("1.2.3.4", 123))]
+        udp = _FakeUDP(ntp_time=800_000_000, wait=10 ** 6)     # never answers: timeout
+        mod.socket = udp
+        clock = [0]
+        def ticks_ms():
+            clock[0] += 1000
+            return clock[0]
+        mod.ticks_ms = ticks_ms
+        mod.ntp_task()
+        task = NativeTaskStub.TASKS["time.ntp"]
+        self.assertFalse(asyncio.run(task.coro))
+        self.assertEqual(len(task.sleeps), mod.Sun.RETRY - 1)
+        self.assertEqual(len(lookups), 1)                       # no DNS in the retry loop
+        self.assertEqual(mod.Sun.NTP_ADDR, ("1.2.3.4", 123))   # last good address kept
+        self.assertIn("time.ntp", mod.Sun.REFRESH)
+        self.assertTrue(logs[-1].startswith("[ERR] ntptime error: timeout"))
+        # Next run: refresh address once, then sync from cache
+        udp.wait = 0
+        mod.ntp_task()
+        self.assertTrue(asyncio.run(NativeTaskStub.TASKS["time.ntp"].coro))
+        self.assertEqual(len(lookups), 2)
+        self.assertNotIn("time.ntp", mod.Sun.REFRESH)
+
+    def test_ntp_task_resolve_error(self):
+        mod, _cfg, logs = _load_time_module()
+        def getaddrinfo(*_a):
+            raise OSError(-2)
+        mod.getaddrinfo = getaddrinfo
+        mod.ntp_task()
+        task = NativeTaskStub.TASKS["time.ntp"]
+        self.assertFalse(asyncio.run(task.coro))
+        self.assertEqual(task.sleeps, [])
+        self.assertTrue(logs[-1].startswith("[ERR] ntptime resolve error"))
+
+    def test_suntime_task_jittered_backoff(self):
+        calls = []
+        def fake_aget(url, **kwargs):
+            calls.append(url)
+            if len(calls) <= 2:
+                return 500, {}
+            return _fake_api(url, **kwargs)
+        mod, cfg, logs = _load_time_module(http_aget_impl=fake_aget)
+        mod.suntime_task()
+        task = NativeTaskStub.TASKS["time.sun"]
+        self.assertTrue(asyncio.run(task.coro))
+        self.assertEqual(len(task.sleeps), 2)
+        self.assertTrue(2000 <= task.sleeps[0] < 3024)
+        self.assertTrue(4000 <= task.sleeps[1] < 5024)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(RESOLVED, [(mod._IP_API, False)])     # once, outside of the retry loop
+        self.assertAlmostEqual(_minutes(mod.Sun.TIME["sunrise"]), 7 * 60 + 31, delta=2)
         self.assertEqual(cfg["utc"], 60)
-        self.assertTrue(any(url.startswith("https://api.sunrise-sunset.org/") for url, _ in calls))
-        self.assertFalse(any("sunrise-api" in msg for msg in logs))
+        self.assertEqual(logs, [])
+
+    def test_sync_task_gives_up(self):
+        mod, _cfg, logs = _load_time_module()
+        cached = {"sunrise": (6, 0, 0), "sunset": (18, 0, 0)}
+        mod.Sun.TIME = dict(cached)
+        mod.suntime_task()
+        task = NativeTaskStub.TASKS["time.sun"]
+        self.assertFalse(asyncio.run(task.coro))
+        self.assertEqual(len(task.sleeps), mod.Sun.RETRY - 1)
+        self.assertEqual(mod.Sun.TIME, cached)
+        self.assertTrue(logs[-1].startswith("[ERR] suntime error: invalid response"))
+        self.assertFalse(NativeTaskStub.is_busy("time.sun"))
+
+
+class TestSunCalc(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mod, _cfg, _logs = _load_time_module()
+
+    def _assert_times(self, sun, expected):
+        self.assertEqual(list(sun), list(expected))
+        for key, (h, m) in expected.items():
+            self.assertAlmostEqual(_minutes(sun[key]), h * 60 + m, delta=2, msg=key)
+
+    def test_reference_locations(self):
+        # London (BST), Sydney (AEDT), Quito (equator, west)
+        london = self.mod.sun_calc((2024, 6, 21), 51.5074, -0.1278, utc=60)
+        self._assert_times(london, {"dawn": (3, 56), "sunrise": (4, 43), "sunset": (21, 21), "dusk": (22, 8)})
+        sydney = self.mod.sun_calc((2024, 12, 21), -33.8688, 151.2093, utc=660)
+        self._assert_times(sydney, {"dawn": (5, 12), "sunrise": (5, 41), "sunset": (20, 5), "dusk": (20, 35)})
+        quito = self.mod.sun_calc((2024, 3, 20), -0.1807, -78.4678, utc=-300)
+        self._assert_times(quito, {"dawn": (5, 57), "sunrise": (6, 17), "sunset": (18, 24), "dusk": (18, 45)})
+
+    def test_polar_day_and_night(self):
+        self.assertEqual(self.mod.sun_calc((2024, 6, 21), 69.6492, 18.9553, utc=120), {})
+        winter = self.mod.sun_calc((2024, 12, 21), 69.6492, 18.9553, utc=60)
+        self.assertEqual(list(winter), ["dawn", "dusk"])
+
+    def test_sun_table_days(self):
+        mod = self.mod
+        store = sys.modules["Config"]
+        cfg = {"lat": "47.4979", "lon": "19.0402"}
+        mod.cfgget = lambda key: cfg.get(key, store.cfgget(key))
+        mod.localtime = lambda sec=1000: (2026, 1, 1 + (sec - 1000) // 86400, 12, 0, 0, 3, 1)
+        today = mod.sun_update()
+        self.assertEqual(mod.Sun.DAY, (2026, 1, 1))
+        self.assertIs(mod.sun_table(), today)
+        later = mod.sun_table(day=30)
+        self.assertEqual(later, mod.sun_calc((2026, 1, 31), 47.4979, 19.0402))
+        self.assertGreater(_minutes(later["sunset"]), _minutes(today["sunset"]) + 30)
+        # Without location: cached table for every day
+        cfg["lat"] = "n/a"
+        self.assertIs(mod.sun_table(day=3), mod.Sun.TIME)
 
 
 if __name__ == "__main__":
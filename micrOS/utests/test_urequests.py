@@ -1,10 +1,16 @@
 import asyncio
 import importlib.util
+import json
+import os
 import socket
 import ssl
 import sys
+import tempfile
+import time
+import tracemalloc
 import types
 import unittest
+from unittest import mock
 from pathlib import Path
 
 
@@ -32,6 +38,16 @@ def _install_import_stubs():
     m.syslog = lambda *_a, **_k: None
     sys.modules["Debug"] = m
 
+    m = types.ModuleType("uos")
+    m.remove = os.remove
+    m.rename = os.rename
+    sys.modules["uos"] = m
+
+    m = types.ModuleType("utime")
+    m.ticks_ms = lambda: int(time.monotonic() * 1000)
+    m.ticks_diff = lambda a, b: a - b
+    sys.modules["utime"] = m
+
 
 def _load_urequests_module():
     here = Path(__file__).resolve()
@@ -293,5 +309,358 @@ class TestURequests(unittest.TestCase):
         self.assertIn("ECONNABORTED", body)
 
 
+CHUNKED_RAW = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+               b"5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+
+
+def _split(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestStreamedBody(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.urequests = _load_urequests_module()
+
+    def _stream(self, chunks, sock_size=4):
+        fake_socket = _FakeSocket(chunks)
+        original_socket = self.urequests.socket
+        original_host_to_addr = self.urequests._host_to_addr
+        try:
+            self.urequests.socket = lambda: fake_socket
+            self.urequests._host_to_addr = lambda *_a, **_k: ("127.0.0.1", 80)
+            return self.urequests.stream("GET", "http://example.com/file", sock_size=sock_size), fake_socket
+        finally:
+            self.urequests.socket = original_socket
+            self.urequests._host_to_addr = original_host_to_addr
+
+    def test_dechunk_any_split(self):
+        for size in range(1, 20):
+            status, body = self.urequests._read_response(lambda _n, c=_split(CHUNKED_RAW, size): c.pop(0) if c else b"", size)
+            self.assertEqual((status, body), (200, b"hello world"), size)
+
+    def test_content_length_single_buffer(self):
+        raw = b"HTTP/1.1 200 OK\r\nContent-Length: 11\r\n\r\nhello world<next response>"
+        chunks = _split(raw, 7)
+        status, body = self.urequests._read_response(lambda _n: chunks.pop(0) if chunks else b"", 7, raw=True)
+        self.assertEqual((status, body), (200, bytearray(b"hello world")))
+        self.assertEqual(b"".join(chunks), b"response>")     # body end: no over read after the body chunk
+
+    def test_readinto_and_iter_content(self):
+        response, sock = self._stream(_split(CHUNKED_RAW, 3))
+        with response:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers[b"Transfer-Encoding"], b"chunked")
+            buf = bytearray(4)
+            self.assertEqual(response.readinto(buf), 4)
+            self.assertEqual(buf, b"hell")
+            self.assertEqual(b"".join(response.iter_content(3)), b"o world")
+            self.assertEqual(response.readinto(buf), 0)
+        self.assertTrue(sock.closed)
+
+    def test_read_until_close(self):
+        response, _ = self._stream([b"HTTP/1.1 200 OK\r\n\r\nabc", b"def", b""])
+        with response:
+            self.assertEqual(list(response.iter_content(4)), [b"abcd", b"ef"])
+
+    def test_download_to_file(self):
+        payload = bytes(range(256)) * 20
+        raw = b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(payload) + payload
+        fake_socket = _FakeSocket(_split(raw, 100))
+        original_socket = self.urequests.socket
+        original_host_to_addr = self.urequests._host_to_addr
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pkg.mpy")
+            try:
+                self.urequests.socket = lambda: fake_socket
+                self.urequests._host_to_addr = lambda *_a, **_k: ("127.0.0.1", 80)
+                self.assertEqual(self.urequests.download("http://example.com/pkg.mpy", path, sock_size=64),
+                                 (200, len(payload)))
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), payload)
+                fake_socket = _FakeSocket([b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n"])
+                self.assertEqual(self.urequests.download("http://example.com/x", path + ".2"), (404, 0))
+                self.assertFalse(os.path.exists(path + ".2"))
+            finally:
+                self.urequests.socket = original_socket
+                self.urequests._host_to_addr = original_host_to_addr
+        self.assertTrue(fake_socket.closed)
+
+    def test_truncated_download_keeps_target(self):
+        payload = b"x" * 500
+        cut = b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(payload) + payload[:300]
+        chunked_cut = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n"
+        original_socket = self.urequests.socket
+        original_host_to_addr = self.urequests._host_to_addr
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pkg.mpy")
+            with open(path, "wb") as f:
+                f.write(b"old version")
+            try:
+                self.urequests._host_to_addr = lambda *_a, **_k: ("127.0.0.1", 80)
+                for raw in (cut, chunked_cut):
+                    # Peer closes before the end of the body
+                    self.urequests.socket = lambda r=raw: _FakeSocket(_split(r, 100))
+                    self.assertEqual(self.urequests.download("http://example.com/pkg.mpy", path), (500, 0))
+                    with open(path, "rb") as f:
+                        self.assertEqual(f.read(), b"old version")
+                    self.assertEqual(os.listdir(tmp), ["pkg.mpy"])
+                # Async download: same checks
+                reader = _FakeReader(_split(cut, 100))
+                async def _open_connection(*_a, **_k):
+                    return reader, _FakeWriter()
+                with mock.patch.object(self.urequests.asyncio, "open_connection", _open_connection):
+                    self.assertEqual(asyncio.run(self.urequests.adownload("http://example.com/pkg.mpy", path)),
+                                     (500, 0))
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), b"old version")
+                self.assertEqual(os.listdir(tmp), ["pkg.mpy"])
+            finally:
+                self.urequests.socket = original_socket
+                self.urequests._host_to_addr = original_host_to_addr
+
+    def test_astream_chunks(self):
+        reader = _FakeReader(_split(CHUNKED_RAW, 5))
+        writer = _FakeWriter()
+        original_open = self.urequests.asyncio.open_connection
+        original_host_to_addr = self.urequests._host_to_addr
+        async def _main():
+            response = await self.urequests.astream("GET", "http://example.com/chunked", sock_size=4)
+            chunks = [bytes(chunk) async for chunk in response]
+            await response.close()
+            return response.status_code, chunks
+        try:
+            async def _open_connection(*_a, **_k):
+                return reader, writer
+            self.urequests.asyncio.open_connection = _open_connection
+            self.urequests._host_to_addr = lambda *_a, **_k: ("127.0.0.1", 80)
+            status, chunks = asyncio.run(_main())
+        finally:
+            self.urequests.asyncio.open_connection = original_open
+            self.urequests._host_to_addr = original_host_to_addr
+        self.assertEqual(status, 200)
+        self.assertEqual(b"".join(chunks), b"hello world")
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        self.assertTrue(writer.closed)
+
+
+UPDATES = {"ok": True, "result": [
+    {"update_id": 1000 + i, "message": {
+        "message_id": i, "date": 1700000000 + i, "text": f"msg \"{i}\" \u00e9\u2713 [x] {{y}}",
+        "chat": {"id": 4242, "first_name": "Ann", "last_name": "Smith", "type": "private"},
+        "entities": [{"offset": 0, "length": 4, "type": "bot_command"}] * 3}}
+    for i in range(40)]}
+MSG_PICKS = ("ok", "result.*.message.message_id", "result.*.message.text", "result.*.message.chat.id",
+             "result.*.message.chat.username", "result.0.update_id", "result.*.message.chat")
+
+
+class TestJsonPick(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.urequests = _load_urequests_module()
+        cls.raw = json.dumps(UPDATES, ensure_ascii=False).encode()
+
+    def _pick(self, raw, paths, size, **kwargs):
+        picker = self.urequests.JsonPick(paths, **kwargs)
+        for i in range(0, len(raw), size):
+            picker.feed(memoryview(raw)[i:i + size])
+        return picker.result
+
+    def test_paths_any_chunking(self):
+        expected = {"ok": True, "result.*.message.message_id": 39, "result.*.message.text": UPDATES["result"][-1]["message"]["text"],
+                    "result.*.message.chat.id": 4242, "result.0.update_id": 1000,
+                    "result.*.message.chat": UPDATES["result"][-1]["message"]["chat"]}
+        for size in (1, 2, 3, 5, 16, 128, len(self.raw)):
+            self.assertEqual(self._pick(self.raw, MSG_PICKS, size), expected, size)
+
+    def test_scalars_and_nested(self):
+        raw = b'{"a": [1, -2.5e3, true, false, null, [], {}], "b": {"c": {"d": "x\\"y"}}, "e": "\\u00e9"}'
+        result = self._pick(raw, ("a.1", "a.2", "a.4", "a.5", "a.6", "b.c.d", "b", "e", "missing"), 1)
+        self.assertEqual(result, {"a.1": -2500.0, "a.2": True, "a.4": None, "a.5": [], "a.6": {},
+                                  "b.c.d": 'x"y', "b": {"c": {"d": 'x"y'}}, "e": "\u00e9"})
+
+    def test_max_value(self):
+        raw = json.dumps({"small": 1, "big": "x" * 300}).encode()
+        self.assertEqual(self._pick(raw, ("small",), 7, max_value=64), {"small": 1})    # skipped: not stored
+        with self.assertRaises(ValueError):
+            self._pick(raw, ("big",), 7, max_value=64)
+
+    def test_request_picks(self):
+        body = self.raw
+        chunks = _split(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body, 64)
+        fake_socket = _FakeSocket(chunks)
+        original_socket = self.urequests.socket
+        original_host_to_addr = self.urequests._host_to_addr
+        try:
+            self.urequests.socket = lambda: fake_socket
+            self.urequests._host_to_addr = lambda *_a, **_k: ("127.0.0.1", 80)
+            status, picked = self.urequests.get("http://example.com/getUpdates", jsonify=("ok", "result.*.message.text"))
+        finally:
+            self.urequests.socket = original_socket
+            self.urequests._host_to_addr = original_host_to_addr
+        self.assertEqual(status, 200)
+        self.assertEqual(picked, {"ok": True, "result.*.message.text": UPDATES["result"][-1]["message"]["text"]})
+
+
+class TestJsonPickBenchmark(unittest.TestCase):
+    """
+    Peak heap: JsonPick over streamed body chunks vs loads of the collected body
+    (simulator / CPython allocator - relative comparison)
+    """
+    CHUNK = 256
+
+    @classmethod
+    def setUpClass(cls):
+        cls.urequests = _load_urequests_module()
+        cls.raw = json.dumps(UPDATES).encode()
+
+    def _peak(self, func):
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_peak_heap_vs_loads(self):
+        raw, chunk = self.raw, self.CHUNK
+
+        def _loads():
+            body = bytearray()
+            for i in range(0, len(raw), chunk):
+                body.extend(raw[i:i + chunk])
+            data = json.loads(body)
+            return data["result"][-1]["message"]["text"]
+
+        def _pick():
+            picker = self.urequests.JsonPick(("ok", "result.*.message.text", "result.*.message.chat.id"))
+            for i in range(0, len(raw), chunk):
+                picker.feed(raw[i:i + chunk])
+            return picker.result["result.*.message.text"]
+
+        loads_peak, pick_peak = self._peak(_loads), self._peak(_pick)
+        print(f"[bench] {len(raw)} byte json - peak heap: loads {loads_peak} B, JsonPick {pick_peak} B")
+        self.assertLess(pick_peak * 4, loads_peak)
+
+
+class _KeepAliveServer:
+    """
+    Local HTTP/1.1 server: counts connections, closes after max_requests per connection
+    """
+    def __init__(self, max_requests=100, close_header=False, partial=False):
+        self.connections = 0
+        self.requests = 0
+        self.max_requests = max_requests
+        self.close_header = close_header
+        self.partial = partial          # last request of a connection: status line only, then close
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        served = 0
+        while served < self.max_requests:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                break
+            served += 1
+            self.requests += 1
+            body = f'{{"n": {self.requests}}}'.encode()
+            if self.partial and served == self.max_requests:
+                writer.write(b"HTTP/1.1 200 OK\r\n")
+                await writer.drain()
+                break
+            conn = b"Connection: close\r\n" if self.close_header else b""
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: " + str(len(body)).encode() + b"\r\n" + conn + b"\r\n"
+                         + (b"" if head.startswith(b"HEAD ") else body))
+            await writer.drain()
+        writer.close()
+
+
+class TestASession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.urequests = _load_urequests_module()
+
+    def _run(self, server, calls, methods=None, **session_kwargs):
+        async def _main():
+            srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            port = srv.sockets[0].getsockname()[1]
+            session = self.urequests.ASession(**session_kwargs)
+            results = []
+            for i, wait in enumerate(calls):
+                await asyncio.sleep(wait)
+                method = methods[i] if methods else "GET"
+                results.append(await asyncio.wait_for(
+                    session.request(method, f"http://127.0.0.1:{port}/api", jsonify=True), 2))
+            pooled = session.status()
+            await session.close()
+            srv.close()
+            return results, pooled
+        return asyncio.run(_main())
+
+    def test_build_request_keep_alive(self):
+        req = self.urequests._build_request("example.com", "GET", "api", {}, keep_alive=True)
+        self.assertIn(b"Connection: keep-alive\r\n", req)
+        self.assertNotIn(b"Connection: close", req)
+
+    def test_connection_reuse(self):
+        server = _KeepAliveServer()
+        results, pooled = self._run(server, [0, 0, 0, 0])
+        self.assertEqual(results, [(200, {"n": i}) for i in range(1, 5)])
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(list(pooled.values()), [1])
+
+    def test_reconnect_when_server_closes(self):
+        server = _KeepAliveServer(max_requests=2)
+        results, _ = self._run(server, [0, 0, 0.05, 0, 0.05])
+        self.assertEqual(results, [(200, {"n": i}) for i in range(1, 6)])
+        self.assertEqual(server.connections, 3)
+
+    def test_head_request_keep_alive(self):
+        server = _KeepAliveServer()
+        results, pooled = self._run(server, [0, 0, 0], methods=["HEAD", "HEAD", "GET"])
+        # HEAD: no body bytes awaited (Content-Length of the entity), connection reused
+        self.assertEqual([r[0] for r in results], [200, 200, 200])
+        self.assertEqual(results[2], (200, {"n": 3}))
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(list(pooled.values()), [1])
+
+    def test_no_resend_of_non_idempotent_request(self):
+        server = _KeepAliveServer(max_requests=1)
+        results, _ = self._run(server, [0, 0.05], methods=["GET", "POST"])
+        self.assertEqual(results[0], (200, {"n": 1}))
+        self.assertEqual(results[1][0], 500)
+        self.assertEqual((server.connections, server.requests), (1, 1))
+
+    def test_no_retry_after_partial_response(self):
+        server = _KeepAliveServer(max_requests=2, partial=True)
+        results, _ = self._run(server, [0, 0])
+        self.assertEqual(results[0], (200, {"n": 1}))
+        self.assertEqual(results[1][0], 500)
+        self.assertEqual(server.connections, 1)
+
+    def test_idle_timeout_and_connection_close(self):
+        server = _KeepAliveServer()
+        self._run(server, [0, 0.15, 0], idle_ms=100)
+        self.assertEqual(server.connections, 2)
+        server = _KeepAliveServer(close_header=True)
+        results, pooled = self._run(server, [0, 0])
+        self.assertEqual(server.connections, 2)
+        self.assertEqual(pooled, {})
+
+    def test_max_per_host(self):
+        server = _KeepAliveServer()
+        async def _main():
+            srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            url = f"http://127.0.0.1:{srv.sockets[0].getsockname()[1]}/api"
+            session = self.urequests.ASession(max_per_host=2)
+            await asyncio.gather(*(session.get(url) for _ in range(4)))
+            pooled = session.status()
+            await session.close()
+            srv.close()
+            return pooled
+        self.assertEqual(list(asyncio.run(_main()).values()), [2])
+        self.assertEqual(server.connections, 4)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
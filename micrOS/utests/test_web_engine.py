@@ -81,6 +81,7 @@ def _install_import_stubs():
         pass
     m.OSPath = OSPathStub
     m.path_join = lambda *_a: os.path.join(*_a)
+    m.list_fs = lambda *_a, **_k: []
     sys.modules["Files"] = m
 
     m = types.ModuleType("Config")
@@ -140,7 +141,8 @@ class MockOpen:
         #return self.builtin_open(*args, **kwargs)
 
 
-def fake_stat(size=1024):
+def fake_stat(size=1024, mtime=None):
+    mtime = int(time.time()) if mtime is None else mtime
     return os.stat_result((
         0o100644,        # st_mode (regular file, 644 perms)
         12345678,        # st_ino
@@ -150,7 +152,7 @@ def fake_stat(size=1024):
         1000,            # st_gid
         size,            # st_size
         int(time.time()),# st_atime
-        int(time.time()),# st_mtime
+        mtime,           # st_mtime
         int(time.time()),# st_ctime
     ))
 
@@ -387,6 +389,114 @@ class TestWebStateMachine(unittest.TestCase):
             b"Upload content", first=True, last=True
         )
 
+    def _run_until_response(self):
+        while self.engine.engine_state is not None:
+            state = self.engine.engine_state
+            self.engine.engine_state(self.rx, self.tx)
+            if self.engine.engine_state is state:
+                break
+
+    def test_keep_alive_pipelined_requests(self):
+        callback = mock.Mock(return_value=("text/plain", "ok"))
+        self.engine.register("api/a", callback)
+        self.engine.register("api/b", callback)
+        self.engine._recv_buf = self.rx
+        self.rx.write(b"GET /api/a HTTP/1.1\r\nHost: x\r\n\r\nGET /api/b HTTP/1.1\r\nConnection: close\r\n\r\n")
+
+        self._run_until_response()
+        response = bytes(self.tx.peek()).lower()
+        self.assertIn(b"connection: keep-alive", response)
+        self.assertIn(b"content-length: 2", response)
+        self.assertTrue(self.engine.keep_alive)
+        self.tx.consume()
+
+        self.engine.next_request()
+        self.assertFalse(self.engine._idle)
+        self._run_until_response()
+        self.assertEqual(self.engine.url, b"api/b")
+        self.assertIn(b"connection: close", bytes(self.tx.peek()).lower())
+        self.assertFalse(self.engine.keep_alive)
+        self.assertEqual(callback.call_count, 2)
+
+    def test_keep_alive_empty_and_stream_responses(self):
+        self.engine.keep_alive = True
+        self.engine.method = b"GET"
+        self.engine.on_missing_resource(self.tx)
+        self.assertIn(b"content-length: 0", bytes(self.tx.peek()).lower())
+        self.assertTrue(self.engine.keep_alive)
+        self.tx.consume()
+        # Unknown body length (stream): close
+        self.engine.terminate(200, b"multipart/x-mixed-replace")
+        self.engine._write_response_head(self.tx)
+        self.assertIn(b"connection: close", bytes(self.tx.peek()).lower())
+        self.assertFalse(self.engine.keep_alive)
+
+    def test_json_response_chunked_stream(self):
+        def history():
+            for i in range(50):
+                yield {"t": i, "value": i * 1.5, "unit": "celsius"}
+        body = {"state": True, "result": history()}
+        tx = self.buffer_module.SlidingBuffer(bytearray(256))
+        self.engine.terminate(200, b"application/json")
+        handler = self.engine._generate_response(tx, body)
+        self.assertTrue(callable(handler))
+        stream = bytes(tx.peek())
+        tx.consume()
+        for is_finished in handler(tx):
+            stream += bytes(tx.peek())
+            tx.consume()
+            if is_finished:
+                break
+        head, chunked = stream.split(b"\r\n\r\n", 1)
+        self.assertIn(b"transfer-encoding: chunked", head.lower())
+        decoded = b""
+        while True:
+            size_line, chunked = chunked.split(b"\r\n", 1)
+            size = int(size_line, 16)
+            if size == 0:
+                break
+            decoded += chunked[:size]
+            self.assertEqual(chunked[size:size + 2], b"\r\n")
+            chunked = chunked[size + 2:]
+        result = self.web_module.loads(decoded.decode())
+        self.assertEqual(len(result["result"]), 50)
+        self.assertEqual(result["result"][49], {"t": 49, "value": 73.5, "unit": "celsius"})
+
+    def test_json_response_small_body_content_length(self):
+        self.engine.terminate(200, b"application/json")
+        self.assertIsNone(self.engine._generate_response(self.tx, {"a": [1, 2, (3, None)], "b": "x"}))
+        head, body = bytes(self.tx.peek()).split(b"\r\n\r\n", 1)
+        self.assertIn(b"content-length: %d" % len(body), head)
+        self.assertEqual(self.web_module.loads(body), {"a": [1, 2, [3, None]], "b": "x"})
+
+    def test_json_response_non_serializable_value(self):
+        class Sensor:
+            def __str__(self):
+                return "Sensor(22)"
+        self.engine.terminate(200, b"application/json")
+        self.assertIsNone(self.engine._generate_response(self.tx, {"result": [Sensor(), b"raw"], "state": True}))
+        head, body = bytes(self.tx.peek()).split(b"\r\n\r\n", 1)
+        self.assertIn(b"200", head)
+        self.assertEqual(self.web_module.loads(body), {"result": ["Sensor(22)", "b'raw'"], "state": True})
+
+    def test_json_iter_keys_match_dumps(self):
+        obj = {True: 1, None: [2], 3: "x", 1.5: False, "k": {False: None}}
+        self.assertEqual(self.web_module.loads(''.join(self.web_module._json_iter(obj))),
+                         self.web_module.loads(self.web_module.dumps(obj)))
+
+    def test_json_iter_container_mutated_between_yields(self):
+        for obj, expected in (({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 2, "c": 3}), ([1, 2, 3], [1, 2, 3])):
+            fragments = []
+            for fragment in self.web_module._json_iter(obj):
+                fragments.append(fragment)
+                # LM task updates its state while the response is streamed
+                if isinstance(obj, dict):
+                    obj.pop("b", None)
+                    obj[f"k{len(fragments)}"] = 0
+                else:
+                    obj.append(len(fragments))
+            self.assertEqual(self.web_module.loads(''.join(fragments)), expected)
+
     def test_parse_rest_cmd_preserves_quoted_values(self):
         self.assertEqual(
             self.web_module._parse_rest_cmd('system/clock/"my value"/foo-bar'),
@@ -426,6 +536,101 @@ class TestWebStateMachine(unittest.TestCase):
         self.assertNotIn(b'<script src="/auth.js"></script>', response_head)
         self.assertEqual(response_handler.getvalue(), body)
 
+    @staticmethod
+    def _stat_files(files):
+        """stat stand-in: {path: (size, mtime)}, missing path: OSError"""
+        def _stat(path):
+            if path not in files:
+                raise OSError(2)
+            return fake_stat(*files[path])
+        return _stat
+
+    def test_static_index_etag_and_gzip(self):
+        self.addCleanup(self.web_module.WebEngine.STATIC.clear)
+        self.web_module.WebEngine.STATIC["app.js"] = ("/web/app.js", 100, b'"64-1"', b"application/javascript",
+                                                      (40, b'"28-1-gz"'))
+        files = self._stat_files({"/web/app.js": (100, 1), "/web/app.js.gz": (40, 1)})
+        opened = []
+
+        def fake_open(path, mode="r", *_args, **_kwargs):
+            opened.append(path)
+            return io.BytesIO(b"x")
+
+        self.engine.headers = {"accept-encoding": "gzip, deflate"}
+        with mock.patch.object(self.web_module, "stat", files), \
+             mock.patch("builtins.open", fake_open):
+            self.engine._send_file_st(self.rx, self.tx, "app.js")
+        response = bytes(self.tx.peek()).lower()
+        self.assertEqual(opened, ["/web/app.js.gz"])
+        self.assertIn(b"content-encoding: gzip", response)
+        self.assertIn(b"content-length: 40", response)
+        self.assertIn(b'etag: "28-1-gz"', response)
+        self.tx.consume()
+
+        # Repeat fetch without gzip: 304 Not Modified, no body
+        self.engine.response_headers = {}
+        self.engine.headers = {"if-none-match": '"64-1"'}
+        with mock.patch.object(self.web_module, "stat", files):
+            self.assertIsNone(self.engine._send_file_st(self.rx, self.tx, "app.js"))
+        self.assertEqual(self.engine.status_code, 304)
+        self.assertNotIn(b"content-encoding", bytes(self.tx.peek()).lower())
+
+    def test_static_index_redeployed_resource(self):
+        self.addCleanup(self.web_module.WebEngine.STATIC.clear)
+        self.web_module.WebEngine.STATIC["app.js"] = ("/web/app.js", 100, b'"64-1"', b"application/javascript", None)
+
+        # Pacman redeploy: size/mtime changed -> entry rebuilt, new ETag served
+        with mock.patch.object(self.web_module, "stat", self._stat_files({"/web/app.js": (200, 2)})), \
+             mock.patch("builtins.open", lambda *_a, **_k: io.BytesIO(b"x")):
+            self.engine._send_file_st(self.rx, self.tx, "app.js")
+        response = bytes(self.tx.peek()).lower()
+        self.assertIn(b"content-length: 200", response)
+        self.assertIn(b'etag: "c8-2"', response)
+        self.assertEqual(self.web_module.WebEngine.STATIC["app.js"][1:3], (200, b'"c8-2"'))
+
+    def test_static_index_redeployed_gzip(self):
+        self.addCleanup(self.web_module.WebEngine.STATIC.clear)
+        self.web_module.WebEngine.STATIC["app.js"] = ("/web/app.js", 100, b'"64-1"', b"application/javascript",
+                                                      (40, b'"28-1-gz"'))
+        self.engine.headers = {"accept-encoding": "gzip", "if-none-match": '"28-1-gz"'}
+
+        # Only the .gz sibling was redeployed: new size and ETag (no stale 304)
+        files = self._stat_files({"/web/app.js": (100, 1), "/web/app.js.gz": (50, 3)})
+        with mock.patch.object(self.web_module, "stat", files), \
+             mock.patch("builtins.open", lambda *_a, **_k: io.BytesIO(b"x")):
+            self.assertIsNotNone(self.engine._send_file_st(self.rx, self.tx, "app.js"))
+        response = bytes(self.tx.peek()).lower()
+        self.assertEqual(self.engine.status_code, 200)
+        self.assertIn(b"content-length: 50", response)
+        self.assertIn(b'etag: "32-3-gz"', response)
+        self.tx.consume()
+
+        # .gz sibling removed: original file served
+        self.engine.response_headers = {}
+        files = self._stat_files({"/web/app.js": (100, 1)})
+        with mock.patch.object(self.web_module, "stat", files), \
+             mock.patch("builtins.open", lambda *_a, **_k: io.BytesIO(b"x")):
+            self.engine._send_file_st(self.rx, self.tx, "app.js")
+        response = bytes(self.tx.peek()).lower()
+        self.assertIn(b"content-length: 100", response)
+        self.assertNotIn(b"content-encoding", response)
+        self.assertIsNone(self.web_module.WebEngine.STATIC["app.js"][4])
+
+    def test_static_index_removed_resource(self):
+        self.addCleanup(self.web_module.WebEngine.STATIC.clear)
+        self.web_module.WebEngine.STATIC["app.js"] = ("/web/app.js", 100, b'"64-1"', b"application/javascript", None)
+
+        with mock.patch.object(self.web_module, "stat", side_effect=OSError(2)):
+            self.assertIsNone(self.engine._send_file_st(self.rx, self.tx, "app.js"))
+        self.assertEqual(self.engine.status_code, 404)
+        self.assertNotIn("app.js", self.web_module.WebEngine.STATIC)
+
+    def test_static_mount_not_found(self):
+        self.assertIsNone(self.engine._send_file_st(self.rx, self.tx, "$missing/page.html"))
+        response = bytes(self.tx.peek())
+        self.assertEqual(self.engine.status_code, 404)
+        self.assertTrue(response.endswith(b"Mount not found"))
+
     def test_mounted_html_streams_without_rewrite(self):
         body = b"<html><head></head><body>User data</body></html>"
         self.web_module.WebEngine.WEB_MOUNTS["$data"] = "/data"
@@ -595,5 +800,41 @@ class TestWebStateMachine(unittest.TestCase):
         )
 
 
+class TestWebStateMachineRingBuffer(TestWebStateMachine):
+    """
+    State machine tests over wrapped RingBuffer rx (default WebEngine receive pool wrapper)
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.rx = self.buffer_module.RingBuffer(bytearray(1024))
+        # Empty window close to the wrap point (requests are wrapped around)
+        self.rx._start = self.rx._end = 1000
+
+    def test_multipart_part_across_wrap_point(self):
+        self.engine.url = b"/api/test"
+        self.engine.method = b"POST"
+        self.engine.mp_boundary = b"test-boundary"
+        self.engine.mp_delimiter = b'--test-boundary\r\n'
+        self.engine.mp_closing_delimiter = b'--test-boundary--'
+        chunks = []
+        self.engine.register("/api/test", lambda h, body, first, last: chunks.append((bytes(body), first, last))
+                             or ("text/plain", "OK"), method="POST")
+
+        part_head = b"Content-Disposition:form-data;name=\"file\";filename=\"upload.txt\"\r\n\r\n"
+        body_part = part_head + b"Upload content\r\n--test-boundary--"
+        self.engine.headers["content-length"] = len(body_part)
+        self.engine.content_length_cnt = 0
+        # Part body is split by the wrap point: "Upload" | " content"
+        self.rx._start = self.rx._end = self.rx.capacity - len(part_head) - 6
+        self.rx.write(body_part)
+        self.engine.engine_state = self.engine._parse_boundary_st
+        with mock.patch.object(self.buffer_module.RingBuffer, "_compact", side_effect=AssertionError("re-arranged")):
+            self._run_until_response()
+
+        self.assertEqual(self.engine.status_code, 200)
+        self.assertEqual(chunks, [(b"Upload", True, False), (b" content", False, True)])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
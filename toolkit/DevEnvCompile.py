@@ -246,6 +246,7 @@ class Compile:
                 error_cnt += 1
         self.copy_other_resources_to_precompiled()
         self.optimize_precompiled_web_resources()
+        self.compress_precompiled_web_resources()
         self._save_precompiled_mpy_cross_version()
         # Evaluation summary
         if error_cnt != 0:
@@ -336,6 +337,40 @@ class Compile:
         self.console(f"WEB optimization summary: {optimized_cnt} file(s), saved {saved} bytes", state="ok")
         return True
 
+    def compress_precompiled_web_resources(self, min_ratio=0.9):
+        """
+        Create precompressed .gz siblings of text web resources in the precompiled workspace.
+        WebEngine serves them with Content-Encoding: gzip (when the client accepts gzip)
+        :param min_ratio: keep .gz only if it is smaller than min_ratio * original size
+        """
+        import gzip
+        web_path = os.path.join(self.precompiled_micrOS_dir_path, "web")
+        if not LocalMachine.FileHandler.path_is_exists(web_path)[0]:
+            self.console(f"SKIP web compression - missing path: {web_path}", state="warn")
+            return False
+
+        self.console("COMPRESS precompiled web resources...", state="ok")
+        compressed_cnt = 0
+        # Static index (WebEngine.STATIC) - web root resources only
+        for file_name in os.listdir(web_path):
+            file_path = os.path.join(web_path, file_name)
+            if os.path.splitext(file_name)[1].lower() not in (".js", ".css", ".html", ".json") or not os.path.isfile(file_path):
+                continue
+            with open(file_path, "rb") as f:
+                content = f.read()
+            # mtime=0: reproducible output
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) > len(content) * min_ratio:
+                self.console(f"|- WEB GZ SKIP: {file_name} {len(content)} -> {len(compressed)} bytes", state="warn")
+                continue
+            if not self.dry_run:
+                with open(f"{file_path}.gz", "wb") as f:
+                    f.write(compressed)
+            compressed_cnt += 1
+            self.console(f"|- WEB GZ: {file_name} {len(content)} -> {len(compressed)} bytes", state="ok")
+        self.console(f"WEB compression summary: {compressed_cnt} file(s)", state="ok")
+        return True
+
 
     def get_micrOS_version(self, config_string=None):
         # Get repo version
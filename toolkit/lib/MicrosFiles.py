@@ -7,7 +7,7 @@ except Exception as e:
     import LocalMachine
 
 PYTHON_EXTENSIONS = ('py', 'mpy')
-WEB_ONLY = ('js', 'html', 'css', 'json', 'ico', 'jpeg', 'png')
+WEB_ONLY = ('js', 'html', 'css', 'json', 'ico', 'jpeg', 'png', 'gz')
 ENABLED_EXTENSIONS = PYTHON_EXTENSIONS + WEB_ONLY
 
 def check_all_extensions(path):
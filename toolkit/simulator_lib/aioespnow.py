@@ -1,10 +1,34 @@
+import asyncio
 
 
 class AIOESPNow:
+    """
+    Simulator stand-in with local loopback
+    - asend(mac, msg): msg is received by the own server as it was sent by mac,
+      so request -> server -> response round trips work on a single device
+    """
+    MAX_DATA_LEN = 250
+    RX_PACKET = 263             # rxbuf bytes per max. size packet (default rxbuf: 2 packets)
 
     def __init__(self):
         self._active = False
-        self.peers_table = None
+        self._queue = None
+        self._rxbuf = 526
+        self.peers_table = {}
+        self._stats = [0, 0, 0, 0, 0]   # tx_pkts, tx_responses, tx_failures, rx_packets, rx_dropped_packets
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            # Bounded receive buffer (rxbuf): packets are dropped when full
+            self._queue = asyncio.Queue(maxsize=max(1, self._rxbuf // AIOESPNow.RX_PACKET))
+        return self._queue
+
+    def config(self, rxbuf=None, **_kwargs):
+        if rxbuf is not None:
+            self._rxbuf = rxbuf
+            self._queue = None
+        return self._rxbuf
 
     def active(self, state=None):
         if state is not None:
@@ -12,17 +36,33 @@ class AIOESPNow:
         return self._active
 
     def stats(self):
-        pass
+        return tuple(self._stats)
 
     def add_peer(self, mac):
-        pass
+        self.peers_table[bytes(mac)] = [0, 0]
 
-    async def asend(self, mac, full_msg):
-        pass
+    def del_peer(self, mac):
+        self.peers_table.pop(bytes(mac), None)
 
     def send(self, mac, full_msg):
-        pass
+        if len(full_msg) > AIOESPNow.MAX_DATA_LEN:
+            self._stats[2] += 1
+            raise ValueError("ESP_ERR_ESPNOW_ARG")
+        self._stats[0] += 1
+        self._stats[1] += 1
+        try:
+            self.queue.put_nowait((bytes(mac), bytes(full_msg)))
+            self._stats[3] += 1
+        except asyncio.QueueFull:
+            self._stats[4] += 1
+        return True
+
+    async def asend(self, mac, full_msg):
+        await asyncio.sleep(0)
+        return self.send(mac, full_msg)
 
-    def __iter__(self):
-        return (i for i in range(0, 3))
+    def __aiter__(self):
+        return self
 
+    async def __anext__(self):
+        return await self.queue.get()
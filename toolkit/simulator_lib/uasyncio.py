@@ -5,8 +5,7 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False  # Disable hostname check
 ssl_context.verify_mode = ssl.CERT_NONE  # Disable certificate verification
 
-class TimeoutError(Exception):
-    pass
+TimeoutError = asyncio.TimeoutError
 
 def open_connection(host, port, ssl=False):
     #return asyncio.open_connection(host, port, ssl=ssl)